@@ -0,0 +1,320 @@
+import os
+import glob
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import importlib.util
+
+import numpy as np
+
+import BpyStandIn
+
+# Benchmarks of the hot paths of the recommender, run offline (no Blender) over the tutorials of blenderProject and
+# synthetic scale-ups of them. Each benchmark is run for several input sizes, so the results show how it scales:
+#
+# python Benchmark.py                               # all benchmarks, results on benchmark_results.json
+# python Benchmark.py --quick --only checkMeshSimilarity,findVertsDiff --output before.json
+#
+# Output (JSON):
+# {"meta": {...}, "benchmarks": {name: {"description", "sizeUnit", "points": [{"size", "runs", "best", "median"}],
+#                                       "exponent"}}}
+# "runs" are the times (seconds) of each repetition and "exponent" is the slope of log(median) over log(size), e.g.
+# around 1 for linear and 2 for quadratic code.
+
+BpyStandIn.install()
+
+import loggerModal
+import UniversalTranslator
+from TutorialIO import readTutorial, writeSteps
+
+projectPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blenderProject")
+
+def loadModule(name, fileName):
+    # For the scripts whose file name is not a valid module name (tf-idf.py)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(os.path.dirname(os.path.abspath(__file__)), fileName))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+tfIdf = loadModule("tfIdf", "tf-idf.py")
+
+#####################################################################################################################################
+########################################################## Corpus ###################################################################
+
+def loadCorpus():
+    # Returns {file name: steps} for the tutorials of the project
+
+    return {os.path.basename(path): readTutorial(path) for path in sorted(glob.glob(os.path.join(projectPath, "TUT*.txt")))}
+
+def getLargestMesh(corpus):
+    # Props of the step with the most vertices in the corpus
+
+    meshes = [step[1] for steps in corpus.values() for step in steps
+              if type(step[1]) == dict and type(step[1].get("vertices")) == dict and type(step[1].get("faces")) == dict]
+    return max(meshes, key=lambda props: len(props["vertices"]))
+
+def scaleMesh(mesh, count, noise = 0.0, seed = 0):
+    # Returns a mesh ({"vertices": {index: [x, y, z]}, "faces": {index: [x, y, z]}}) with count vertices, made of copies of
+    # the given mesh placed side by side. noise moves each coordinate by up to noise (relative), the order is shuffled
+
+    generator = np.random.default_rng(seed)
+    result = {}
+
+    for key, total in (("vertices", count), ("faces", max(1, count * len(mesh["faces"]) // len(mesh["vertices"])))):
+        base = np.array(list(mesh[key].values()), dtype=np.float64)
+        span = np.ptp(base[:, 0]) + 1.0
+        copies = -(-total // len(base))
+        coords = np.concatenate([base + [i * span, 0, 0] for i in range(copies)])[:total]
+
+        if noise:
+            coords = coords * (1 + generator.uniform(-noise, noise, coords.shape))
+
+        coords = coords[generator.permutation(len(coords))]
+        result[key] = {i: coord for i, coord in enumerate(coords.tolist())}
+
+    return result
+
+def scaleSteps(corpus, count):
+    # The steps of all the tutorials repeated until count steps. They are shuffled (always in the same order) so the
+    # big and small meshes are spread evenly, whatever the count
+
+    steps = [step for steps in corpus.values() for step in steps]
+    random.Random(0).shuffle(steps)
+    return (steps * (count // len(steps) + 1))[:count]
+
+#####################################################################################################################################
+########################################################## Harness ##################################################################
+
+def timeRuns(function, repeat, setup = None):
+    # Times function(setup()) repeat times, the setup is not timed
+
+    runs = []
+
+    for i in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        runs.append(time.perf_counter() - start)
+
+    return runs
+
+def scalingExponent(points):
+    sizes = [point["size"] for point in points if point["median"] > 0]
+    medians = [point["median"] for point in points if point["median"] > 0]
+
+    if len(sizes) < 2 or len(set(sizes)) < 2:
+        return None
+
+    return float(np.polyfit(np.log(sizes), np.log(medians), 1)[0])
+
+#####################################################################################################################################
+######################################################## Benchmarks #################################################################
+
+def benchmarkLoadTutorial(corpus, sizes, repeat):
+    # readTutorial of files with size steps
+    points = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, "TUT%i.txt" %size)
+            with open(path, 'w') as file:
+                writeSteps(file, scaleSteps(corpus, size))
+
+            points.append((size, timeRuns(lambda argument: readTutorial(path), repeat)))
+
+    return points
+
+def benchmarkParseReport(corpus, sizes, repeat):
+    # Parsing of size Info reports (operators and property assignments), without the translation cache
+    points = []
+
+    for size in sizes:
+        reports = [(UniversalTranslator.sampleReports + UniversalTranslator.samplePropertyReports)[i % 7] for i in range(size)]
+
+        def parse(argument):
+            for report in reports:
+                if report.startswith("bpy.ops"):
+                    UniversalTranslator.parseOperatorReport(report)
+                else:
+                    UniversalTranslator.parsePropertyReport(report)
+
+        points.append((size, timeRuns(parse, repeat)))
+
+    return points
+
+def benchmarkTranslateReport(corpus, sizes, repeat):
+    # translateReport of size reports, 1 in 8 not seen before (the rest hits the translation cache)
+    points = []
+
+    for size in sizes:
+        reports = []
+        for i in range(size):
+            if i % 8 == 0:
+                reports.append("bpy.ops.transform.translate(value=(%.6f, 0, 0), orient_type='GLOBAL')" %(i * 1e-6))
+            else:
+                reports.append(UniversalTranslator.sampleReports[i % 4])
+
+        def translate(argument):
+            for report in reports:
+                UniversalTranslator.translateReport(report, "Operator")
+
+        points.append((size, timeRuns(translate, repeat, UniversalTranslator.clearTranslationCache)))
+
+    return points
+
+def benchmarkMeshSimilarity(corpus, sizes, repeat):
+    # checkMeshSimilarity of two equal meshes of size vertices (shuffled, 1 % of noise), the worst case of a match
+    points = []
+    mesh = getLargestMesh(corpus)
+
+    for size in sizes:
+        expected = scaleMesh(mesh, size, seed=1)
+        actual = scaleMesh(mesh, size, noise=0.01, seed=2)
+        points.append((size, timeRuns(lambda argument: loggerModal.checkMeshSimilarity(expected, actual, 0.2), repeat)))
+
+    return points
+
+def benchmarkFindVertsDiff(corpus, sizes, repeat):
+    # findVertsDiff between size vertices and the same vertices with one more
+    points = []
+    mesh = getLargestMesh(corpus)
+
+    for size in sizes:
+        before = list(scaleMesh(mesh, size, seed=1)["vertices"].values())
+        after = list(scaleMesh(mesh, size, noise=0.01, seed=2)["vertices"].values()) + [[1000.0, 1000.0, 1000.0]]
+        points.append((size, timeRuns(lambda argument: loggerModal.findVertsDiff(before, after, 0.1), repeat)))
+
+    return points
+
+def benchmarkRecursiveValidate(corpus, sizes, repeat):
+    # recursiveValidate of size steps against themselves (every value is compared)
+    points = []
+    tutorial = loggerModal.Tutorial()
+
+    for size in sizes:
+        steps = scaleSteps(corpus, size)
+
+        def validate(argument):
+            for step in steps:
+                tutorial.recursiveValidate(step, step, list, 0.1)
+
+        points.append((size, timeRuns(validate, repeat)))
+
+    return points
+
+def benchmarkGetFilteredOp(corpus, sizes, repeat):
+    # getFilteredOp of size steps
+    points = []
+
+    for size in sizes:
+        steps = scaleSteps(corpus, size)
+
+        def filterSteps(argument):
+            for step in steps:
+                loggerModal.getFilteredOp(step, step[-1] if type(step[-1]) == dict else {"tolerance": 10})
+
+        points.append((size, timeRuns(filterSteps, repeat)))
+
+    return points
+
+def benchmarkTfIdf(corpus, sizes, repeat):
+    # tf-idf weights of size tutorials (the ones of the project repeated under other names)
+    points = []
+    names = list(corpus.keys())
+
+    for size in sizes:
+        def countAll():
+            globalOps = []
+            tutorials = [tfIdf.countStepOperations("TUT%i.txt" %i, corpus[names[i % len(names)]], globalOps) for i in range(size)]
+            return tutorials, globalOps
+
+        points.append((size, timeRuns(lambda argument: tfIdf.computeTermWeights(*argument, verbose=False), repeat, countAll)))
+
+    return points
+
+def benchmarkMakeRecommendation(corpus, sizes, repeat):
+    # makeRecommendation over size tutorials (random weights over the terms of the project)
+    points = []
+    user = loggerModal.userModel()
+    terms = user.allTerms
+    generator = random.Random(0)
+
+    for term in terms[::3]:
+        user.updateUserProfile(term, False)
+
+    for size in sizes:
+        weights = np.array([[generator.random() for term in terms] for i in range(size)])
+        weights /= np.linalg.norm(weights, axis=1)[:, np.newaxis]
+        user.termsDict = {"allTerms": terms, "allTutorials": {"TUT%i.txt" %i: list(row) for i, row in enumerate(weights.tolist())}}
+
+        points.append((size, timeRuns(lambda argument: user.makeRecommendation(), repeat)))
+
+    return points
+
+# name: (function, description, size unit, sizes, quick sizes)
+benchmarkSuite = {
+    "loadTutorial": (benchmarkLoadTutorial, "readTutorial of a tutorial file", "steps", [50, 100, 200, 400], [50, 100]),
+    "parseReport": (benchmarkParseReport, "Parsing of Info reports (no translation cache)", "reports", [100, 1000, 10000], [100, 1000]),
+    "translateReport": (benchmarkTranslateReport, "translateReport, 1 in 8 reports new", "reports", [100, 1000, 10000], [100, 1000]),
+    "checkMeshSimilarity": (benchmarkMeshSimilarity, "checkMeshSimilarity of two equal meshes", "vertices", [50, 100, 200, 400], [50, 100]),
+    "findVertsDiff": (benchmarkFindVertsDiff, "findVertsDiff with one new vertex", "vertices", [50, 100, 200, 400], [50, 100]),
+    "recursiveValidate": (benchmarkRecursiveValidate, "Tutorial.recursiveValidate of each step", "steps", [50, 100, 200, 400], [50, 100]),
+    "getFilteredOp": (benchmarkGetFilteredOp, "getFilteredOp of each step", "steps", [50, 200, 800, 3200], [50, 200]),
+    "tfIdf": (benchmarkTfIdf, "tf-idf weights of the tutorials", "tutorials", [9, 36, 144], [9, 36]),
+    "makeRecommendation": (benchmarkMakeRecommendation, "userModel.makeRecommendation", "tutorials", [10, 100, 1000, 10000], [10, 100]),
+}
+
+def runBenchmarks(names = None, quick = False, repeat = 5, report = print):
+    # Runs the benchmarks (all if names is None) and returns the results (see the format above)
+
+    corpus = loadCorpus()
+
+    # The validation logs every wrong mesh, only the errors are kept
+    loggerModal.setLogLevel("ERROR")
+
+    results = {"meta": {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(), "numpy": np.__version__,
+                        "platform": platform.platform(), "machine": platform.machine(), "quick": quick, "repeat": repeat,
+                        "corpus": {name: len(steps) for name, steps in corpus.items()}},
+               "benchmarks": {}}
+
+    for name, (function, description, sizeUnit, sizes, quickSizes) in benchmarkSuite.items():
+        if names is not None and name not in names:
+            continue
+
+        points = []
+
+        for size, runs in function(corpus, quickSizes if quick else sizes, repeat):
+            points.append({"size": size, "runs": runs, "best": min(runs), "median": float(np.median(runs))})
+            report("%-20s %8i %-10s best %10.3f ms | median %10.3f ms" %(name, size, sizeUnit, min(runs) * 1000, np.median(runs) * 1000))
+
+        results["benchmarks"][name] = {"description": description, "sizeUnit": sizeUnit, "points": points, "exponent": scalingExponent(points)}
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the recommender (offline, without Blender)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file with the results")
+    parser.add_argument("--only", default=None, help="Comma separated names of the benchmarks to run: " + ", ".join(benchmarkSuite))
+    parser.add_argument("--quick", action="store_true", help="Only the smaller sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each benchmark and size")
+    arguments = parser.parse_args()
+
+    names = None if arguments.only is None else arguments.only.split(",")
+
+    for name in names or []:
+        if name not in benchmarkSuite:
+            parser.error("unknown benchmark: " + name)
+
+    results = runBenchmarks(names, arguments.quick, arguments.repeat)
+
+    with open(arguments.output, 'w') as file:
+        json.dump(results, file, indent=1)
+
+    for name, benchmark in results["benchmarks"].items():
+        if benchmark["exponent"] is not None:
+            print("%-20s scales as %s^%.2f" %(name, benchmark["sizeUnit"], benchmark["exponent"]))
+
+    print("Results saved on " + arguments.output)
@@ -0,0 +1,280 @@
+import os
+import gc
+import sys
+import json
+import math
+import random
+import argparse
+
+import numpy as np
+
+import Benchmark
+
+# Regression gate of the benchmarks (Benchmark.py): runs the suite offline (bpy stand-in, no Blender) and compares it
+# to a baseline. Prints a table of the changes and exits with 1 if any benchmark regressed:
+#
+# python BenchmarkGate.py --update-baseline             # once per environment, before the changes to measure
+# python BenchmarkGate.py                               # compares to benchmark_baseline.json
+# python BenchmarkGate.py --results after.json          # compares results saved by Benchmark.py instead of running the suite
+#
+# The baseline is not committed (benchmark_baseline.json is ignored by git): the times depend on the machine, the
+# Python and NumPy versions, so each environment generates its own from the code it starts from. Only the gate
+# itself (the thresholds below) is shared.
+#
+# Each size of a benchmark is compared on its best run (the least disturbed by the machine), and the benchmark on
+# the geometric mean of the ratios current / baseline of its sizes. It regressed if this ratio is above 1 + its
+# threshold, which is the largest of:
+# - the threshold of the benchmark (gateThresholds), the smallest change considered
+# - noiseFactor times the spread of the noiseRuns fastest runs of the baseline, at most maxNoiseFactor times the threshold
+#   of the benchmark (a noisy baseline cannot hide a doubling)
+# The benchmarks that regressed are run again (--retries) and keep their best runs, so a single disturbed run
+# does not fail the gate. Changes smaller than minimumDelta are ignored (timer resolution of the smallest sizes).
+# The short benchmarks (all their sizes in less than shortBenchmarkTime) are run shortRepeat times instead of the
+# repeat of the suite, as their best run is more easily disturbed. The machine can be slower for several seconds at a
+# time, so the baseline keeps the runs of baselineRuns runs of the suite.
+# The baseline may come from another machine: both runs time the same fixed workload (calibrate) and the baseline
+# is scaled by the ratio of the two times (--no-normalize to compare the raw times).
+
+defaultBaseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Smallest relative change considered for each benchmark. The sub-millisecond ones are noisier
+gateThresholds = {
+    "default": 0.25,
+    "translateReport": 0.3,
+    "getFilteredOp": 0.35,
+    "makeRecommendation": 0.35,
+}
+noiseFactor = 3
+maxNoiseFactor = 2
+noiseRuns = 3
+minimumDelta = 50e-6 # seconds
+shortBenchmarkTime = 0.1 # seconds, sum of the best runs of the sizes
+shortRepeat = 15
+baselineRuns = 3
+
+def calibrate(repeat = 9):
+    # Best time (seconds) of a fixed mix of the work done by the benchmarks: Python containers, string parsing and NumPy.
+    # The garbage collector is disabled, so the time does not depend on the objects kept by the suite
+
+    generator = random.Random(0)
+    values = [generator.random() for i in range(20000)]
+    text = ",".join("%.6f" %value for value in values[:5000])
+    matrix = np.array(values).reshape(-1, 4)
+
+    def workload(argument):
+        table = {i: [value, value * 2, value * 3] for i, value in enumerate(values)}
+        rows = list(table.values())
+        sorted(values)
+        [float(part) for part in text.split(",")]
+        sum(abs(first[0] - second[0]) for first, second in zip(rows, rows[1:]))
+        np.linalg.norm(matrix, axis=1).sum()
+
+    gc.collect()
+    gc.disable()
+
+    try:
+        return min(Benchmark.timeRuns(workload, repeat))
+
+    finally:
+        gc.enable()
+
+def isShortBenchmark(benchmark):
+    return sum(point["best"] for point in benchmark["points"]) < shortBenchmarkTime
+
+def runSuite(names = None, quick = False, repeat = 5):
+    # The machine is calibrated before and after the suite (its speed can drift during the run), the best is kept
+
+    calibration = calibrate()
+    results = Benchmark.runBenchmarks(names, quick, repeat, report=lambda line: None)
+    short = [name for name, benchmark in results["benchmarks"].items() if isShortBenchmark(benchmark)]
+
+    if short and shortRepeat > repeat:
+        mergeRuns(results, Benchmark.runBenchmarks(short, quick, shortRepeat - repeat, report=lambda line: None))
+
+    results["meta"]["calibration"] = min(calibration, calibrate())
+    results["meta"]["shortRepeat"] = shortRepeat
+    return results
+
+def pointNoise(point):
+    # Relative spread of the fastest runs of a size (the slow runs are the ones disturbed by the machine)
+
+    runs = sorted(point["runs"])[:noiseRuns]
+    return (runs[-1] - runs[0]) / runs[0] if runs[0] > 0 else 0
+
+def compareBenchmark(name, baseline, current, speed = 1.0):
+    # Compares the sizes the two runs have in common. speed = time of the current machine / time of the baseline one.
+    # Returns {"name", "ratio", "threshold", "verdict", "points": [{"size", "baseline", "current", "ratio"}]}
+
+    currentPoints = {point["size"]: point for point in current["points"]}
+    points = []
+    noises = []
+
+    for point in baseline["points"]:
+        if point["size"] not in currentPoints:
+            continue
+
+        currentPoint = currentPoints[point["size"]]
+        expected = point["best"] * speed
+        ratio = currentPoint["best"] / expected if expected > 0 else 1.0
+
+        if abs(currentPoint["best"] - expected) < minimumDelta:
+            ratio = 1.0
+
+        points.append({"size": point["size"], "baseline": expected, "current": currentPoint["best"], "ratio": ratio})
+        noises.append(pointNoise(point))
+
+    comparison = {"name": name, "points": points, "sizeUnit": baseline.get("sizeUnit", "")}
+
+    if not points:
+        comparison.update({"ratio": None, "threshold": None, "verdict": "no common sizes"})
+        return comparison
+
+    ratio = math.exp(sum(math.log(point["ratio"]) for point in points) / len(points))
+    minimumThreshold = gateThresholds.get(name, gateThresholds["default"])
+    threshold = max(minimumThreshold, min(noiseFactor * float(np.median(noises)), maxNoiseFactor * minimumThreshold))
+
+    if ratio > 1 + threshold:
+        verdict = "regression"
+
+    elif ratio < 1 / (1 + threshold):
+        verdict = "improvement"
+
+    else:
+        verdict = "ok"
+
+    comparison.update({"ratio": ratio, "threshold": threshold, "verdict": verdict})
+    return comparison
+
+def getSpeed(baseline, current, normalize = True):
+    # Ratio of the calibration times of the two runs (1 if one of them has none)
+
+    baselineTime = baseline["meta"].get("calibration")
+    currentTime = current["meta"].get("calibration")
+
+    if not normalize or not baselineTime or not currentTime:
+        return 1.0
+
+    return currentTime / baselineTime
+
+def compareResults(baseline, current, normalize = True):
+    # Comparison of every benchmark of the baseline (see compareBenchmark). The ones missing from the current
+    # results are reported as "missing", the new ones as "new"
+
+    speed = getSpeed(baseline, current, normalize)
+    comparisons = []
+
+    for name, benchmark in baseline["benchmarks"].items():
+        if name not in current["benchmarks"]:
+            comparisons.append({"name": name, "ratio": None, "threshold": None, "verdict": "missing", "points": [], "sizeUnit": ""})
+            continue
+
+        comparisons.append(compareBenchmark(name, benchmark, current["benchmarks"][name], speed))
+
+    for name in current["benchmarks"]:
+        if name not in baseline["benchmarks"]:
+            comparisons.append({"name": name, "ratio": None, "threshold": None, "verdict": "new", "points": [], "sizeUnit": ""})
+
+    return comparisons
+
+def mergeRuns(results, retry):
+    # Keeps the runs of both attempts for the benchmarks that were run again
+
+    for name, benchmark in retry["benchmarks"].items():
+        points = {point["size"]: point for point in results["benchmarks"][name]["points"]}
+
+        for point in benchmark["points"]:
+            if point["size"] in points:
+                merged = points[point["size"]]
+                merged["runs"] = merged["runs"] + point["runs"]
+                merged["best"] = min(merged["runs"])
+                merged["median"] = float(np.median(merged["runs"]))
+
+def printComparisons(comparisons, speed, verbose = False):
+    print("%-20s %12s %12s %9s %10s  %s" %("benchmark", "baseline", "current", "change", "threshold", "verdict"))
+
+    for comparison in comparisons:
+        if comparison["ratio"] is None:
+            print("%-20s %12s %12s %9s %10s  %s" %(comparison["name"], "-", "-", "-", "-", comparison["verdict"]))
+            continue
+
+        # The times of the largest size are shown, the change is the one of all the sizes
+        largest = comparison["points"][-1]
+        print("%-20s %9.3f ms %9.3f ms %+8.1f%% %9.1f%%  %s" %(comparison["name"], largest["baseline"] * 1000, largest["current"] * 1000,
+              (comparison["ratio"] - 1) * 100, comparison["threshold"] * 100, comparison["verdict"]))
+
+        if verbose:
+            for point in comparison["points"]:
+                print("  %8i %-10s %9.3f ms %9.3f ms %+8.1f%%" %(point["size"], comparison["sizeUnit"], point["baseline"] * 1000,
+                      point["current"] * 1000, (point["ratio"] - 1) * 100))
+
+    if speed != 1.0:
+        print("Baseline scaled by %.2f (calibration of this machine / calibration of the baseline)" %speed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the benchmarks (Benchmark.py) to a baseline, exit code 1 on a regression")
+    parser.add_argument("--baseline", default=defaultBaseline, help="Baseline results (JSON)")
+    parser.add_argument("--results", default=None, help="Results of Benchmark.py to compare instead of running the suite")
+    parser.add_argument("--output", default=None, help="Saves the results of this run (JSON)")
+    parser.add_argument("--update-baseline", action="store_true", help="Runs the suite and saves it as the baseline")
+    parser.add_argument("--baseline-runs", type=int, default=baselineRuns, help="Runs of the suite kept in the baseline (--update-baseline)")
+    parser.add_argument("--retries", type=int, default=2, help="Runs again the benchmarks that regressed, at most this many times")
+    parser.add_argument("--no-normalize", action="store_true", help="Compares the raw times (same machine as the baseline)")
+    parser.add_argument("--verbose", action="store_true", help="Shows every size")
+    arguments = parser.parse_args()
+
+    if arguments.update_baseline:
+        results = runSuite()
+
+        for attempt in range(arguments.baseline_runs - 1):
+            run = runSuite()
+            mergeRuns(results, run)
+            results["meta"]["calibration"] = min(results["meta"]["calibration"], run["meta"]["calibration"])
+
+        results["meta"]["baselineRuns"] = arguments.baseline_runs
+
+        with open(arguments.baseline, 'w') as file:
+            json.dump(results, file, indent=1)
+
+        print("Baseline of %i benchmarks saved on %s" %(len(results["benchmarks"]), arguments.baseline))
+        sys.exit(0)
+
+    if not os.path.exists(arguments.baseline):
+        parser.error("no baseline at %s (create it with --update-baseline)" %arguments.baseline)
+
+    with open(arguments.baseline, 'r') as file:
+        baseline = json.load(file)
+
+    quick, repeat = baseline["meta"].get("quick", False), baseline["meta"].get("repeat", 5)
+    normalize = not arguments.no_normalize
+
+    if arguments.results is not None:
+        with open(arguments.results, 'r') as file:
+            results = json.load(file)
+
+    else:
+        # Same sizes and repetitions as the baseline
+        results = runSuite([name for name in baseline["benchmarks"] if name in Benchmark.benchmarkSuite], quick, repeat)
+
+    comparisons = compareResults(baseline, results, normalize)
+
+    for attempt in range(arguments.retries if arguments.results is None else 0):
+        regressed = [comparison["name"] for comparison in comparisons if comparison["verdict"] == "regression"]
+
+        if not regressed:
+            break
+
+        print("Running again: " + ", ".join(regressed))
+        mergeRuns(results, Benchmark.runBenchmarks(regressed, quick, repeat, report=lambda line: None))
+        comparisons = compareResults(baseline, results, normalize)
+
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=1)
+
+    printComparisons(comparisons, getSpeed(baseline, results, normalize), arguments.verbose)
+
+    regressions = [comparison for comparison in comparisons if comparison["verdict"] == "regression"]
+    improvements = [comparison for comparison in comparisons if comparison["verdict"] == "improvement"]
+    print("%i regressions, %i improvements, %i benchmarks" %(len(regressions), len(improvements), len(comparisons)))
+
+    sys.exit(1 if regressions else 0)
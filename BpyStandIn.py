@@ -0,0 +1,317 @@
+import os
+import sys
+import types
+
+import numpy as np
+
+# Minimal stand-in for the Blender modules (bpy, bmesh, mathutils) imported by loggerModal.py, so the parts of the addon
+# that do not need a scene (report translation, tutorial validation, recommendation, caches) can be run in plain Python
+# by the offline tools (Benchmark.py...). Only what these tools use is provided: the scene is empty (meshes can be added
+# with addMeshObject), the operators and panels are plain classes and the properties are not registered anywhere.
+#
+# import BpyStandIn
+# BpyStandIn.install()            # does nothing when run inside Blender
+# import loggerModal
+
+# Folder used for the paths relative to the .blend file ('//termWeights.txt'...)
+blendDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blenderProject")
+
+class StandInStruct:
+    # Base of bpy.types.Operator / bpy.types.Panel
+    pass
+
+class Timers:
+    # bpy.app.timers: the registered functions are only called by runTimers
+
+    def __init__(self):
+        self.registered = {}
+
+    def register(self, function, first_interval = 0, persistent = False):
+        self.registered[function] = first_interval
+
+    def unregister(self, function):
+        del self.registered[function]
+
+    def is_registered(self, function):
+        return function in self.registered
+
+def runTimers():
+    # Calls every registered timer once, dropping the ones that return None (as Blender does)
+
+    timers = sys.modules["bpy"].app.timers
+
+    for function in list(timers.registered):
+        interval = function()
+
+        if interval is None:
+            timers.registered.pop(function, None)
+
+        else:
+            timers.registered[function] = interval
+
+class DataCollection(dict):
+    # bpy.data.objects, bpy.data.meshes...: name -> data block. As in bpy, iterating gives the data blocks
+
+    def __iter__(self):
+        return iter(list(self.values()))
+
+    def new(self, name, *args):
+        block = types.SimpleNamespace(name=name)
+        self[name] = block
+        return block
+
+    def remove(self, block, do_unlink = True):
+        self.pop(block.name, None)
+
+class StandInElements:
+    # mesh.vertices, mesh.edges, mesh.polygons and mesh.loops: only len() and foreach_get, the attributes are functions
+    # returning the values of all the elements
+
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    def __len__(self):
+        return len(next(iter(self.attributes.values()))())
+
+    def foreach_get(self, attribute, values):
+        values[:] = np.asarray(self.attributes[attribute](), dtype=values.dtype).ravel()
+
+def edgesOfFaces(faces):
+    # (E, 2) array of the sides of the faces
+    sides = {tuple(sorted((face[i], face[i - 1]))) for face in faces for i in range(len(face))}
+    return np.array(sorted(sides), dtype=np.int32).reshape(-1, 2)
+
+class StandInMesh:
+    # Mesh data block: coordinates, selection flags and faces (tuples of vertex indices). The edges are the sides of the faces
+
+    def __init__(self, name, coords, faces, smooth = False):
+        self.name = name
+        self.coords = np.array(coords, dtype=np.float32).reshape(-1, 3)
+        self.select = np.zeros(len(self.coords), dtype=bool)
+        self.faces = [tuple(face) for face in faces]
+        self.smooth = np.full(len(self.faces), smooth)
+        self.editMesh = None
+
+        self.vertices = StandInElements({"co": lambda: self.coords, "select": lambda: self.select})
+        self.edges = StandInElements({"vertices": lambda: edgesOfFaces(self.faces)})
+        self.polygons = StandInElements({"center": self.faceCenters, "use_smooth": lambda: self.smooth,
+                                         "loop_total": lambda: [len(face) for face in self.faces],
+                                         "loop_start": lambda: np.cumsum([0] + [len(face) for face in self.faces])[:-1]})
+        self.loops = StandInElements({"vertex_index": lambda: [index for face in self.faces for index in face]})
+
+    def faceCenters(self):
+        return np.array([self.coords[list(face)].mean(axis=0) for face in self.faces], dtype=np.float32).reshape(-1, 3)
+
+    @property
+    def total_vert_sel(self):
+        source = self.editMesh if self.editMesh is not None else self
+        return int(source.select.sum())
+
+    def as_pointer(self):
+        return id(self)
+
+class StandInBMElement:
+    # BMVert / BMFace of the edit bmesh: a view over its arrays
+
+    def __init__(self, bm, kind, index):
+        self.bm = bm
+        self.kind = kind
+        self.index = index
+
+    @property
+    def co(self):
+        return tuple(self.bm.coords[self.index].tolist())
+
+    @co.setter
+    def co(self, value):
+        self.bm.coords[self.index] = value
+
+    @property
+    def select(self):
+        if self.kind == "verts":
+            return bool(self.bm.select[self.index])
+
+        return all(self.bm.select[list(self.bm.faceVerts[self.index])])
+
+    @select.setter
+    def select(self, value):
+        self.bm.select[self.index] = value
+
+    @property
+    def link_faces(self):
+        return [StandInBMElement(self.bm, "faces", index) for index, face in enumerate(self.bm.faceVerts) if self.index in face]
+
+    @property
+    def verts(self):
+        return [StandInBMElement(self.bm, "verts", index) for index in self.bm.faceVerts[self.index]]
+
+    def calc_center_median(self):
+        return tuple(self.bm.coords[list(self.bm.faceVerts[self.index])].mean(axis=0, dtype=np.float32).tolist())
+
+class StandInBMSequence:
+    # bm.verts, bm.edges, bm.faces
+
+    def __init__(self, bm, kind, count):
+        self.bm = bm
+        self.kind = kind
+        self.count = count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError("BMElemSeq[index]: index %i out of range" %index)
+
+        return StandInBMElement(self.bm, self.kind, index)
+
+    def __iter__(self):
+        return (StandInBMElement(self.bm, self.kind, index) for index in range(len(self)))
+
+    def ensure_lookup_table(self):
+        pass
+
+    def index_update(self):
+        pass
+
+class StandInBMesh:
+    # Edit bmesh of a mesh: a copy of its data, written back to it by update_from_editmode (as in Blender, the mesh
+    # does not see the edit-mode changes until then)
+
+    def __init__(self, mesh):
+        self.coords = mesh.coords.copy()
+        self.select = mesh.select.copy()
+        self.faceVerts = list(mesh.faces)
+
+        self.verts = StandInBMSequence(self, "verts", lambda: len(self.coords))
+        self.edges = StandInBMSequence(self, "edges", lambda: len(edgesOfFaces(self.faceVerts)))
+        self.faces = StandInBMSequence(self, "faces", lambda: len(self.faceVerts))
+
+class StandInObject:
+    # Object of the scene. The mesh of a mesh object is in data
+
+    def __init__(self, name, data = None, location = (0.0, 0.0, 0.0)):
+        self.name = name
+        self.type = "MESH" if data is not None else "EMPTY"
+        self.data = data
+        self.mode = "OBJECT"
+        self.scale = [1.0, 1.0, 1.0]
+        self.location = list(location)
+        self.rotation_euler = [0.0, 0.0, 0.0]
+        self.modifiers = []
+
+    def update_from_editmode(self):
+        mesh = self.data
+
+        if mesh.editMesh is not None:
+            mesh.coords = mesh.editMesh.coords.copy()
+            mesh.select = mesh.editMesh.select.copy()
+            mesh.faces = list(mesh.editMesh.faceVerts)
+            mesh.smooth = np.resize(mesh.smooth, len(mesh.faces))
+
+        return True
+
+def addMeshObject(name, coords, faces, location = (0.0, 0.0, 0.0), smooth = False):
+    # Adds a mesh object to the scene of the stand-in. Returns the object
+
+    bpy = sys.modules["bpy"]
+    mesh = bpy.data.meshes[name] = StandInMesh(name, coords, faces, smooth)
+    obj = bpy.data.objects[name] = StandInObject(name, mesh, location)
+
+    return obj
+
+def setActiveObject(obj):
+    # Makes obj the active (and only selected) object
+
+    context = sys.modules["bpy"].context
+    context.view_layer.objects.active = obj
+    context.active_object = obj
+    context.selected_objects = [] if obj is None else [obj]
+
+def setObjectMode(obj, mode):
+    # Toggles the edit mode of a mesh object ("EDIT" or "OBJECT")
+
+    if mode == "EDIT" and obj.mode != "EDIT":
+        obj.data.editMesh = StandInBMesh(obj.data)
+
+    elif mode != "EDIT" and obj.mode == "EDIT":
+        obj.update_from_editmode()
+        obj.data.editMesh = None
+
+    obj.mode = mode
+
+def fromEditMesh(mesh):
+    # bmesh.from_edit_mesh
+    return mesh.editMesh
+
+def abspath(path):
+    if path.startswith("//"):
+        return os.path.join(blendDirectory, path[2:])
+
+    return path
+
+def standInProperty(**kwargs):
+    # IntProperty, EnumProperty...: the definition is kept, there is nowhere to register it
+    return kwargs
+
+def persistent(function):
+    return function
+
+def buildModules():
+    bpy = types.ModuleType("bpy")
+    bpy.isStandIn = True
+    bpy.types = types.SimpleNamespace(Operator=StandInStruct, Panel=StandInStruct, Scene=types.SimpleNamespace(),
+                                      VIEW3D_MT_object=types.SimpleNamespace(append=lambda function: None, remove=lambda function: None))
+    bpy.path = types.SimpleNamespace(abspath=abspath)
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+
+    handlers = types.ModuleType("bpy.app.handlers")
+    handlers.persistent = persistent
+    handlers.undo_post = []
+    handlers.redo_post = []
+
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.handlers = handlers
+    bpy.app.timers = Timers()
+    bpy.app.background = True
+
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("IntProperty", "FloatProperty", "EnumProperty", "BoolProperty", "StringProperty"):
+        setattr(bpy.props, name, standInProperty)
+
+    bpy.data = types.SimpleNamespace(objects=DataCollection(), meshes=DataCollection(), materials=DataCollection(),
+                                     collections=DataCollection(), batch_remove=lambda blocks: None)
+
+    sceneCollection = types.SimpleNamespace(children=DataCollection())
+    bpy.context = types.SimpleNamespace(scene=types.SimpleNamespace(objects=bpy.data.objects, collection=sceneCollection),
+                                        view_layer=types.SimpleNamespace(objects=types.SimpleNamespace(active=None)),
+                                        active_object=None, selected_objects=[], window_manager=types.SimpleNamespace(clipboard="", windows=[]))
+
+    bmesh = types.ModuleType("bmesh")
+    bmesh.from_edit_mesh = fromEditMesh
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = tuple
+
+    return {"bpy": bpy, "bpy.app": bpy.app, "bpy.app.handlers": handlers, "bpy.props": bpy.props, "bmesh": bmesh, "mathutils": mathutils}
+
+def install(directory = None):
+    # Makes "import bpy" (and bmesh, mathutils) work outside of Blender. directory replaces the folder of the .blend
+    # file for the relative paths. Returns the bpy module (the real one inside Blender)
+
+    global blendDirectory
+
+    if directory is not None:
+        blendDirectory = directory
+
+    if "bpy" not in sys.modules:
+        try:
+            import bpy
+            return bpy
+
+        except ImportError:
+            sys.modules.update(buildModules())
+
+    return sys.modules["bpy"]
+
+def isStandIn():
+    return getattr(sys.modules.get("bpy"), "isStandIn", False)
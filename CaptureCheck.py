@@ -0,0 +1,292 @@
+import sys
+import types
+import argparse
+
+import numpy as np
+
+import BpyStandIn
+
+# Offline checks of the capture and translation of operations (loggerModal.captureOperation + translatePinnedEvent)
+# on the meshes of the bpy stand-in: each check builds a small scene, performs operations on it the way Blender would
+# leave it and compares the translated steps with what the operations really changed.
+#
+# python CaptureCheck.py                    # all the checks, the exit code is 1 if any failed
+# python CaptureCheck.py --only lazyRecord
+#
+# The stand-in meshes are only meant to exercise the capture paths (bulk reads, edit bmesh), not the cost of the real ones.
+
+BpyStandIn.install()
+
+import loggerModal
+from BpyStandIn import addMeshObject, setActiveObject, setObjectMode
+
+# Reports of the operations performed by the checks (as written on the Info log)
+reports = {
+    "Toggle Edit Mode": "bpy.ops.object.editmode_toggle()",
+    "Move": "bpy.ops.transform.translate(value=(0, 0, 1), orient_type='GLOBAL', use_proportional_edit=False)",
+    "Select": "bpy.ops.view3d.select(extend=False, deselect_all=True, location=(0, 0))",
+}
+
+def gridMesh(size, offset = 0.0):
+    # Coordinates and faces of a flat size x size grid of quads
+
+    coords = [(x + offset, y, 0.0) for y in range(size + 1) for x in range(size + 1)]
+    faces = [(y * (size + 1) + x, y * (size + 1) + x + 1, (y + 1) * (size + 1) + x + 1, (y + 1) * (size + 1) + x)
+             for y in range(size) for x in range(size)]
+
+    return coords, faces
+
+def newScene():
+    # Empty scene and cache
+
+    bpy = sys.modules["bpy"]
+    bpy.data.objects.clear()
+    bpy.data.meshes.clear()
+    setActiveObject(None)
+    loggerModal.saveObjectsOnCache({})
+    loggerModal.saveModifiersOnCache({})
+
+def startLogger():
+    # Cache filled as ModalOperator.invoke does it
+
+    loggerModal.saveObjectsOnCache(loggerModal.getAllObjects(firstCall=True))
+    loggerModal.saveModifiersOnCache(loggerModal.getAllModifiers())
+
+def perform(operatorName, proportional = False):
+    # Captures (main thread) and translates the operation just performed on the scene, as the logger does. Returns
+    # the translated step and the capture of the active mesh (None if not read)
+
+    operator = types.SimpleNamespace(name=operatorName, properties=types.SimpleNamespace(use_proportional_edit=proportional))
+    report = reports[operatorName]
+
+    if proportional:
+        report = report.replace("use_proportional_edit=False", "use_proportional_edit=True")
+
+    event = loggerModal.captureOperation(operator, report)
+
+    return loggerModal.translatePinnedEvent(event), event.data.get("activeMesh")
+
+def selectVertices(obj, indices):
+    # Selects only the given vertices of the mesh in edit mode
+
+    bm = obj.data.editMesh
+    bm.select[:] = False
+    bm.select[indices] = True
+
+def moveVertices(obj, indices, offset = (0.0, 0.0, 1.0)):
+    # Moves the given vertices of the mesh in edit mode
+
+    for index in indices:
+        vert = obj.data.editMesh.verts[index]
+        vert.co = [value + delta for value, delta in zip(vert.co, offset)]
+
+def checkMesh(failures, label, obj, translated):
+    # The mesh of the step and the one on the cache have to be the mesh of the scene
+
+    obj.update_from_editmode()
+    record = loggerModal.getObjectsOnCache()[obj.name]
+
+    for key, values in (("vertices", obj.data.coords), ("faces", obj.data.faceCenters())):
+        if not np.array_equal(loggerModal.toCoordsArray(translated[1][key]), values):
+            failures.append("%s: the %s of the step are not the ones of the scene" %(label, key))
+
+        if not np.array_equal(loggerModal.toCoordsArray(getattr(record, key)), values):
+            failures.append("%s: the %s on the cache are not the ones of the scene" %(label, key))
+
+def checkLazyRecord():
+    # The objects that are not active when the logger starts are cached without geometry (nor smooth shading). The
+    # first edit of one of them reports only what the edit changed
+
+    failures = []
+    newScene()
+    cube = addMeshObject("Cube", *gridMesh(2))
+    plane = addMeshObject("Plane", *gridMesh(3, offset=10.0), smooth=True)
+    setActiveObject(cube)
+    startLogger()
+
+    record = loggerModal.getObjectsOnCache()["Plane"]
+    if not record.evicted or record.nbytes() != 0 or record.isSmooth is not None:
+        failures.append("the record of the inactive object is not lazy (evicted %s, %i bytes, isSmooth %s)" %(record.evicted,
+                        record.nbytes(), record.isSmooth))
+
+    setActiveObject(plane)
+    setObjectMode(plane, "EDIT")
+    toggled = perform("Toggle Edit Mode")[0]
+
+    if any(key in toggled[1] for key in ("newVertices", "deletedVertices", "selectedVertices")):
+        failures.append("entering edit mode reported a geometry change: %s" %sorted(toggled[1].keys()))
+
+    selectVertices(plane, [5])
+    moveVertices(plane, [5])
+    moved = perform("Move")[0]
+
+    if moved[1].get("selectedVertices") != [5]:
+        failures.append("the first edit reported the moved vertices %s instead of [5]" %moved[1].get("selectedVertices"))
+
+    if "newVertices" in moved[1] or "deletedVertices" in moved[1]:
+        failures.append("the first edit reported the mesh as created/deleted")
+
+    if record["vertices"][5] != [11.0, 1.0, 1.0]:
+        failures.append("the cache does not hold the moved vertex")
+
+    if record.isSmooth is not True:
+        failures.append("the smooth shading was not read with the geometry (%s)" %record.isSmooth)
+
+    return failures
+
+def checkScopedCapture():
+    # A transform of the same selection as the previous operation only reads the selected vertices, their one-ring and
+    # the faces around them. What it reports and caches is the same as a full read of the mesh
+
+    failures = []
+    newScene()
+    grid = addMeshObject("Grid", *gridMesh(30))
+    setActiveObject(grid)
+    setObjectMode(grid, "EDIT")
+    startLogger()
+
+    selectVertices(grid, [100, 101])
+    selected, capture = perform("Select")
+
+    if capture.scope is not None:
+        failures.append("the selection was not read in bulk")
+
+    for label, indices, offset in (("first move", [100, 101], (0.0, 0.0, 1.0)), ("second move", [100, 101], (0.5, 0.0, 0.0))):
+        moveVertices(grid, indices, offset)
+        moved, capture = perform("Move")
+
+        if capture.scope is None:
+            failures.append("%s: the mesh was read in bulk" %label)
+
+        elif len(capture.coords) > 20:
+            failures.append("%s: %i vertices read for a selection of 2" %(label, len(capture.coords)))
+
+        if moved[1].get("selectedVertices") != indices:
+            failures.append("%s: moved vertices %s instead of %s" %(label, moved[1].get("selectedVertices"), indices))
+
+        checkMesh(failures, label, grid, moved)
+
+    # The steps keep the mesh they were translated with
+    if selected[1]["vertices"][100] != [7.0, 3.0, 0.0]:
+        failures.append("the mesh of the selection step changed with the next moves")
+
+    return failures
+
+def checkScopedFallback():
+    # The mesh is read in bulk when the operation can move unselected vertices (proportional editing) or when the
+    # selection changed since the last full read
+
+    failures = []
+    newScene()
+    grid = addMeshObject("Grid", *gridMesh(30))
+    setActiveObject(grid)
+    setObjectMode(grid, "EDIT")
+    startLogger()
+
+    selectVertices(grid, [200])
+    perform("Select")
+
+    # Proportional editing: the neighbours (outside the one-ring) move too
+    moveVertices(grid, [200, 202, 262])
+    moved, capture = perform("Move", proportional=True)
+
+    if capture.scope is not None:
+        failures.append("the move with proportional editing was scoped")
+
+    if moved[1].get("selectedVertices") != [200, 202, 262]:
+        failures.append("proportional editing reported the moved vertices %s" %moved[1].get("selectedVertices"))
+
+    checkMesh(failures, "proportional editing", grid, moved)
+
+    # Selection changed without a logged selection (same number of selected vertices)
+    selectVertices(grid, [300])
+    moveVertices(grid, [300])
+    moved, capture = perform("Move")
+
+    if capture.scope is not None:
+        failures.append("the move of another selection was scoped")
+
+    if moved[1].get("selectedVertices") != [300]:
+        failures.append("the move of another selection reported the moved vertices %s" %moved[1].get("selectedVertices"))
+
+    checkMesh(failures, "another selection", grid, moved)
+
+    return failures
+
+def checkUndoResync():
+    # An undo does not wait for the queued events: its resync is queued after them (frame scheduler here, without
+    # ticking it), and the operations after the undo are diffed against what the undo left
+
+    failures = []
+    newScene()
+    grid = addMeshObject("Grid", *gridMesh(10))
+    setActiveObject(grid)
+    setObjectMode(grid, "EDIT")
+    startLogger()
+
+    selectVertices(grid, [50])
+    perform("Select")
+
+    tut = loggerModal.Tutorial()
+    loggerModal.useLogger = True
+    loggerModal.startScheduler()
+
+    try:
+        moveVertices(grid, [50])
+        loggerModal.submitTranslation(loggerModal.captureOperation(types.SimpleNamespace(name="Move"), reports["Move"]), tut, None, False)
+
+        # Undo of the move
+        moveVertices(grid, [50], (0.0, 0.0, -1.0))
+        loggerModal.resyncCacheAfterUndo(None)
+
+        if len(loggerModal.schedulerTasks) != 2:
+            failures.append("the undo did not queue its resync after the move (%i tasks queued)" %len(loggerModal.schedulerTasks))
+
+        moveVertices(grid, [50], (0.5, 0.0, 0.0))
+        loggerModal.submitTranslation(loggerModal.captureOperation(types.SimpleNamespace(name="Move"), reports["Move"]), tut, None, False)
+        loggerModal.drainScheduler()
+
+    finally:
+        loggerModal.stopScheduler()
+        loggerModal.useLogger = False
+
+    moves = [step for step in tut.tutorialSteps if step[0] == "Move"]
+
+    if [step[1].get("selectedVertices") for step in moves] != [[50], [50]]:
+        failures.append("the moves reported %s instead of [50] each" %[step[1].get("selectedVertices") for step in moves])
+
+    elif moves[1][1]["vertices"][50] != [6.5, 4.0, 0.0]:
+        failures.append("the move after the undo was diffed against the mesh before the undo")
+
+    checkMesh(failures, "after the undo", grid, ["Move", {"vertices": moves[-1][1]["vertices"], "faces": moves[-1][1]["faces"]}])
+
+    return failures
+
+checks = {
+    "lazyRecord": checkLazyRecord,
+    "scopedCapture": checkScopedCapture,
+    "scopedFallback": checkScopedFallback,
+    "undoResync": checkUndoResync,
+}
+
+def runChecks(names = None, report = print):
+    # Runs the checks (all of them by default). Returns {name: list of failures}
+
+    results = {}
+
+    for name in names or list(checks):
+        results[name] = checks[name]()
+        report("%-16s %s" %(name, "ok" if not results[name] else "FAILED"))
+
+        for failure in results[name]:
+            report("    " + failure)
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline checks of the capture and translation of operations")
+    parser.add_argument("--only", default=None, help="Comma separated names of the checks to run (%s)" %", ".join(checks))
+    arguments = parser.parse_args()
+
+    results = runChecks(arguments.only.split(",") if arguments.only else None)
+    sys.exit(1 if any(results.values()) else 0)
@@ -0,0 +1,112 @@
+import os
+import sys
+import pstats
+
+# Converts a cProfile profile to collapsed stacks ("root;caller;function microseconds" per line), the input of
+# flamegraph.pl, speedscope, inferno... cProfile only keeps the caller -> callee edges, not the full stacks, so the
+# time of a function is split between the stacks it appears in by the share of its time that came from each caller.
+# The stacks start at the functions with time that did not come from any caller: the ones never called by a profiled
+# function, and the ones only called by functions that also call them back (exec and <module> call each other through
+# the imports in a profile of a whole script).
+#
+# Used by the logger profiling (loggerModal.py) and as an offline tool over existing .prof files:
+#
+# python ProfileStacks.py logger_profile.prof [<output file>]
+
+# Stacks deeper than this are cut, and the paths that carry less time than this (seconds) are not followed
+maxStackDepth = 64
+minStackTime = 1e-6
+# The time in the stacks should match the total time of the profile within this share (the recursive calls can be
+# counted a little more than once), otherwise the conversion is reported as wrong
+coverageTolerance = 0.1
+
+def functionLabel(function):
+    # (file, line, name) -> "name (file:line)", or the name for the built-ins
+
+    fileName, line, name = function
+
+    if fileName == "~":
+        return name.replace(";", ",")
+
+    return "%s (%s:%i)" %(name, os.path.basename(fileName), line)
+
+def collapseStacks(stats):
+    # {stack ("root;...;function"): self time of the function on this stack (seconds)} of a pstats.Stats
+
+    entries = stats.stats
+    callees = {}
+
+    for function, (cc, nc, tt, ct, callers) in entries.items():
+        for caller, edge in callers.items():
+            # edge[3] = time spent in function (and below) when called by caller
+            callees.setdefault(caller, []).append((function, edge[3]))
+
+    stacks = {}
+
+    def walk(function, path, labels, time):
+        # time = cumulative time of function that went through this path
+
+        ct = entries[function][3]
+        share = time / ct if ct > 0 else 0
+        labels = labels + (functionLabel(function),)
+        key = ";".join(labels)
+        stacks[key] = stacks.get(key, 0) + entries[function][2] * share
+
+        if len(labels) >= maxStackDepth:
+            return
+
+        for callee, edgeTime in callees.get(function, ()):
+            calleeTime = edgeTime * share
+
+            # Recursive calls are already counted in the time of the first call on the stack
+            if callee not in path and calleeTime >= minStackTime:
+                walk(callee, path | {callee}, labels, calleeTime)
+
+    for function, entry in entries.items():
+        # Time of the function not accounted for by its callers (all of it if it has none)
+        incoming = sum(edge[3] for caller, edge in entry[4].items() if caller != function)
+        rootTime = entry[3] - incoming
+
+        if not entry[4] or rootTime >= minStackTime:
+            walk(function, {function}, (), rootTime)
+
+    return stacks
+
+def stackCoverage(stacks, stats):
+    # Share of the total time of the profile found in the stacks (about 1 when every path was followed)
+
+    return sum(stacks.values()) / stats.total_tt if stats.total_tt > 0 else 1.0
+
+def writeCollapsedStacks(stats, path):
+    # Saves the stacks (microseconds, the most expensive first). Returns (number of stacks written, coverage),
+    # see stackCoverage
+
+    collapsed = collapseStacks(stats)
+    stacks = sorted(collapsed.items(), key=lambda item: item[1], reverse=True)
+    written = 0
+
+    with open(path, 'w') as file:
+        for stack, time in stacks:
+            microseconds = int(round(time * 1e6))
+
+            if microseconds > 0:
+                file.write("%s %i\n" %(stack, microseconds))
+                written += 1
+
+    return written, stackCoverage(collapsed, stats)
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print("Usage: python ProfileStacks.py <profile (.prof)> [<output file>]")
+        sys.exit(1)
+
+    inputPath = sys.argv[1]
+    outputPath = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(inputPath)[0] + ".collapsed.txt"
+
+    written, coverage = writeCollapsedStacks(pstats.Stats(inputPath), outputPath)
+    print("%s: %i stacks saved on %s (%.1f %% of the profiled time)" %(inputPath, written, outputPath, coverage * 100))
+
+    if abs(coverage - 1) > coverageTolerance:
+        print("Warning: the time of the stacks does not match the total time of the profile")
+        sys.exit(1)
@@ -0,0 +1,181 @@
+import os
+import sys
+
+from TutorialIO import readTutorial, formatStep, writeTutorial
+
+# Compaction of recorded sessions / tutorials. Recordings contain long runs of steps that carry no instructional value
+# but still cost a full mesh payload each (and the time of validateStep):
+# - selection steps that leave everything as it was -> dropped: in edit mode, the ones whose mesh is the same as in
+#   the previous step kept for the object (the next mesh step holds the result); in object mode, the ones with the
+#   same selected objects and active object as the previous kept step. A selection that does not record what it
+#   selected (node selections, clicks without selectedObjs...) picks what the next steps act on, so it is kept
+# - consecutive drags of the same transform on the same target (same object, mode and selection) along the same axis
+#   and in the same direction -> merged into a single step holding the total value and the final mesh state. Drags
+#   along different axes are kept apart: the user performs them one by one, and each one is validated against its own
+#   value (moving a vertex by (0, 1, 0) is not the merged (0, 1, 1))
+# The final mesh states are never changed: a step is only dropped if its mesh is the same as the one of the previous
+# step kept for the same object, and a merged step keeps the mesh of the last step of the run.
+#
+# Runs when a recording is stopped (loggerModal.py) and as an offline tool over existing tutorial files:
+#
+# python TutorialCompaction.py blenderProject/TUTDice.txt [<output file>]
+
+# Operations that only change what is selected
+selectionOperations = ("(De)select All", "Select Mode", "Select", "Select More", "Select Less", "Select Linked", "Select Linked All",
+                       "Select Loop", "Select Random", "Select Similar", "Box Select", "Circle Select", "Lasso Select",
+                       "Pick Shortest Path", "Checker Deselect", "Select All by Trait")
+
+# Keys of a step that mean that it changed the mesh
+geometryKeys = ("newVertices", "newFaces", "deletedVertices", "deletedFaces", "selectedVertices")
+
+def mergeMove(first, second):
+    return tuple(a + b for a, b in zip(first, second))
+
+def mergeResize(first, second):
+    return tuple(a * b for a, b in zip(first, second))
+
+def mergeRotate(first, second):
+    return first + second
+
+def sameMoveDirection(first, second, tolerance = 1e-6):
+    # Parallel translations pointing the same way (the cross product is null, relative to the lengths, and the dot
+    # product positive)
+
+    if len(first) != 3 or len(second) != 3:
+        return False
+
+    cross = (first[1] * second[2] - first[2] * second[1], first[2] * second[0] - first[0] * second[2],
+             first[0] * second[1] - first[1] * second[0])
+    dot = sum(a * b for a, b in zip(first, second))
+    lengths = (sum(a * a for a in first) * sum(b * b for b in second)) ** 0.5
+
+    return sum(value * value for value in cross) ** 0.5 <= tolerance * lengths and dot > 0
+
+def sameResizeDirection(first, second):
+    # Each axis is left as it is by both, or scaled up by both, or scaled down by both (no mirroring)
+
+    if len(first) != len(second):
+        return False
+
+    for a, b in zip(first, second):
+        if a <= 0 or b <= 0 or (a > 1) != (b > 1) or (a < 1) != (b < 1):
+            return False
+
+    return True
+
+def sameRotateDirection(first, second):
+    # Same way around the axis (the axis itself is compared with the props)
+    return first * second > 0
+
+# How the "value" of two consecutive transforms is combined, whether two values go along the same axis and in the
+# same direction, and the props that must be the same to merge them
+transformOperations = {
+    "Move": (mergeMove, sameMoveDirection, ("orient_type", "orient_axis_ortho")),
+    "Resize": (mergeResize, sameResizeDirection, ("orient_type",)),
+    "Rotate": (mergeRotate, sameRotateDirection, ("orient_type", "orient_axis")),
+}
+
+def canMerge(previous, step):
+    # Same transform, on the same object, in the same mode and on the same selection, along the same axis and direction
+
+    if step[0] != previous[0] or step[0] not in transformOperations or step[2] != previous[2]:
+        return False
+
+    props, previousProps = step[1], previous[1]
+
+    if type(props) != dict or type(previousProps) != dict or "value" not in props or "value" not in previousProps:
+        return False
+
+    if type(props["value"]) != type(previousProps["value"]):
+        return False
+
+    for key in ("editMode", "selectedObjs") + transformOperations[step[0]][2]:
+        if props.get(key) != previousProps.get(key):
+            return False
+
+    if props.get("editMode") and sorted(props.get("selectedVertices", [])) != sorted(previousProps.get("selectedVertices", [])):
+        return False
+
+    try:
+        return transformOperations[step[0]][1](previousProps["value"], props["value"])
+
+    except TypeError:
+        # Values that are not numbers (not written by the translator)
+        return False
+
+def mergeSteps(previous, step):
+    # The merged step is the last one (final transform / mesh state) with the total value
+
+    merge = transformOperations[step[0]][0]
+    props = dict(step[1])
+    props["value"] = merge(previous[1]["value"], step[1]["value"])
+
+    return [step[0], props] + step[2:]
+
+def isNoOpStep(step, lastMesh, previous):
+    # True for a selection step that left everything as it was. lastMesh = props of the last kept step with the mesh
+    # of the object of the step, previous = last kept step (None if there is none)
+
+    props = step[1]
+
+    if step[0] not in selectionOperations or type(props) != dict:
+        return False
+
+    if any(key in props for key in geometryKeys):
+        return False
+
+    if "vertices" in props:
+        return lastMesh is not None and lastMesh.get("vertices") == props["vertices"] and lastMesh.get("faces") == props.get("faces")
+
+    if props.get("editMode") or "selectedObjs" not in props:
+        # Nothing tells what was selected
+        return False
+
+    return (previous is not None and len(previous) >= 3 and type(previous[1]) == dict and previous[2] == step[2]
+            and previous[1].get("selectedObjs") == props["selectedObjs"])
+
+def compactSteps(steps):
+    # Returns (compacted steps, {"dropped": number of no-op steps dropped, "merged": number of steps merged into the previous})
+
+    compacted = []
+    lastMeshes = {} # {object name: props of the last kept step with its mesh}
+    stats = {"dropped": 0, "merged": 0}
+
+    for step in steps:
+        if len(step) < 3:
+            compacted.append(step)
+            continue
+
+        if isNoOpStep(step, lastMeshes.get(step[2]), compacted[-1] if compacted else None):
+            stats["dropped"] += 1
+            continue
+
+        if compacted and len(compacted[-1]) >= 3 and canMerge(compacted[-1], step):
+            step = mergeSteps(compacted[-1], step)
+            compacted[-1] = step
+            stats["merged"] += 1
+
+        else:
+            compacted.append(step)
+
+        if type(step[1]) == dict and "vertices" in step[1]:
+            lastMeshes[step[2]] = step[1]
+
+    return compacted, stats
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print("Usage: python TutorialCompaction.py <tutorial file> [<output file>]")
+        sys.exit(1)
+
+    inputPath = sys.argv[1]
+    outputPath = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(inputPath)[0] + "_compacted.txt"
+
+    steps = readTutorial(inputPath)
+    compacted, stats = compactSteps(steps)
+    lines = [formatStep(step) for step in compacted]
+    writeTutorial(outputPath, lines)
+
+    print("%s: %i -> %i steps (%i dropped, %i merged), %.1f KB -> %.1f KB, saved on %s" %(inputPath, len(steps), len(compacted),
+          stats["dropped"], stats["merged"], os.path.getsize(inputPath) / 1024, os.path.getsize(outputPath) / 1024, outputPath))
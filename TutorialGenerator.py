@@ -0,0 +1,428 @@
+import os
+import json
+import math
+import argparse
+
+import numpy as np
+
+import BpyStandIn
+from TutorialIO import iterateTutorial, writeSteps
+
+# Synthetic tutorials and user sessions for scale testing. The tutorials of blenderProject have a few dozen steps and
+# meshes of a few hundred vertices, these can have tens of thousands of steps and meshes of up to millions of vertices.
+# Both are written in the tutorial format (one step per line, see TutorialIO.py) and streamed, so they never have to be
+# held in memory.
+#
+# python TutorialGenerator.py tutorial TUTSynthetic.txt --steps 10000 --vertices 100000 --mesh-every 50
+# python TutorialGenerator.py session TUTSynthetic.txt logger_logSynthetic.txt --deviations wrong=0.05,skip=0.02
+#
+# Tutorials: a grid mesh is edited by a mix of operations of operatorsDict (transforms of a selection of vertices,
+# steps that add or delete vertices/faces, object mode operations), with "Toggle Edit Mode" steps in between as
+# recorded by the logger. The coordinates can be slightly noisy, as real recordings are.
+# Sessions: the steps of a tutorial as a user would perform them, with deviations at the given rates (wrong operation,
+# skipped step, values out of the tolerance...). The deviations are listed in <session>_deviations.json.
+
+BpyStandIn.install()
+
+from loggerModal import operatorsDict
+
+# Operations of operatorsDict by the kind of step generated for them
+transformOperations = [name for name in ("Move", "Resize", "Rotate") if name in operatorsDict]
+growOperations = [name for name in ("Extrude Region and Move", "Subdivide", "Inset Faces") if name in operatorsDict]
+shrinkOperations = [name for name in ("Delete", "Merge by Distance") if name in operatorsDict]
+editOperations = [name for name in ("Recalculate Normals", "(De)select All", "Shade Smooth", "Shade Flat") if name in operatorsDict]
+objectOperations = [name for name in operatorsDict if name not in transformOperations + growOperations + shrinkOperations
+                    + ["Toggle Edit Mode", "(De)select All", "Run Script", "Delete", "Recalculate Normals"]]
+
+# Share of the steps of each kind
+defaultMix = {"transform": 0.5, "topology": 0.1, "edit": 0.1, "object": 0.3}
+
+# Props that hold indices (never noisy)
+indexProps = ("selectedVertices", "newVertices", "newFaces", "deletedVertices", "deletedFaces")
+
+#####################################################################################################################################
+########################################################### Mesh ####################################################################
+
+class SyntheticMesh:
+    # Vertices (n x 3) and quads (m x 4 vertex indices) of the mesh being edited. As in the logger, new vertices/faces
+    # are appended and deleted ones are removed from the end
+
+    def __init__(self, vertexCount, generator):
+        side = max(2, int(round(math.sqrt(vertexCount))))
+        x, y = np.meshgrid(np.linspace(-1, 1, side), np.linspace(-1, 1, side))
+        z = 0.1 * np.sin(3 * x) * np.cos(3 * y)
+
+        self.coords = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+        corners = np.arange(side * side).reshape(side, side)[:-1, :-1].ravel()
+        self.faces = np.stack([corners, corners + 1, corners + side + 1, corners + side], axis=1)
+        self.generator = generator
+
+    def faceCenters(self):
+        return self.coords[self.faces].mean(axis=1)
+
+    def select(self, size):
+        # A block of consecutive vertices
+        size = max(1, min(size, len(self.coords)))
+        start = int(self.generator.integers(0, len(self.coords) - size + 1))
+        return np.arange(start, start + size)
+
+    def grow(self, selection, offset):
+        # Copies of the selected vertices moved by offset, joined to them by quads
+
+        count, faceCount = len(self.coords), len(self.faces)
+        newIndices = np.arange(count, count + len(selection))
+        self.coords = np.concatenate([self.coords, self.coords[selection] + offset])
+        self.faces = np.concatenate([self.faces, np.stack([selection[:-1], selection[1:], newIndices[1:], newIndices[:-1]], axis=1)])
+
+        return list(range(count, len(self.coords))), list(range(faceCount, len(self.faces)))
+
+    def shrink(self, count):
+        # Removes the last count vertices and the faces using them
+
+        oldCount, oldFaceCount = len(self.coords), len(self.faces)
+        count = min(count, oldCount - 4)
+        self.coords = self.coords[:oldCount - count]
+        self.faces = self.faces[np.all(self.faces < len(self.coords), axis=1)]
+
+        return list(range(len(self.coords), oldCount)), list(range(len(self.faces), oldFaceCount))
+
+    def payload(self, noise = 0.0):
+        # {"vertices": {index: [x, y, z]}, "faces": {index: center}} as saved by the logger, with a relative noise
+
+        coords, centers = self.coords, self.faceCenters()
+
+        if noise:
+            coords = coords * (1 + self.generator.uniform(-noise, noise, coords.shape))
+            centers = centers * (1 + self.generator.uniform(-noise, noise, centers.shape))
+
+        return {"vertices": dict(enumerate(coords.tolist())), "faces": dict(enumerate(centers.tolist()))}
+
+#####################################################################################################################################
+######################################################### Tutorials #################################################################
+
+def rounded(values):
+    return tuple(round(float(value), 5) for value in values)
+
+def generateTutorial(steps = 1000, vertices = 1000, mix = None, meshEvery = 1, selection = 64, noise = 0.0, tolerance = 10,
+                     objectName = "Grid", seed = 0):
+    # Yields the steps of a synthetic tutorial.
+    # mix = share of each kind of step (see defaultMix), meshEvery = the mesh is saved on 1 of meshEvery edit mode steps
+    # (it always is when entering edit mode, as the logger does; with big meshes this sets the size of the file),
+    # selection = vertices moved or added by a step, noise = relative noise of the saved coordinates. The mesh
+    # validation pairs each vertex with the closest one within the tolerance, so the noise has to stay well below the
+    # distance between vertices (e.g. 0.001 for a mesh of a few thousand vertices)
+
+    generator = np.random.default_rng(seed)
+    mix = dict(defaultMix if mix is None else mix)
+    kinds = list(mix.keys())
+    shares = np.array([mix[kind] for kind in kinds], dtype=np.float64)
+    shares /= shares.sum()
+
+    mesh = SyntheticMesh(vertices, generator)
+    additionalInfo = {"tolerance": tolerance}
+    location, scale, rotation = np.zeros(3), np.ones(3), np.zeros(3)
+    editMode = False
+    editSteps = 0
+    produced = 0
+
+    def step(name, props, withMesh = False):
+        props["editMode"] = editMode
+        if withMesh:
+            props.update(mesh.payload(noise))
+        return [name, props, objectName, dict(additionalInfo)]
+
+    yield step("Add Grid", {"x_subdivisions": int(math.sqrt(len(mesh.coords))), "size": 2, "newlocation": [0.0, 0.0, 0.0]})
+    produced += 1
+
+    while produced < steps:
+        kind = kinds[generator.choice(len(kinds), p=shares)]
+
+        # Transforms are done in the current mode. The other kinds need a mode, which is mostly kept for a while
+        # (as a user does): most of the steps that would need a toggle are drawn again
+        needsEdit = kind in ("topology", "edit") or (kind == "transform" and editMode)
+
+        if needsEdit != editMode and generator.random() < 0.9:
+            continue
+
+        if needsEdit != editMode:
+            editMode = not editMode
+            yield step("Toggle Edit Mode", {}, editMode)
+            produced += 1
+            continue
+
+        withMesh = editMode and editSteps % meshEvery == 0
+
+        if kind == "transform":
+            name = transformOperations[generator.integers(len(transformOperations))]
+
+            if editMode:
+                editSteps += 1
+                selected = mesh.select(selection)
+                center = mesh.coords[selected].mean(axis=0)
+
+                if name == "Move":
+                    value = rounded(generator.uniform(-1, 1, 3))
+                    mesh.coords[selected] += value
+                    props = {"value": value, "orient_axis_ortho": "X"}
+
+                elif name == "Resize":
+                    value = rounded([generator.uniform(0.5, 1.5)] * 3)
+                    mesh.coords[selected] = center + (mesh.coords[selected] - center) * value
+                    props = {"value": value, "orient_type": "GLOBAL"}
+
+                else:
+                    value = round(float(generator.uniform(-math.pi, math.pi)), 5)
+                    cos, sin = math.cos(value), math.sin(value)
+                    relative = mesh.coords[selected] - center
+                    mesh.coords[selected] = center + relative @ np.array([[cos, sin, 0], [-sin, cos, 0], [0, 0, 1]])
+                    props = {"value": value, "orient_axis": "Z"}
+
+                props["selectedVertices"] = selected.tolist()
+
+            else:
+                if name == "Move":
+                    value = rounded(generator.uniform(-5, 5, 3))
+                    location += value
+                    props = {"value": value, "orient_axis_ortho": "X", "newlocation": location.tolist()}
+
+                elif name == "Resize":
+                    value = rounded([generator.uniform(0.5, 1.5)] * 3)
+                    scale *= value
+                    props = {"value": value, "orient_type": "GLOBAL", "newscale": scale.tolist()}
+
+                else:
+                    value = round(float(generator.uniform(-math.pi, math.pi)), 5)
+                    rotation[0] += value
+                    props = {"value": value, "orient_axis": "X", "newrotation": rotation.tolist()}
+
+            yield step(name, props, withMesh)
+
+        elif kind == "topology":
+            editSteps += 1
+
+            if generator.random() < 0.6 or len(mesh.coords) < 2 * selection:
+                name = growOperations[generator.integers(len(growOperations))]
+                offset = rounded([0, 0, generator.uniform(0.1, 0.5)])
+                newVertices, newFaces = mesh.grow(mesh.select(selection), offset)
+                props = {"value": offset} if name == "Extrude Region and Move" else {}
+                props.update({"newVertices": newVertices, "newFaces": newFaces})
+
+            else:
+                name = shrinkOperations[generator.integers(len(shrinkOperations))]
+                deletedVertices, deletedFaces = mesh.shrink(selection)
+                props = {"type": "VERT"} if name == "Delete" else {}
+                props.update({"deletedVertices": deletedVertices, "deletedFaces": deletedFaces})
+
+            yield step(name, props, withMesh)
+
+        elif kind == "edit":
+            editSteps += 1
+            name = editOperations[generator.integers(len(editOperations))]
+            yield step(name, {"action": "SELECT"} if name == "(De)select All" else {}, withMesh)
+
+        else:
+            name = objectOperations[generator.integers(len(objectOperations))]
+            yield step(name, {"type": "SUBSURF"} if name == "Add Modifier" else {})
+
+        produced += 1
+
+#####################################################################################################################################
+########################################################## Sessions #################################################################
+
+# Rate of each deviation of a user session
+defaultDeviations = {"wrong": 0.05, "skip": 0.0, "repeat": 0.02, "extraSelection": 0.05, "offTolerance": 0.02}
+
+def perturb(value, amount, generator, meshAmount = 0.0):
+    # Multiplies the floats of the value by (1 +- amount), keeping its structure. Indices are not changed and the
+    # coordinates of the meshes use meshAmount
+
+    valueType = type(value)
+
+    if valueType is float:
+        return value * (1 + generator.uniform(-amount, amount))
+
+    elif valueType is list or valueType is tuple:
+        return valueType(perturb(item, amount, generator) for item in value)
+
+    elif valueType is dict:
+        result = {}
+        for key, item in value.items():
+            if key in indexProps:
+                result[key] = item
+
+            elif key in ("vertices", "faces") and type(item) == dict:
+                if meshAmount and item:
+                    coords = np.array(list(item.values()), dtype=np.float64)
+                    coords *= 1 + generator.uniform(-meshAmount, meshAmount, coords.shape)
+                    item = dict(zip(item.keys(), coords.tolist()))
+                result[key] = item
+
+            else:
+                result[key] = perturb(item, amount, generator, meshAmount)
+
+        return result
+
+    return value
+
+def scaleValue(value, factor):
+    # Multiplies the numbers of the value by factor, keeping its structure
+
+    if type(value) in (list, tuple):
+        return type(value)(scaleValue(item, factor) for item in value)
+
+    elif type(value) in (int, float):
+        return value * factor
+
+    return value
+
+def offTolerance(props, tolerance):
+    # Props with the value and a tenth of the vertices moved out of the tolerance
+
+    result = dict(props)
+    factor = 1 + 3 * tolerance / 100
+
+    if "value" in result:
+        result["value"] = scaleValue(result["value"], factor)
+
+    if type(result.get("vertices")) == dict and result["vertices"]:
+        keys = list(result["vertices"].keys())
+        moved = set(keys[:max(1, len(keys) // 10)])
+        result["vertices"] = {key: ([coord * factor + factor for coord in coords] if key in moved else coords)
+                              for key, coords in result["vertices"].items()}
+
+    return result
+
+def generateSession(tutorialSteps, deviations = None, noise = 0.5, meshNoise = 0.0, seed = 0):
+    # Yields (step, deviation) for the steps of a user following the tutorial (iterable of steps).
+    # deviations = rate of each deviation (see defaultDeviations), deviation is None for a step performed as in the
+    # tutorial (with a relative noise of noise * tolerance on the values and meshNoise on the coordinates). The deviations:
+    # - wrong: another operation is performed first, then the step (as a user who notices the mistake)
+    # - skip: the step is not performed (only the mesh steps can be recovered from, by the look-ahead of the validation,
+    #   so the skips are not in the default deviations)
+    # - repeat: the step is performed twice
+    # - extraSelection: a selection that the tutorial does not ask for is performed before the step
+    # - offTolerance: the step is performed with values out of the tolerance first, then within it
+
+    generator = np.random.default_rng(seed)
+    deviations = dict(defaultDeviations if deviations is None else deviations)
+    names = list(operatorsDict.keys())
+
+    for index, step in enumerate(tutorialSteps):
+        tolerance = step[-1].get("tolerance", 10) if type(step[-1]) == dict else 10
+        props = step[1] if type(step[1]) == dict else {}
+        performed = [step[0], perturb(props, noise * tolerance / 100, generator, meshNoise)] + step[2:]
+        draw = generator.random()
+        deviation = None
+
+        for kind, rate in deviations.items():
+            if draw < rate:
+                deviation = kind
+                break
+            draw -= rate
+
+        if deviation == "skip":
+            yield None, {"step": index, "deviation": deviation}
+            continue
+
+        elif deviation == "wrong":
+            name = names[generator.integers(len(names))]
+            if name == step[0]:
+                name = names[(names.index(name) + 1) % len(names)]
+            yield [name] + performed[1:], {"step": index, "deviation": deviation}
+
+        elif deviation == "offTolerance":
+            yield [step[0], offTolerance(props, tolerance)] + step[2:], {"step": index, "deviation": deviation}
+
+        elif deviation == "extraSelection":
+            selection = {"action": "SELECT", "editMode": props.get("editMode", False)}
+            yield ["(De)select All", selection] + step[2:], {"step": index, "deviation": deviation}
+
+        yield performed, {"step": index, "deviation": None}
+
+        if deviation == "repeat":
+            yield performed, {"step": index, "deviation": deviation}
+
+def writeSession(tutorialPath, sessionPath, deviations = None, noise = 0.5, meshNoise = 0.0, seed = 0):
+    # Writes the session of the tutorial and <session>_deviations.json: one {"line", "step", "deviation"} per line
+    # of the session, plus the skipped steps (without line). Returns the list of deviations
+
+    records = []
+    lines = 0
+
+    def performedSteps():
+        nonlocal lines
+        for performed, record in generateSession(iterateTutorial(tutorialPath), deviations, noise, meshNoise, seed):
+            if performed is not None:
+                record["line"] = lines
+                lines += 1
+                yield performed
+            records.append(record)
+
+    with open(sessionPath, 'w') as file:
+        writeSteps(file, performedSteps())
+
+    with open(os.path.splitext(sessionPath)[0] + "_deviations.json", 'w') as file:
+        json.dump(records, file, indent=1)
+
+    return records
+
+def parseRates(text, defaults):
+    # "wrong=0.1,skip=0" -> {"wrong": 0.1, "skip": 0, ...}
+    rates = dict(defaults)
+
+    for item in filter(None, (text or "").split(",")):
+        key, _, value = item.partition("=")
+        if key not in defaults:
+            raise ValueError("unknown key: " + key)
+        rates[key] = float(value)
+
+    return rates
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic tutorials and user sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    tutorialParser = commands.add_parser("tutorial", help="Writes a synthetic tutorial")
+    tutorialParser.add_argument("output")
+    tutorialParser.add_argument("--steps", type=int, default=1000)
+    tutorialParser.add_argument("--vertices", type=int, default=1000, help="Vertices of the initial mesh")
+    tutorialParser.add_argument("--mix", default="", help="Share of each kind of step, e.g. transform=0.5,topology=0.2,edit=0.1,object=0.2")
+    tutorialParser.add_argument("--mesh-every", type=int, default=1, help="Save the mesh on 1 of N edit mode steps")
+    tutorialParser.add_argument("--selection", type=int, default=64, help="Vertices changed by each edit mode step")
+    tutorialParser.add_argument("--noise", type=float, default=0.0, help="Relative noise of the coordinates")
+    tutorialParser.add_argument("--tolerance", type=int, default=10)
+    tutorialParser.add_argument("--seed", type=int, default=0)
+
+    sessionParser = commands.add_parser("session", help="Writes a user session following a tutorial")
+    sessionParser.add_argument("tutorial")
+    sessionParser.add_argument("output")
+    sessionParser.add_argument("--deviations", default="", help="Rate of each deviation, e.g. wrong=0.1,skip=0.05,repeat=0,extraSelection=0,offTolerance=0")
+    sessionParser.add_argument("--noise", type=float, default=0.5, help="Relative noise of the values, as a fraction of the tolerance")
+    sessionParser.add_argument("--mesh-noise", type=float, default=0.0, help="Relative noise of the coordinates")
+    sessionParser.add_argument("--seed", type=int, default=0)
+
+    arguments = parser.parse_args()
+
+    try:
+        mix = parseRates(getattr(arguments, "mix", ""), defaultMix)
+        deviations = parseRates(getattr(arguments, "deviations", ""), defaultDeviations)
+
+    except ValueError as error:
+        parser.error(str(error))
+
+    if arguments.command == "tutorial":
+
+        with open(arguments.output, 'w') as file:
+            writeSteps(file, generateTutorial(arguments.steps, arguments.vertices, mix, max(1, arguments.mesh_every), arguments.selection,
+                                              arguments.noise, arguments.tolerance, seed=arguments.seed))
+
+        print("Saved %i steps on %s (%.1f MB)" %(arguments.steps, arguments.output, os.path.getsize(arguments.output) / (1024 * 1024)))
+
+    else:
+        records = writeSession(arguments.tutorial, arguments.output, deviations, arguments.noise, arguments.mesh_noise, arguments.seed)
+        counts = {}
+        for record in records:
+            if record["deviation"] is not None:
+                counts[record["deviation"]] = counts.get(record["deviation"], 0) + 1
+
+        print("Saved %i steps on %s, deviations: %s" %(sum(1 for record in records if "line" in record), arguments.output, counts or "none"))
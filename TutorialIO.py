@@ -0,0 +1,331 @@
+import os
+import sys
+import time
+import threading
+from itertools import chain
+from collections.abc import Mapping
+
+from UniversalTranslator import parseValue, ReportSyntaxError
+
+# Reading and writing of the recorded sessions and tutorials. A tutorial file has one step per line:
+#
+# ['Move', {'value': (0, 0, 1), 'editMode': False}, 'Cube', {'tolerance': 10}]
+#
+# The steps are written as Python literals (lists, dicts, tuples, sets, strings, numbers, True/False/None) and read back
+# with the report parser of UniversalTranslator.py, so loading a tutorial never needs eval.
+#
+# This module has no dependency on bpy, so the tools can be run outside of Blender:
+#
+# python TutorialIO.py recover logger_log.journal TUTRecovered.txt
+# python TutorialIO.py benchmark
+
+#####################################################################################################################################
+########################################################## Serializer ###############################################################
+
+def isLiteral(value):
+    # True if the value only holds lists, tuples, dicts, sets and literals (str, int, float, bool, None). Then its repr
+    # can be read back by the parser, and being done in C it is the fastest way to write it. The most common payload,
+    # {index: [x, y, z]}, is checked without looping in Python
+
+    valueType = type(value)
+
+    if valueType in literalTypes:
+        return True
+
+    elif valueType is list or valueType is tuple or valueType is set or valueType is frozenset:
+        items = value
+
+    elif valueType is dict:
+        if not literalTypes.issuperset(map(type, value)):
+            return False
+        items = value.values()
+
+    else:
+        return False
+
+    itemTypes = set(map(type, items))
+
+    if literalTypes.issuperset(itemTypes):
+        return True
+
+    elif sequenceTypes.issuperset(itemTypes) and literalTypes.issuperset(map(type, chain.from_iterable(items))):
+        return True
+
+    return all(map(isLiteral, items))
+
+def writeValue(value, write):
+    # Writes the value through write(text) in a single pass over the structure. The separators are written before every
+    # item but the first, so the output is linear in the size of the value and equal items are separated as any other.
+    # Values holding something else than literals (e.g. NumPy numbers, mappings) are converted to the equivalent Python values
+
+    if isLiteral(value):
+        write(repr(value))
+        return
+
+    valueType = type(value)
+
+    if valueType is list or valueType is tuple:
+        write("[" if valueType is list else "(")
+        for i, item in enumerate(value):
+            if i:
+                write(", ")
+            writeValue(item, write)
+        write("]" if valueType is list else (",)" if len(value) == 1 else ")"))
+
+    elif valueType is dict:
+        write("{")
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                write(", ")
+            writeValue(key, write)
+            write(": ")
+            writeValue(item, write)
+        write("}")
+
+    elif valueType is set or valueType is frozenset:
+        write("{")
+        for i, item in enumerate(value):
+            if i:
+                write(", ")
+            writeValue(item, write)
+        write("}")
+
+    elif hasattr(value, "tolist") and hasattr(value, "dtype"):
+        # NumPy scalars/arrays
+        writeValue(value.tolist(), write)
+
+    elif isinstance(value, Mapping):
+        # Other mappings (the meshes of the translated steps) are written as dicts
+        writeValue(dict(value.items()), write)
+
+    else:
+        write(repr(value))
+
+# Types whose repr can be read back by the parser as is
+literalTypes = frozenset((str, int, float, bool, type(None)))
+sequenceTypes = frozenset((list, tuple))
+
+def formatStep(step):
+    # Returns the step as a tutorial line (without the line break)
+
+    parts = []
+    writeValue(step, parts.append)
+
+    return "".join(parts)
+
+def writeSteps(file, steps):
+    # Streams the steps to an open file, one line per step
+
+    for step in steps:
+        parts = []
+        writeValue(step, parts.append)
+        parts.append("\n")
+        file.write("".join(parts))
+
+def readTutorial(path):
+    # Reads the steps of a tutorial file (one step per line), without eval
+
+    return list(iterateTutorial(path))
+
+def iterateTutorial(path):
+    # Yields the steps of a tutorial file one at a time, so a big tutorial does not have to be held in memory
+
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+
+            if line:
+                yield parseValue(line)
+
+#####################################################################################################################################
+######################################################## Session Journal ############################################################
+
+class SessionJournal:
+    # Append-only journal of a recording session. Each step is written as a tutorial line as soon as it is produced,
+    # so a crash loses at most the last batch and stopping the logger does not have to serialize the whole session.
+    # - the lines are written to the file in batches (every flushSteps steps or flushInterval seconds)
+    # - the file is fsynced at most every fsyncInterval seconds, and always when the journal is closed
+    # Steps are appended by the translation worker while the main thread can flush it, so the buffer is behind a lock
+
+    flushSteps = 8
+    flushInterval = 0.5
+    fsyncInterval = 5.0
+
+    def __init__(self, path, serialize = formatStep):
+        self.path = path
+        self.serialize = serialize
+        self.file = open(path, 'w')
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.steps = 0
+        self.lastFlush = time.monotonic()
+        self.lastSync = self.lastFlush
+
+    def append(self, step):
+        line = self.serialize(step) + '\n'
+
+        with self.lock:
+            self.buffer.append(line)
+            self.steps += 1
+
+            if len(self.buffer) >= self.flushSteps or time.monotonic() - self.lastFlush >= self.flushInterval:
+                self.flushBuffer()
+
+    def flushIfDue(self):
+        # Called periodically, so the last steps of a batch are not left in the buffer when the user stops acting
+
+        with self.lock:
+            if self.buffer and time.monotonic() - self.lastFlush >= self.flushInterval:
+                self.flushBuffer()
+
+    def flushBuffer(self, sync = False):
+        # Must be called with the lock held
+
+        if self.file is None:
+            return
+
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer.clear()
+
+        self.file.flush()
+        now = time.monotonic()
+        self.lastFlush = now
+
+        if sync or now - self.lastSync >= self.fsyncInterval:
+            os.fsync(self.file.fileno())
+            self.lastSync = now
+
+    def close(self):
+        # Writes what is left, syncs it to disk and closes the file. Returns the number of steps journaled
+
+        with self.lock:
+            self.flushBuffer(sync=True)
+
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+        return self.steps
+
+def recoverJournal(path):
+    # Reads a journal that may have been cut off (e.g. Blender crashed while writing it).
+    # Returns (valid lines, number of discarded lines): a line is valid if it is a complete step, the unreadable ones
+    # (usually only the last, partially written, line) are discarded
+
+    lines = []
+    discarded = 0
+
+    with open(path, 'r', errors='replace') as file:
+        for line in file:
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                step = parseValue(line)
+
+            except (ReportSyntaxError, RecursionError):
+                discarded += 1
+                continue
+
+            if type(step) != list or len(step) == 0 or type(step[0]) != str:
+                discarded += 1
+                continue
+
+            lines.append(line)
+
+    return lines, discarded
+
+def writeTutorial(path, lines):
+    # Writes the tutorial lines to path, replacing the file only once it is completely written
+
+    tempPath = path + ".tmp"
+
+    with open(tempPath, 'w') as file:
+        file.write("".join(line + '\n' for line in lines))
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tempPath, path)
+
+#####################################################################################################################################
+######################################################## Benchmark ##################################################################
+
+def legacyFormatListAsString(my_list):
+    # Previous serializer of loggerModal.py, kept only to benchmark against it
+
+    result = "["
+
+    for item in my_list:
+        if isinstance(item, list):
+            result += legacyFormatListAsString(item)
+        else:
+            result += repr(item)
+
+        if item != my_list[-1]:
+            result += ", "
+
+    result += "]"
+    return result
+
+def benchmark():
+    import glob
+    import timeit
+
+    tutorialsPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blenderProject")
+
+    steps = []
+    for path in sorted(glob.glob(os.path.join(tutorialsPath, "TUT*.txt"))):
+        steps += readTutorial(path)
+
+    # Repeating the tutorials of the project until around 1 MB of text
+    size = sum(len(formatStep(step)) + 1 for step in steps)
+    steps = steps * max(1, int(1024 * 1024 / size))
+    text = "".join(formatStep(step) + "\n" for step in steps)
+
+    roundTrip = [parseValue(line) for line in text.splitlines()] == steps
+
+    newTime = timeit.timeit(lambda: [formatStep(step) for step in steps], number=3) / 3
+    oldTime = timeit.timeit(lambda: [legacyFormatListAsString(step) for step in steps], number=3) / 3
+    readTime = timeit.timeit(lambda: [parseValue(line) for line in text.splitlines()], number=3) / 3
+    evalTime = timeit.timeit(lambda: [eval(line) for line in text.splitlines()], number=3) / 3
+
+    print("%i steps, %.2f MB | round trip: %s" %(len(steps), len(text) / (1024 * 1024), roundTrip))
+    print("write: format_list_as_string %8.2f ms | writeValue %8.2f ms" %(oldTime * 1000, newTime * 1000))
+    print("read:  eval                  %8.2f ms | parseValue %8.2f ms" %(evalTime * 1000, readTime * 1000))
+
+    # Steps with repeated items (e.g. the same vertex list selected twice): the old serializer deep compared every item
+    # with the last one, and dropped the comma between equal items
+    for repeat in [100, 400, 1600]:
+        step = ["Select", [[[0.5, 0.5, 0.5] for j in range(50)] for i in range(repeat)], "Cube"]
+
+        newTime = timeit.timeit(lambda: formatStep(step), number=3) / 3
+        oldTime = timeit.timeit(lambda: legacyFormatListAsString(step), number=3) / 3
+
+        try:
+            oldValid = parseValue(legacyFormatListAsString(step)) == step
+        except ReportSyntaxError:
+            oldValid = False
+
+        print("%5i repeated items: format_list_as_string %8.2f ms (readable: %s) | writeValue %8.2f ms (readable: %s)" %(repeat,
+              oldTime * 1000, oldValid, newTime * 1000, parseValue(formatStep(step)) == step))
+
+if __name__ == "__main__":
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "benchmark":
+        benchmark()
+        sys.exit(0)
+
+    if len(sys.argv) < 3 or sys.argv[1] != "recover":
+        print("Usage: python TutorialIO.py recover <journal file> [<tutorial file>] | python TutorialIO.py benchmark")
+        sys.exit(1)
+
+    journalPath = sys.argv[2]
+    tutorialPath = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(journalPath)[0] + "_recovered.txt"
+
+    lines, discarded = recoverJournal(journalPath)
+    writeTutorial(tutorialPath, lines)
+
+    print("Recovered %i steps (%i unreadable lines discarded) into %s" %(len(lines), discarded, tutorialPath))
@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+
+import numpy as np
+
+import BpyStandIn
+
+# Headless replay of a recorded log against a tutorial: every step of the log goes through the same validation and user
+# profile update as a live session (loggerModal.validateTranslation -> Tutorial.validateStep, userModel), without
+# anyone clicking in Blender. Used as a regression harness (the verdicts of a log should not change) and as a load
+# generator (throughput and latency of the validation).
+#
+# python TutorialReplay.py blenderProject/TUTDice.txt blenderProject/TUTDice.txt
+# python TutorialReplay.py blenderProject/logger_logTutTeste.txt blenderProject/TUTDonutOLD.txt
+# python TutorialReplay.py logger_logSynthetic.txt TUTSynthetic.txt --repeat 5 --output replay.json
+# blender --background --python TutorialReplay.py -- <log> <tutorial>
+#
+# Outside of Blender, the bpy stand-in is used (BpyStandIn.py). The scene is replaced by the cache: before each step
+# is validated, the mesh saved in the step (if any) is put on the cache, as the logger would have captured it.
+# The recommendations need termWeights.txt in the folder of the .blend file (blenderProject outside of Blender,
+# --blend-dir to change it). If the log has a <log>_deviations.json (TutorialGenerator.py), the verdicts are also
+# counted by deviation.
+# A step that raises is counted as an error (not a verdict), and the exit code is 1 if there was any.
+
+BpyStandIn.install()
+
+import loggerModal
+from loggerModal import Tutorial, userModel, validateTranslation, getObjectsOnCache, saveObjectsOnCache, \
+    saveObjectTransformOnCache, saveObjectVerticesOnCache, saveObjectFacesOnCache
+from TutorialIO import iterateTutorial, readTutorial
+
+def loadStepOnCache(step):
+    # Puts the state of the object of the step on the cache (the mesh, when the step has it)
+
+    objName, props = step[2], step[1]
+
+    if objName is None or type(props) != dict:
+        return
+
+    if objName not in getObjectsOnCache():
+        saveObjectTransformOnCache(objName, objProps={"scale": [1, 1, 1], "location": [0, 0, 0], "rotation": [0, 0, 0]})
+
+    if type(props.get("vertices")) == dict:
+        saveObjectVerticesOnCache(props["vertices"], objName)
+
+    if type(props.get("faces")) == dict:
+        saveObjectFacesOnCache(props["faces"], objName)
+
+def getActiveState(step):
+    # (name, mode) of the active object when the step was recorded
+
+    props = step[1] if type(step[1]) == dict else {}
+    return (step[2], "EDIT" if props.get("editMode") else "OBJECT")
+
+def replaySession(logSteps, tutorialSteps, tutorialName = "", stopAtEnd = True):
+    # Validates the steps of the log (iterable) against the tutorial steps. Returns the list of step records:
+    # {"line", "operation", "verdict", "latency" (validation, seconds), "load" (cache update, seconds)}, plus
+    # "error" (traceback) when the verdict is "error"
+
+    saveObjectsOnCache({})
+    loggerModal.tutFileName = tutorialName
+
+    tut = Tutorial()
+    tut.name = tutorialName
+    tut.tutorialSteps = tutorialSteps
+    user = userModel()
+    records = []
+
+    for line, step in enumerate(logSteps):
+        start = time.perf_counter()
+        loadStepOnCache(step)
+        loaded = time.perf_counter()
+
+        record = {"line": line, "operation": step[0]}
+
+        try:
+            record["verdict"] = validateTranslation(step, getActiveState(step), tut, user)["verdict"]
+
+        except Exception:
+            record["verdict"] = "error"
+            record["error"] = traceback.format_exc()
+
+        record.update({"latency": time.perf_counter() - loaded, "load": loaded - start})
+        records.append(record)
+        verdict = record["verdict"]
+
+        if verdict == "end" and stopAtEnd:
+            break
+
+    return records, tut, user
+
+def summarize(records, elapsed, tut, user, deviations = None):
+    latencies = np.array([record["latency"] for record in records]) if records else np.zeros(1)
+    verdicts = {}
+
+    for record in records:
+        verdicts[record["verdict"]] = verdicts.get(record["verdict"], 0) + 1
+
+    summary = {
+        "steps": len(records),
+        "elapsed": elapsed,
+        "stepsPerSecond": len(records) / elapsed if elapsed > 0 else None,
+        "latency": {"mean": float(latencies.mean()), "p50": float(np.percentile(latencies, 50)), "p95": float(np.percentile(latencies, 95)),
+                    "p99": float(np.percentile(latencies, 99)), "max": float(latencies.max())},
+        "load": sum(record["load"] for record in records),
+        "verdicts": verdicts,
+        "errors": verdicts.get("error", 0),
+        "tutorialState": tut.state,
+        "tutorialSteps": len(tut.tutorialSteps),
+        "progress": tut.getProgress() if tut.tutorialSteps else 0,
+        "finished": any(record["verdict"] == "end" for record in records),
+        "userProfile": [float(value) for value in user.userProfile],
+    }
+
+    if deviations is not None:
+        # Verdicts of the steps of each deviation (None = performed as in the tutorial)
+        byLine = {record["line"]: record["deviation"] for record in deviations if "line" in record}
+        byDeviation = {}
+
+        for record in records:
+            counts = byDeviation.setdefault(str(byLine.get(record["line"])), {})
+            counts[record["verdict"]] = counts.get(record["verdict"], 0) + 1
+
+        summary["verdictsByDeviation"] = byDeviation
+
+    return summary
+
+def replay(logPath, tutorialPath, repeat = 1, stopAtEnd = True, memory = False):
+    # Replays the log repeat times (each from a fresh tutorial state). Returns (records of the last run, summary of all runs).
+    # memory = also reports the memory held by the cache and the tutorial at the end, and what grew during the replay
+    # (tracemalloc, which makes the replay a lot slower)
+
+    tutorialSteps = readTutorial(tutorialPath)
+    deviationsPath = os.path.splitext(logPath)[0] + "_deviations.json"
+    deviations = None
+
+    if os.path.exists(deviationsPath):
+        with open(deviationsPath, 'r') as file:
+            deviations = json.load(file)
+
+    allRecords = []
+    elapsed = 0
+
+    if memory:
+        loggerModal.takeMemorySnapshot("start")
+
+    for i in range(repeat):
+        start = time.perf_counter()
+        records, tut, user = replaySession(iterateTutorial(logPath), [list(step) for step in tutorialSteps], os.path.basename(tutorialPath), stopAtEnd)
+        elapsed += time.perf_counter() - start
+        allRecords += records
+
+    summary = summarize(allRecords, elapsed, tut, user, deviations)
+    summary.update({"log": logPath, "tutorial": tutorialPath, "repeat": repeat, "recommendations": user.makeRecommendation() if summary["finished"] else None})
+
+    if memory:
+        loggerModal.takeMemorySnapshot("end")
+        summary["memory"] = {"regions": loggerModal.getMemoryReport(), "growth": loggerModal.compareMemorySnapshots("start", "end")}
+        loggerModal.stopMemoryTracing()
+
+    return records, summary
+
+if __name__ == "__main__":
+    # Inside Blender the arguments of the script come after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Headless replay of a recorded log against a tutorial")
+    parser.add_argument("log", help="Recorded log (one step per line)")
+    parser.add_argument("tutorial", help="Tutorial file")
+    parser.add_argument("--repeat", type=int, default=1, help="Replays of the log (for throughput measurements)")
+    parser.add_argument("--output", default=None, help="JSON file with the summary and the verdict of each step")
+    parser.add_argument("--blend-dir", default=None, help="Folder of the .blend file (termWeights.txt) outside of Blender")
+    parser.add_argument("--keep-going", action="store_true", help="Keep validating after the end of the tutorial")
+    parser.add_argument("--stage-timings", action="store_true", help="Latency of each validation stage per operation (loggerModal stage timings)")
+    parser.add_argument("--memory", action="store_true", help="Memory held by the cache and the tutorial after the replay, and what grew during it (tracemalloc)")
+    parser.add_argument("--log-level", default="OFF", choices=list(loggerModal.logLevels), help="Messages of the logger shown")
+    arguments = parser.parse_args(argv)
+
+    if arguments.blend_dir is not None:
+        BpyStandIn.blendDirectory = arguments.blend_dir
+
+    loggerModal.setLogLevel(arguments.log_level)
+    loggerModal.enableStageTimings(arguments.stage_timings)
+
+    records, summary = replay(arguments.log, arguments.tutorial, max(1, arguments.repeat), not arguments.keep_going, arguments.memory)
+
+    print("%i steps in %.3f s: %.1f steps/s | latency p50 %.3f ms, p95 %.3f ms, p99 %.3f ms, max %.3f ms" %(summary["steps"],
+          summary["elapsed"], summary["stepsPerSecond"] or 0, summary["latency"]["p50"] * 1000, summary["latency"]["p95"] * 1000,
+          summary["latency"]["p99"] * 1000, summary["latency"]["max"] * 1000))
+    print("Verdicts: %s" %summary["verdicts"])
+    print("Tutorial: step %i of %i (%.1f %%)%s" %(summary["tutorialState"], summary["tutorialSteps"], summary["progress"] * 100,
+          ", finished, recommendations: %s" %summary["recommendations"] if summary["finished"] else ""))
+
+    for deviation, counts in summary.get("verdictsByDeviation", {}).items():
+        print("  %-16s %s" %(deviation, counts))
+
+    errors = [record for record in records if record["verdict"] == "error"]
+
+    if errors:
+        print("%i steps raised an error, the first one (line %i, %s):" %(summary["errors"], errors[0]["line"], errors[0]["operation"]))
+        print(errors[0]["error"])
+
+    if arguments.stage_timings:
+        summary["stages"] = loggerModal.getStageSummary()
+
+        for stage, values in summary["stages"]["(all)"].items():
+            print("  %-12s %6i calls | p50 %8.3f ms | p95 %8.3f ms | p99 %8.3f ms | max %8.3f ms" %(stage, values["count"],
+                  values["p50"] * 1000, values["p95"] * 1000, values["p99"] * 1000, values["max"] * 1000))
+
+    if arguments.memory:
+        regions = summary["memory"]["regions"]
+
+        for name, region in [("cache", regions["cache"])] + [("tutorial " + name, region) for name, region in regions["tutorials"].items()]:
+            print("  %-32s payload %8.2f MB | headers %8.2f MB" %(name[:32], region["payload"] / (1024 * 1024), region["headers"] / (1024 * 1024)))
+
+        for stat in summary["memory"]["growth"][:5]:
+            print("  %+10.1f KB %+8i blocks  %s" %(stat["sizeDiff"] / 1024, stat["countDiff"], stat["location"]))
+
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as file:
+            json.dump({"summary": summary, "steps": records}, file, indent=1)
+
+    sys.exit(1 if summary["errors"] else 0)
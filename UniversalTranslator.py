@@ -1,198 +1,506 @@
 import re
-import json
-
-'''
-bpy.ops.transform.translate(value=(0, 0.44853, 0), orient_axis_ortho='X', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL', constraint_axis=(False, True, False), mirror=False, use_proportional_edit=False, proportional_edit_falloff='SMOOTH', proportional_size=1, use_proportional_connected=False, use_proportional_projected=False, snap=False, snap_elements={'INCREMENT'}, use_snap_project=False, snap_target='CLOSEST', use_snap_self=True, use_snap_edit=True, use_snap_nonedit=True, use_snap_selectable=False, release_confirm=True)
-
-'''
-#globalLastOp = 'bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "use_dissolve_ortho_edges":False, "mirror":False}, TRANSFORM_OT_translate={"value":(0, 0, 0.716544), "orient_type":"NORMAL", "orient_matrix":((0, 1, 0), (-1, 0, 0), (0, 0, 1)), "orient_matrix_type":"NORMAL", "constraint_axis":(False, False, True), "mirror":False, "use_proportional_edit":False, "proportional_edit_falloff":"SMOOTH", "proportional_size":1, "use_proportional_connected":False, "use_proportional_projected":False, "snap":False, "snap_elements":{"INCREMENT"}, "use_snap_project":False, "snap_target":"CLOSEST", "use_snap_self":True, "use_snap_edit":True, "use_snap_nonedit":True, "use_snap_selectable":False, "snap_point":(0, 0, 0), "snap_align":False, "snap_normal":(0, 0, 0), "gpencil_strokes":False, "cursor_transform":False, "texture_space":False, "remove_on_cancel":False, "use_duplicated_keyframes":False, "view2d_edge_pan":False, "release_confirm":False, "use_accurate":False, "alt_navigation":True, "use_automerge_and_split":False})'
-globalLastOp = "bpy.context.object.modifiers['sdfsdf'].segments = 2"
-#globalLastOp = "bpy.ops.transform.translate(value=(0, 0.44853, 0), orient_axis_ortho='X', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL', constraint_axis=(False, True, False), mirror=False, use_proportional_edit=False, proportional_edit_falloff='SMOOTH', proportional_size=1, use_proportional_connected=False, use_proportional_projected=False, snap=False, snap_elements={'INCREMENT'}, use_snap_project=False, snap_target='CLOSEST', use_snap_self=True, use_snap_edit=True, use_snap_nonedit=True, use_snap_selectable=False, release_confirm=True)"
-
-isModifier = False
-
-if ("object.modifiers" in globalLastOp):
-    # Means the format will be different
-    arguments_pattern = re.compile(r"\.modifiers\['([^']+)'\]\.(\w+)\s*=\s*((?:\([^()]*\)|[^(),]+))")
-    isModifier = True
-
-else:
-    # Regular expression pattern to match arguments and values
-    arguments_pattern = re.compile(r"(\w+)\s*=\s*((?:\([^()]*\)|[^(),]+))(?:,|\))")
-
-# Extract arguments and values
-arguments_matches = arguments_pattern.findall(globalLastOp)
-
-# Create a list of alternating names and values
-result_list = [item for sublist in arguments_matches for item in sublist]
-
-if isModifier:
-    # Convert to universal language: Name of op, value(s), target
-    result_list = ["Modifier "+result_list[1], result_list[2], result_list[0]]
-
-else:
-    valuesDict = {result_list[i]: result_list[i + 1] for i in range(0, len(result_list), 2)}
-    print(valuesDict)
-    #result_list = [operator.name, valuesDict, bpy.context.active_object.name]
-
-# print(result_list)
-
-testedict = '''
-{
-    "MESH_OT_extrude_region": {
-        "use_normal_flip":False,
-        "use_dissolve_ortho_edges":False,
-        "mirror":False
-        },
-    "TRANSFORM_OT_translate": {
-        "value":(0, 0, 0.716544),
-        "orient_type":"NORMAL",
-        "orient_matrix":((0, 1, 0), (-1, 0, 0), (0, 0, 1)),
-        "orient_matrix_type":"NORMAL",
-        "constraint_axis":(False, False, True),
-        "mirror":False,
-        "use_proportional_edit":False,
-        "proportional_edit_falloff":"SMOOTH",
-        "proportional_size":1,
-        "use_proportional_connected":False,
-        "use_proportional_projected":False,
-        "snap":False,
-        "snap_elements":{"INCREMENT"},
-        "use_snap_project":False,
-        "snap_target":"CLOSEST",
-        "use_snap_self":True,
-        "use_snap_edit":True,
-        "use_snap_nonedit":True,
-        "use_snap_selectable":False,
-        "snap_point":(0, 0, 0),
-        "snap_align":False,
-        "snap_normal":(0, 0, 0),
-        "gpencil_strokes":False,
-        "cursor_transform":False,
-        "texture_space":False,
-        "remove_on_cancel":False,
-        "use_duplicated_keyframes":False,
-        "view2d_edge_pan":False,
-        "release_confirm":False,
-        "use_accurate":False,
-        "alt_navigation":True,
-        "use_automerge_and_split":False
-        }
-    }
-'''
-
-teste2 = '''
-{
-    "MESH_OT_extrude_region": {
-        "use_normal_flip":false,
-        "use_dissolve_ortho_edges":false,
-        "mirror":false
-        }
-}
-    '''
+from collections import OrderedDict
 
-#####################################################################################################################################
-######################################################## To bpy.ops #################################################################
+# Parser for the reports that Blender writes in the "info" area for every operation performed, e.g.:
+#
+# bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "mirror":False}, TRANSFORM_OT_translate={"value":(0, 0, 0.716544), "snap_elements":{'INCREMENT'}})
+#
+# The report is read in a single pass (no splitting on "," / "=" and no eval), handling nested dicts, tuples, lists,
+# sets and quoted strings containing commas and equal signs. The values are returned already typed:
+# numbers -> int/float, True/False/None, strings -> str, (...) -> tuple, [...] -> list, {k: v} -> dict, {v} -> set.
+# Anything else (e.g. a reference like bpy.data.objects["Cube"]) is returned as its source text.
+#
+# This module has no dependency on bpy, so it can also be used (and benchmarked) outside of Blender.
+
+class ReportSyntaxError(ValueError):
+    # Raised when a report does not follow the expected syntax
+
+    pass
+
+# Single compiled pattern splitting a report into tokens (spaces before each token are skipped). Each token is a tuple
+# (number, string, name, punctuation, invalid) where only the field of its kind is not empty. Any character that
+# cannot start a token goes to "invalid", so nothing is silently skipped
+tokenPattern = re.compile(r"""\s*(?:
+    ([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|
+    ("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+    ([A-Za-z_][A-Za-z0-9_]*)|
+    ([()\[\]{},:=.])|
+    (\S)
+)""", re.VERBOSE | re.DOTALL)
+
+escapePattern = re.compile(r"\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)", re.DOTALL)
+escapes = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "\\": "\\", "'": "'", '"': '"', "a": "\a", "b": "\b", "f": "\f", "v": "\v"}
+constants = {"True": True, "False": False, "None": None}
+
+# Token added after the last one, so the parser never has to check the length of the tokens list
+endToken = ("", "", "", "", "")
+
+def decodeEscape(match):
+    escaped = match.group(1)
+
+    if len(escaped) > 1:
+        return chr(int(escaped[1:], 16))
+
+    return escapes.get(escaped, "\\" + escaped)
+
+def tokenizeReport(text, start = 0):
+    # Returns the list of tokens of the text (from "start") followed by endToken
+
+    tokens = tokenPattern.findall(text, start)
+    tokens.append(endToken)
+
+    return tokens
+
+def syntaxError(tokens, i, message):
+    near = "".join("".join(token) for token in tokens[i : i + 5])
+    raise ReportSyntaxError("%s near '%s'" %(message, near) if near else "%s at the end of the report" %(message))
+
+def parseTokens(tokens, i):
+    # Parses the value starting at the token i. Returns (value, index of the token after the value)
+
+    number, string, name, punct, invalid = tokens[i]
+
+    if number:
+        return (float(number) if ("." in number or "e" in number or "E" in number) else int(number)), i + 1
+
+    elif string:
+        return (string[1:-1] if "\\" not in string else escapePattern.sub(decodeEscape, string[1:-1])), i + 1
+
+    elif name:
+        if name in constants:
+            return constants[name], i + 1
+
+        elif name == "set" and tokens[i + 1][3] == "(" and tokens[i + 2][3] == ")":
+            # The empty set, as written by repr
+            return set(), i + 3
+
+        return parseReference(tokens, i)
+
+    elif punct == "(":
+        # (x) is just x between parenthesis, while (x,) and (x, y) are tuples
+        if tokens[i + 1][3] == ")":
+            return (), i + 2
+
+        first, i = parseTokens(tokens, i + 1)
+
+        if tokens[i][3] == ")":
+            return first, i + 1
+
+        elif tokens[i][3] != ",":
+            syntaxError(tokens, i, "Expected ',' or ')'")
+
+        values, i = parseSequence(tokens, i, ")")
+        return tuple([first] + values), i
+
+    elif punct == "[":
+        return parseSequence(tokens, i, "]")
 
-teste3 = 'bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "use_dissolve_ortho_edges":False, "mirror":False}, TRANSFORM_OT_translate={"value":(3.72529e-09, 0, -0.288052), "orient_axis_ortho":"X", "orient_type":"NORMAL", "orient_matrix":((0.689899, 0.0450067, -0.722506), (0.715202, -0.196685, 0.670672), (-0.111921, -0.979433, -0.167882)), "orient_matrix_type":"NORMAL", "constraint_axis":(False, False, True), "mirror":False, "use_proportional_edit":False, "proportional_edit_falloff":"SMOOTH", "proportional_size":1, "use_proportional_connected":False, "use_proportional_projected":False, "snap":False, "snap_elements":{"INCREMENT"}, "use_snap_project":False, "snap_target":"CLOSEST", "use_snap_self":True, "use_snap_edit":True, "use_snap_nonedit":True, "use_snap_selectable":False, "snap_point":(0, 0, 0), "snap_align":False, "snap_normal":(0, 0, 0), "gpencil_strokes":False, "cursor_transform":False, "texture_space":False, "remove_on_cancel":False, "view2d_edge_pan":False, "release_confirm":False, "use_accurate":False, "use_automerge_and_split":False})'
+    elif punct == "{":
+        return parseDictOrSet(tokens, i)
 
-result = ""
+    syntaxError(tokens, i, "Unexpected token")
 
-# Removing all the characters before the first parenthesis
-teste3 = teste3[teste3.index("(") + 1:-1]
+def parseSequence(tokens, i, closing):
+    # Parses "value, value, ...closing" where the token i is the opening one (or a comma). Returns (list, next index)
+
+    values = []
+    i += 1
+
+    while tokens[i][3] != closing:
+        value, i = parseTokens(tokens, i)
+        values.append(value)
+
+        punct = tokens[i][3]
+        if punct == ",":
+            i += 1
+        elif punct != closing:
+            syntaxError(tokens, i, "Expected ',' or '%s'" %(closing))
+
+    return values, i + 1
+
+def parseDictOrSet(tokens, i):
+    # Parses "{key: value, ...}" or "{value, ...}" where the token i is the opening brace
+
+    if tokens[i + 1][3] == "}":
+        return {}, i + 2
+
+    first, i = parseTokens(tokens, i + 1)
+    punct = tokens[i][3]
+
+    if punct == "}":
+        # Means it is a set with a single value
+        return {first}, i + 1
+
+    elif punct == ",":
+        # Means it is a set, the rest is parsed as a sequence starting at the comma
+        values, i = parseSequence(tokens, i, "}")
+        return set([first] + values), i
+
+    elif punct != ":":
+        syntaxError(tokens, i, "Expected ',', ':' or '}'")
 
-# Some operations do not have properties (for example TODO: Edit mode)
-if len(teste3) == 0:
     result = {}
+    key = first
 
-else:
-    # Picking all the parts divided by commas
-    parts = teste3.split(",")
+    while True:
+        result[key], i = parseTokens(tokens, i + 1)
+        punct = tokens[i][3]
 
-    for part in parts:
-        # Must replace all "=" to ":" and also include quotes so it is in the format of dictionary
-        splitted = part.split("=")
+        if punct == ",":
+            if tokens[i + 1][3] == "}":
+                return result, i + 2
+
+            key, i = parseTokens(tokens, i + 1)
+
+            if tokens[i][3] != ":":
+                syntaxError(tokens, i, "Expected ':'")
+
+        elif punct == "}":
+            return result, i + 1
 
-        if (len(splitted) > 1):
-            splitted[0] = '"' + splitted[0].strip(" ") + '"'
-            splitted = splitted[0] + ":" + splitted[1] + ","
         else:
-            splitted = splitted[0]  + ","
+            syntaxError(tokens, i, "Expected ',' or '}'")
 
-        result = result + splitted
+def parseReference(tokens, i):
+    # Any value starting with a name other than True/False/None (e.g. bpy.data.objects["Cube"]) is kept as its text
+    # (rebuilt from the tokens, so without the spaces)
 
+    start = i
+    i += 1
 
-    # Transforming into a dictionary
-    result = eval("{" + result + "}")
+    while True:
+        punct = tokens[i][3]
 
-# print(result["TRANSFORM_OT_translate"]["value"])
-    
-#####################################################################################################################################
-##################################################### To bpy.others #################################################################
+        if punct == "." and tokens[i + 1][2]:
+            i += 2
 
-'''
-FORMATS:
-[operator.name, valuesDict, bpy.context.active_object.name]
+        elif punct == "[":
+            i = parseSequence(tokens, i, "]")[1]
 
+        elif punct == "(":
+            i = parseCallArguments(tokens, i)[1]
 
-bpy.context.space_data.context = 'VIEW_LAYER'
-bpy.context.scene.eevee.taa_render_samples = 64
-bpy.context.scene.view_layers["ViewLayer"].use = False --> Name?
-bpy.context.object.modifiers["Array"].count = 3
-bpy.context.scene.world.mist_settings.start = 5
+        else:
+            break
 
+    return "".join("".join(token) for token in tokens[start:i]), i
 
-[bpy context space_data, {Group: , Subgroup: , propIndex: , others..., default_value (what comes before the = sign): }, bpy.context.active_object.name]
+def parseCallArguments(tokens, i):
+    # Parses "(name=value, name=value, ...)" where the token i is the opening parenthesis. Returns (dictionary, next index)
 
------------------------------------------------------
-bpy.data.worlds["World"].node_tree.nodes["Background"].inputs[0].default_value = (0.131279, 0.131279, 0.131279, 1) --> Group, Subgroup, propertyIndex, value?
-bpy.data.materials["Material"].node_tree.nodes["Principled BSDF"].inputs[0].default_value = (0.513695, 0.513695, 0.513695, 1)
-bpy.data.shape_keys["Key"].key_blocks["Key 1"].value = 0.104918
-bpy.data.particles["ParticleSettings"].use_advanced_hair = True
+    arguments = {}
+    i += 1
 
-[bpy data worlds node_tree nodes inputs, {Group: , Subgroup: , propIndex: , others..., default_value (what comes before the = sign): }, bpy.context.active_object.name]
-'''
+    while tokens[i][3] != ")":
+        name = tokens[i][2]
 
+        if not name or tokens[i + 1][3] != "=":
+            syntaxError(tokens, i, "Expected 'name='")
 
-teste4 = 'bpy.data.shape_keys["Key"].key_blocks["Key 1"].value = 0.104918'
-teste4 = 'bpy.data.materials["Material.001"].node_tree.nodes["Principled BSDF"].inputs[1].default_value = 0'
+        arguments[name], i = parseTokens(tokens, i + 2)
 
+        punct = tokens[i][3]
+        if punct == ",":
+            i += 1
+        elif punct != ")":
+            syntaxError(tokens, i, "Expected ',' or ')'")
 
-translated = [""]
-# Get the first (because it might have more equal signs on the other side) occurrence of " = " to divide the 2 parts
-teste4 = teste4.split(" = ", maxsplit=1)
-# Get the value of the property
-value = eval(teste4[1])
-# List of names, groups etc and operation "address"
-groupsList = [["group", ""], ["subgroup", ""], ["propIndex", ""]]
-addresses = [""]
-# Get all the operator "address"
-teste4 = teste4[0].split(".")
+    return arguments, i + 1
 
-groupIndex = 0
+def parseValue(text):
+    # Parses a single value written in the report syntax, e.g. "(0.5, 0.5, 0.5, 1)" -> (0.5, 0.5, 0.5, 1)
 
-for i, addr in enumerate(teste4[:-1]): # Ignore the last one since it is the property name changed
-    if "[" in addr:
-        print("AAAAAAAA ", teste4)
-        # Get what is inside: ['groupname']
-        groupName = addr[addr.index("[")+1:addr.index("]")]
-        groupName = eval(groupName)
-        
-        if groupIndex <= 2:
-            groupsList[groupIndex][1] = groupName
-        
-        else:
-            groupsList.append(["other"+str(groupIndex-2), groupName])
+    tokens = tokenizeReport(text)
+    value, i = parseTokens(tokens, 0)
+
+    if tokens[i] != endToken:
+        syntaxError(tokens, i, "Unexpected text after the value")
+
+    return value
+
+def parseOperatorReport(report):
+    # Parses a "bpy.ops.<module>.<operator>(name=value, ...)" report.
+    # Returns (operator identifier = "<module>.<operator>", {name: value, ...})
+
+    parenthesis = report.find("(")
 
-        groupIndex += 1
+    if not report.startswith("bpy.ops.") or parenthesis == -1:
+        raise ReportSyntaxError("Not an operator report: %s" %(report))
 
-        # Get the address without the group name (also getting everything after it because there might be some operations that contains it)
-        translated[0] = translated[0] + " " + addr[ 0 : addr.index("[") ] + addr[ addr.index("]")+1 : ]
+    tokens = tokenizeReport(report, parenthesis)
+    arguments, i = parseCallArguments(tokens, 0)
+
+    if tokens[i] != endToken:
+        syntaxError(tokens, i, "Unexpected text after the operator call")
+
+    return report[len("bpy.ops.") : parenthesis], arguments
+
+# Address of a property assignment ("<address> = <value>"): names separated by "." and subscripts ["name"] / [index].
+# Names can be unusual (e.g. window_managers["WinMan"].(null)), so anything up to the next separator is accepted
+assignmentPattern = re.compile(r"""((?:\.?[^.\[\]\s="']+|\[(?:"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^\]"']*)\])+)\s*=\s*""", re.DOTALL)
+addressPartPattern = re.compile(r"""\.?([^.\[\]\s="']+)|\[("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^\]"']*)\]""", re.DOTALL)
+
+# Keys given to the subscripts of the address, in order (the following ones are "other1", "other2", ...)
+groupKeys = ["group", "subgroup", "propIndex"]
+
+# Parsed addresses: {address: (translated address, [(key, group name), ...], property name)}. Dragging a slider
+# produces many reports with the same address and only a different value, so the address is parsed only once
+addressCache = {}
+addressCacheSize = 512
+
+def parseAddress(address):
+    # Parses an address like bpy.data.materials["Material"].node_tree.nodes["Principled BSDF"].inputs[0].default_value.
+    # Returns (" bpy data materials node_tree nodes inputs", [("group", "Material"), ("subgroup", "Principled BSDF"), ("propIndex", 0)], "default_value")
+
+    names = []
+    groups = []
+
+    for name, subscript in addressPartPattern.findall(address):
+        if name:
+            names.append(name)
+            continue
+
+        try:
+            group = parseValue(subscript)
+        except ReportSyntaxError:
+            group = subscript
+
+        groups.append((groupKeys[len(groups)] if len(groups) < len(groupKeys) else "other" + str(len(groups) - 2), group))
+
+    propName = names.pop()
+
+    return "".join(" " + name for name in names), groups, propName
+
+def parsePropertyReport(report):
+    # Parses a property assignment report (anything that is not bpy.ops), e.g.:
+    # bpy.data.materials["Material"].node_tree.nodes["Principled BSDF"].inputs[0].default_value = (0.8, 0.8, 0.8, 1)
+    # Returns (translated address, {"group": ..., "subgroup": ..., "propIndex": ..., <property name>: typed value})
+    # Values that cannot be parsed (e.g. Vector((1, 0, 0))) are kept as their text
+
+    address, separator, valueText = report.partition(" = ")
+    parsed = addressCache.get(address)
+
+    if parsed is None or not separator:
+        # The fast split above does not work if " = " appears inside a quoted name, so the address is matched properly
+        match = assignmentPattern.match(report)
+
+        if not match:
+            raise ReportSyntaxError("Not a property assignment: %s" %(report))
+
+        address = match.group(1)
+        valueText = report[match.end():]
+        parsed = addressCache.get(address)
+
+        if parsed is None:
+            parsed = parseAddress(address)
+
+            if len(addressCache) >= addressCacheSize:
+                addressCache.clear()
+            addressCache[address] = parsed
+
+    translatedAddress, groups, propName = parsed
+
+    try:
+        value = parseValue(valueText)
+    except ReportSyntaxError:
+        value = valueText.strip()
+
+    props = dict(groups)
+    props[propName] = value
+
+    return translatedAddress, props
+
+# Translations already made: {(report, operator name): (identifier or address, props)}. Users repeat the same actions
+# all the time (mode toggles, select all, the same modifier property), so each distinct report is parsed only once.
+# Only the scene independent part is kept here, the scene dependent part (geometry diffs, active object) is added by the
+# caller on a copy. The least recently used entry is dropped when the cache is full
+translationCache = OrderedDict()
+translationCacheSize = 1024
+translationCacheStats = {"hits": 0, "misses": 0}
+
+def copyParsed(value):
+    # Copies the mutable containers (dict, list, set) of a parsed value, so the caller can change the copy without
+    # changing the cached one. Tuples, strings and numbers are immutable and therefore shared
+
+    valueType = type(value)
+
+    if valueType is dict:
+        return {key: copyParsed(item) for key, item in value.items()}
+
+    if valueType is list:
+        return [copyParsed(item) for item in value]
+
+    if valueType is set:
+        return set(value)
+
+    return value
+
+def translateReport(report, operatorName = None):
+    # Returns the parsed report: (operator identifier, {name: value, ...}) for bpy.ops reports and
+    # (translated address, {"group": ..., <property name>: value}) for property assignments. The props are a copy,
+    # so they can be completed by the caller. Raises ReportSyntaxError (not cached) if the report cannot be parsed
+
+    key = (report, operatorName)
+    cached = translationCache.get(key)
+
+    if cached is None:
+        translationCacheStats["misses"] += 1
+        cached = parseOperatorReport(report) if report.startswith("bpy.ops.") else parsePropertyReport(report)
+
+        if len(translationCache) >= translationCacheSize:
+            translationCache.popitem(last=False)
+        translationCache[key] = cached
 
     else:
-        translated[0] = translated[0] + " " + addr
+        translationCacheStats["hits"] += 1
+        translationCache.move_to_end(key)
+
+    return cached[0], copyParsed(cached[1])
+
+def getTranslationCacheStats():
+    # Hits, misses and number of entries of the translation cache
+
+    return {"hits": translationCacheStats["hits"], "misses": translationCacheStats["misses"], "entries": len(translationCache)}
+
+def clearTranslationCache():
+    translationCache.clear()
+    translationCacheStats["hits"] = 0
+    translationCacheStats["misses"] = 0
+
+#####################################################################################################################################
+######################################################## Benchmark ##################################################################
+
+def legacyParseOperatorReport(report):
+    # Previous path of formatOperation2 (split on "," and "=" + eval), kept only to benchmark against it
+
+    result = ""
+    processed = report[report.index("(") + 1:-1]
+
+    if len(processed) == 0:
+        return {}
 
-groupsList.append([teste4[-1], value])
-translated.append(dict(groupsList))
+    for part in processed.split(","):
+        splitted = part.split("=")
+
+        if (len(splitted) > 1):
+            splitted[0] = '"' + splitted[0].strip(" ") + '"'
+            splitted = splitted[0] + ":" + splitted[1] + ","
+        else:
+            splitted = splitted[0]  + ","
+
+        result = result + splitted
 
-print(translated)
+    return eval("{" + result + "}")
+
+def legacyParsePropertyReport(report):
+    # Previous path of formatOperation2 for property assignments (quote scanning + str.replace + eval), kept only to benchmark against it
+
+    possindices = [index for index, char in enumerate(report) if char == '"']
+    endIndices = []
+    processed = report
+    groupIndex = 0
+    baseIndex = 0
+    translated = [""]
+    groupsList = [["group", ""], ["subgroup", ""], ["propIndex", ""]]
+
+    for index in possindices:
+        if ord(report[index-1]) == 92:
+            foundAnother = False
+            count = 0
+            i = 1
+
+            while not foundAnother:
+                if (ord(report[index-i]) == 92):
+                    count+=1
+                    i+=1
+                else:
+                    foundAnother = True
+
+            if (count%2 == 0):
+                endIndices.append(index)
+
+        elif index != ( len(report)-1 ) and report[index+1] == "]":
+            endIndices.append(index)
+
+    if len(endIndices) != 0:
+        for i, char in enumerate(report):
+            if (char == "[" and i > baseIndex):
+                if (report[i + 1] != '"'):
+                    closeIndex = report[i+1:].index("]")
+                    groupName = report[i+1:][:closeIndex]
+                    evalGroupName = eval(groupName)
+                else:
+                    closeIndex = endIndices[0]+1
+                    groupName = report[i+1 : closeIndex]
+                    evalGroupName = eval(groupName)
+                    baseIndex = closeIndex
+                    del endIndices[0]
+
+                if groupIndex <= 2:
+                    groupsList[groupIndex][1] = evalGroupName
+                else:
+                    groupsList.append(["other"+str(groupIndex-2), evalGroupName])
+
+                processed = processed.replace("[" + groupName + "]", "")
+                groupIndex += 1
+
+    processed = processed.split(" = ")
+    value = str(processed[1]) if type(eval(processed[1]) not in [int, float, str]) else eval(processed[1])
+    processed = processed[0].split(".")
+
+    for addr in processed[:-1]:
+        translated[0] += " " + addr
+
+    groupsList = groupsList[0:groupIndex]
+    groupsList.append([processed[-1], value])
+    translated.append(dict(groupsList))
+
+    return translated
+
+samplePropertyReports = [
+    "bpy.context.space_data.context = 'MATERIAL'",
+    'bpy.context.object.modifiers["Array"].count = 3',
+    'bpy.data.materials["Material"].node_tree.nodes["Principled BSDF"].inputs[0].default_value = (0.513695, 0.513695, 0.513695, 1)',
+]
+
+sampleReports = [
+    "bpy.ops.object.editmode_toggle()",
+    "bpy.ops.object.modifier_add(type='SUBSURF')",
+    "bpy.ops.transform.translate(value=(0, 0.44853, 0), orient_axis_ortho='X', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL', constraint_axis=(False, True, False), mirror=False, use_proportional_edit=False, proportional_edit_falloff='SMOOTH', proportional_size=1, use_proportional_connected=False, use_proportional_projected=False, snap=False, snap_elements={'INCREMENT'}, use_snap_project=False, snap_target='CLOSEST', use_snap_self=True, use_snap_edit=True, use_snap_nonedit=True, use_snap_selectable=False, release_confirm=True)",
+    'bpy.ops.mesh.extrude_region_move(MESH_OT_extrude_region={"use_normal_flip":False, "use_dissolve_ortho_edges":False, "mirror":False}, TRANSFORM_OT_translate={"value":(3.72529e-09, 0, -0.288052), "orient_axis_ortho":"X", "orient_type":"NORMAL", "orient_matrix":((0.689899, 0.0450067, -0.722506), (0.715202, -0.196685, 0.670672), (-0.111921, -0.979433, -0.167882)), "orient_matrix_type":"NORMAL", "constraint_axis":(False, False, True), "mirror":False, "use_proportional_edit":False, "proportional_edit_falloff":"SMOOTH", "proportional_size":1, "use_proportional_connected":False, "use_proportional_projected":False, "snap":False, "snap_elements":{"INCREMENT"}, "use_snap_project":False, "snap_target":"CLOSEST", "use_snap_self":True, "use_snap_edit":True, "use_snap_nonedit":True, "use_snap_selectable":False, "snap_point":(0, 0, 0), "snap_align":False, "snap_normal":(0, 0, 0), "gpencil_strokes":False, "cursor_transform":False, "texture_space":False, "remove_on_cancel":False, "view2d_edge_pan":False, "release_confirm":False, "use_accurate":False, "use_automerge_and_split":False})',
+]
+
+if __name__ == "__main__":
+    import timeit
+
+    for report in sampleReports:
+        newResult = parseOperatorReport(report)[1]
+        oldResult = legacyParseOperatorReport(report)
+        repeat = 2000
+
+        newTime = timeit.timeit(lambda: parseOperatorReport(report), number=repeat) / repeat
+        oldTime = timeit.timeit(lambda: legacyParseOperatorReport(report), number=repeat) / repeat
+
+        print("%-60s same result: %s | split + eval: %8.2f us | parser: %8.2f us" %(report[:60], newResult == oldResult, oldTime * 1e6, newTime * 1e6))
+
+    for report in samplePropertyReports:
+        newResult = list(parsePropertyReport(report))
+        oldResult = legacyParsePropertyReport(report)
+        repeat = 2000
+
+        newTime = timeit.timeit(lambda: parsePropertyReport(report), number=repeat) / repeat
+        oldTime = timeit.timeit(lambda: legacyParsePropertyReport(report), number=repeat) / repeat
+
+        # The old path kept the value as text, so only the address and the groups are compared
+        sameAddress = newResult[0] == oldResult[0] and list(newResult[1].keys()) == list(oldResult[1].keys())
+        print("%-60s same address: %s | scan + eval: %8.2f us | tokenizer: %8.2f us" %(report[:60], sameAddress, oldTime * 1e6, newTime * 1e6))
+
+    for report in sampleReports + samplePropertyReports:
+        repeat = 2000
+
+        parseTime = timeit.timeit(lambda: translateReport(report, "Operator"), number=1)
+        cachedTime = timeit.timeit(lambda: translateReport(report, "Operator"), number=repeat) / repeat
+
+        print("%-60s first translation: %8.2f us | repeated (cached): %8.2f us" %(report[:60], parseTime * 1e6, cachedTime * 1e6))
+
+    print("Translation cache: ", getTranslationCacheStats())
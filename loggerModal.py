@@ -11,71 +11,642 @@ bl_info = {
 }
 
 import bpy, bmesh
-from bpy.props import IntProperty, FloatProperty
-import mathutils
+from bpy.props import IntProperty, FloatProperty, EnumProperty, BoolProperty
+from bpy.app.handlers import persistent
 import math
-import re
 import os
-import numpy as np
-import json
-import copy
+import sys
+import time
+import importlib
+import queue
+import threading
+import traceback
+import logging
+import reprlib
+import gc
+import tracemalloc
+import weakref
+from types import MappingProxyType
+from array import array
+from collections import OrderedDict, namedtuple, deque, Counter
+from collections.abc import Mapping
+
+class DeferredModule:
+    # Stand-in bound to the name of a module until the module is used: the first attribute read imports it and puts it
+    # in place of the stand-in in the globals of this file, so the next reads go straight to the module.
+    # importlib.import_module is thread safe (the worker may be the first to use it)
+
+    def __init__(self, name, alias):
+        self.name = name
+        self.alias = alias
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.name)
+        globals()[self.alias] = module
+        return getattr(module, attribute)
+
+# Only needed once the logger runs (NumPy alone takes most of the import time of the addon), so Blender does not
+# import them when the addon is registered. json, mathutils and ProfileStacks are imported by the functions using them
+np = DeferredModule("numpy", "np")
+cProfile = DeferredModule("cProfile", "cProfile")
+pstats = DeferredModule("pstats", "pstats")
+
+# The pure Python modules of the addon (without bpy dependency) live next to this file
+addonDir = os.path.dirname(os.path.abspath(__file__))
+if addonDir not in sys.path:
+    sys.path.append(addonDir)
+
+from UniversalTranslator import parseOperatorReport, ReportSyntaxError, translateReport, getTranslationCacheStats
+from TutorialIO import SessionJournal, readTutorial, writeTutorial, formatStep
+from TutorialCompaction import compactSteps, isNoOpStep
 
 useLogger = False
 logCache = []
-numberOfOp = 0
+sessionJournal = None # Append-only journal of the steps recorded in the current session (see stopLogger)
+numberOfOp = 0 # Operations on the Info log already seen (None = not read yet, see readOperationsBaseline)
 globalLastOp = None
 tutorialMode = False
 tutFileName = ""
 ignoreLastOp = False
+useTranslationWorker = True # Translates/validates the operations on a worker thread instead of inside modal
+captureMode = "SELECTION" # "SELECTION" diffs only the selected vertices (plus their one-ring) in edit mode, "FULL" diffs the whole mesh
+
+# ======================================================================================================================= #
+# ================================================ Logging ============================================================== #
+# ======================================================================================================================= #
+
+# Messages of the addon go through the "blenderLogger" logger instead of print:
+# - levels (OFF/ERROR/WARNING/INFO/DEBUG, chosen in the panel). The dumps of steps, diffs and profiles are DEBUG
+# - lazy formatting: log.debug("... %s", value) only formats value if DEBUG is enabled, so disabled messages cost nothing
+# - large arguments (vertex dicts, profiles, lists of steps...) are shortened by reprlib, and messages are cut at messageLimit
+# - the last messages are kept in a ring buffer shown in the panel
+
+log = logging.getLogger("blenderLogger")
+log.propagate = False
+
+logLevels = {"OFF": logging.CRITICAL + 1, "ERROR": logging.ERROR, "WARNING": logging.WARNING, "INFO": logging.INFO, "DEBUG": logging.DEBUG}
+
+shortRepr = reprlib.Repr()
+shortRepr.maxlist = shortRepr.maxtuple = shortRepr.maxset = shortRepr.maxdict = 8
+shortRepr.maxlevel = 3
+shortRepr.maxstring = shortRepr.maxother = 200
+messageLimit = 1000
+
+class ShortFormatter(logging.Formatter):
+    # Formats the arguments that are not numbers/strings with shortRepr and cuts long messages
+
+    def format(self, record):
+        if record.args and not getattr(record, "shortened", False):
+            args = record.args
+
+            if type(args) == dict and "%(" not in str(record.msg):
+                # logging unpacks a single dict argument as a mapping, but here it is the value of a %s
+                args = (args,)
+
+            if type(args) == tuple:
+                record.args = tuple(arg if type(arg) in (str, int, float, bool) else shortRepr.repr(arg) for arg in args)
+            record.shortened = True
+
+        message = logging.Formatter.format(self, record)
+
+        if len(message) > messageLimit:
+            message = message[:messageLimit] + " ... (%i characters)" %(len(message))
+
+        return message
+
+class RingBufferHandler(logging.Handler):
+    # Keeps the last "capacity" formatted messages
+
+    def __init__(self, capacity = 200):
+        logging.Handler.__init__(self)
+        self.messages = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+logRing = RingBufferHandler()
+
+if not log.handlers:
+    # The addon can be reloaded, the handlers are added only once
+    consoleHandler = logging.StreamHandler(sys.stdout)
+    consoleHandler.setFormatter(ShortFormatter("%(message)s"))
+    logRing.setFormatter(ShortFormatter("%(levelname)s %(message)s"))
+    log.addHandler(consoleHandler)
+    log.addHandler(logRing)
+    log.setLevel(logging.INFO)
+
+else:
+    logRing = next(handler for handler in log.handlers if hasattr(handler, "messages"))
+
+def setLogLevel(level):
+    log.setLevel(logLevels[level])
+
+def getRecentLogMessages(count = 8):
+    # The worker thread can be logging at the same time
+
+    with logRing.lock:
+        return list(logRing.messages)[-count:]
+
+def updateLogLevel(self, context):
+    # Update callback of the "log_level" property of the scene
+    setLogLevel(self.log_level)
 
 # ======================================================================================================================= #
 # ============================================= Cache Related =========================================================== #
 # ======================================================================================================================= #
 
+class MeshCoords(Mapping):
+    # Read-only coordinates of the vertices (or face centers) of a mesh, shared by the cache and the translated steps,
+    # so a step does not copy the mesh. They are a full (N, 3) float32 array ("base") plus the rows changed since
+    # ("indices", sorted, and their "rows"): moving k vertices makes a new MeshCoords in O(k + rows changed before), and
+    # the changed rows are only merged into a new full array when they are more than mergeRatio of it.
+    # As a mapping it reads as the {index: [x, y, z]} dictionary of the tutorial steps. The code needing all of it
+    # (serialization, mesh comparison) gets it in bulk from toArray(), values() or items()
+
+    __slots__ = ("base", "indices", "rows")
+
+    mergeRatio = 0.125
+
+    def __init__(self, base, indices = None, rows = None):
+        base = toCoordsArray(base)
+
+        # The arrays are shared, so nobody may write to them
+        if base.flags.writeable:
+            base = base.copy()
+            base.setflags(write=False)
+
+        self.base = base
+        self.indices = np.empty(0, dtype=np.int64) if indices is None else indices
+        self.rows = np.empty((0, 3), dtype=np.float32) if rows is None else rows
+
+    def __len__(self):
+        return len(self.base)
+
+    def __iter__(self):
+        return iter(range(len(self.base)))
+
+    def __contains__(self, index):
+        return isinstance(index, (int, np.integer)) and 0 <= index < len(self.base)
+
+    def __getitem__(self, index):
+        if index not in self:
+            raise KeyError(index)
+
+        position = np.searchsorted(self.indices, index)
+
+        if position < len(self.indices) and self.indices[position] == index:
+            return self.rows[position].tolist()
+
+        return self.base[index].tolist()
+
+    def values(self):
+        return self.toArray().tolist()
+
+    def items(self):
+        return list(enumerate(self.toArray().tolist()))
+
+    def toDict(self):
+        return dict(enumerate(self.toArray().tolist()))
+
+    def toArray(self):
+        # The coordinates as one read-only (N, 3) array
+
+        if len(self.indices) == 0:
+            return self.base
+
+        merged = self.base.copy()
+        merged[self.indices] = self.rows
+        merged.setflags(write=False)
+
+        return merged
+
+    def take(self, indices):
+        # (k, 3) array with the rows of the given indices
+
+        rows = self.base[indices]
+
+        if len(self.indices) != 0 and len(indices) != 0:
+            positions = np.minimum(np.searchsorted(self.indices, indices), len(self.indices) - 1)
+            changed = self.indices[positions] == indices
+            rows[changed] = self.rows[positions[changed]]
+
+        return rows
+
+    def withRows(self, indices, rows):
+        # New MeshCoords with the rows of the given (sorted) indices replaced
+
+        if len(indices) == 0:
+            return self
+
+        kept = ~np.isin(self.indices, indices, assume_unique=True)
+        allIndices = np.concatenate((self.indices[kept], indices))
+        allRows = np.concatenate((self.rows[kept], rows)).astype(np.float32, copy=False)
+
+        if len(allIndices) > self.mergeRatio * len(self.base):
+            merged = self.base.copy()
+            merged[allIndices] = allRows
+            merged.setflags(write=False)
+            return MeshCoords(merged)
+
+        order = np.argsort(allIndices, kind="stable")
+        allIndices, allRows = allIndices[order], allRows[order]
+        allIndices.setflags(write=False)
+        allRows.setflags(write=False)
+
+        return MeshCoords(self.base, allIndices, allRows)
+
+    def arrays(self):
+        return (self.base, self.indices, self.rows)
+
+    @property
+    def nbytes(self):
+        return self.base.nbytes + self.indices.nbytes + self.rows.nbytes
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+
+        if type(other) == MeshCoords:
+            return len(self) == len(other) and bool(np.array_equal(self.toArray(), other.toArray()))
+
+        if isinstance(other, Mapping):
+            return self.toDict() == dict(other.items())
+
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "MeshCoords(%i rows, %i changed)" %(len(self.base), len(self.indices))
+
+class ObjectSnapshot:
+    # Compact record of one object of the scene stored in the cache. The transform is kept in array('d') buffers
+    # and the geometry (vertices / face centers) in MeshCoords (read-only float32 NumPy arrays, shared with the
+    # translated steps), instead of lists and {index: [x, y, z]} dictionaries. "version" is incremented every time the record changes.
+    # For the code that still needs the old format, the record can be read as a dictionary (snapshot["vertices"]).
+    # The geometry can be evicted from the cache when over the memory budget (the transform is always kept); in this
+    # case it is snapshotted again from the scene the next time it is accessed (on the main thread only, see
+    # pinGeometryOnCache). A buffer set to None is missing: both are after an eviction, and only the other one when one
+    # of them is set again (the record stays evicted until both are known). "registeredBytes" = bytes of the record
+    # counted in the total of the LRU (registerGeometryOnCache)
+
+    __slots__ = ("name", "scale", "location", "rotation", "_vertices", "_faces", "evicted", "isSmooth", "version", "registeredBytes")
+
+    def __init__(self, name, scale, location, rotation, vertices = None, faces = None, isSmooth = False):
+        self.name = name
+        self.scale = array('d', scale)
+        self.location = array('d', location)
+        self.rotation = array('d', rotation)
+        self._vertices = MeshCoords(vertices)
+        self._faces = MeshCoords(faces)
+        self.evicted = False
+        self.isSmooth = isSmooth
+        self.version = 0
+        self.registeredBytes = 0
+
+    @property
+    def vertices(self):
+        touchGeometryOnCache(self)
+        return self._vertices
+
+    @property
+    def faces(self):
+        touchGeometryOnCache(self)
+        return self._faces
+
+    @classmethod
+    def lazy(cls, name, scale, location, rotation, isSmooth = None):
+        # Record whose geometry has not been read yet: it starts evicted, so it is snapshotted from the scene the first
+        # time it is needed (like any evicted record). The smooth shading (None if not given) is read with it
+
+        snapshot = cls(name, scale, location, rotation, isSmooth=isSmooth)
+        snapshot._vertices = None
+        snapshot._faces = None
+        snapshot.evicted = True
+
+        return snapshot
+
+    @classmethod
+    def fromDict(cls, name, objProps):
+        # Creates the record from the old dictionary format: {"scale": ..., "location": ..., "rotation": ..., "vertices": ..., ...}
+
+        return cls(name, objProps["scale"], objProps["location"], objProps["rotation"], objProps.get("vertices"),
+                   objProps.get("faces"), objProps.get("isSmooth", False))
+
+    def setTransform(self, scale, location, rotation):
+        self.scale = array('d', scale)
+        self.location = array('d', location)
+        self.rotation = array('d', rotation)
+        self.version += 1
+
+    def setVertices(self, vertices):
+        # The new geometry replaces the evicted one, there is no need to snapshot it again
+        self._vertices = vertices if type(vertices) == MeshCoords else MeshCoords(vertices)
+        self.evicted = self._faces is None
+        self.version += 1
+        invalidateSmoothShadingOnCache([self.name])
+        registerGeometryOnCache(self)
+
+    def setFaces(self, faces):
+        self._faces = faces if type(faces) == MeshCoords else MeshCoords(faces)
+        self.evicted = self._vertices is None
+        self.version += 1
+        invalidateSmoothShadingOnCache([self.name])
+        registerGeometryOnCache(self)
+
+    def nbytes(self):
+        # Bytes held by the geometry buffers of this record
+
+        return sum(buffer.nbytes for buffer in (self._vertices, self._faces) if buffer is not None)
+
+    def keys(self):
+        return ["scale", "location", "rotation", "vertices", "faces", "isSmooth"]
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __getitem__(self, key):
+        if key in ("scale", "location", "rotation"):
+            return list(getattr(self, key))
+
+        elif key in ("vertices", "faces"):
+            return getattr(self, key).toDict()
+
+        elif key == "isSmooth":
+            touchSmoothShadingOnCache(self)
+            return self.isSmooth
+
+        raise KeyError(key)
+
+def toCoordsArray(coords):
+    # Converts vertices/faces coordinates (None, {index: [x, y, z]} dictionary, list, array or MeshCoords) to an (N, 3) float32 array
+
+    if coords is None or len(coords) == 0:
+        return np.empty((0, 3), dtype=np.float32)
+
+    if type(coords) == MeshCoords:
+        return coords.toArray()
+
+    if type(coords) == dict:
+        coords = list(coords.values())
+
+    return np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+
 cacheDict = {
     "allObjects": {},
-    "allModifiers": [],
-    "tempValue": None
+    "allModifiers": {},
+    "tempValue": None,
+
+    # Objects whose geometry is held by the cache, from the least to the most recently used
+    "geometryLRU": OrderedDict(),
+    # Active objects of the events captured but not translated yet: {object name (None without active object): number of events}.
+    # Their geometry is not evicted
+    "pinnedGeometry": Counter(),
+    # Active object of the last captured event: the next operation is most likely diffed against its geometry, so it
+    # is not evicted either (an evicted geometry is snapshotted again after the operation, missing its changes)
+    "lastActive": None,
+    # Sum of the registeredBytes of the records in geometryLRU
+    "geometryBytes": 0,
+    # Memory budget (in bytes) for the geometry of all the objects
+    "geometryBudget": 256 * 1024 * 1024,
+    "stats": {"hits": 0, "misses": 0, "evictions": 0},
+
+    # Smooth shading state of each mesh object: {object name: ((mesh pointer, number of faces), isSmooth)}
+    "isSmooth": {}
 }
 
+def registerGeometryOnCache(snapshot):
+    # Marks the geometry of a cached record as the most recently used one and evicts the least recently used
+    # geometries if over the memory budget. Records that are not (yet) on the cache are ignored
+
+    if cacheDict["allObjects"].get(snapshot.name) is not snapshot:
+        return
+
+    lru = cacheDict["geometryLRU"]
+    nbytes = snapshot.nbytes()
+
+    if nbytes == 0:
+        dropGeometryFromLRU(snapshot.name)
+        return
+
+    if lru.get(snapshot.name) is not snapshot:
+        dropGeometryFromLRU(snapshot.name)
+
+    lru[snapshot.name] = snapshot
+    lru.move_to_end(snapshot.name)
+    cacheDict["geometryBytes"] += nbytes - snapshot.registeredBytes
+    snapshot.registeredBytes = nbytes
+
+    if cacheDict["geometryBytes"] <= cacheDict["geometryBudget"]:
+        return
+
+    pinned = cacheDict["pinnedGeometry"]
+
+    for name in list(lru.keys())[:-1]:
+        # The most recently used geometry, the ones pinned by the queued events (used by their diffs) and the one of the
+        # last active object are never evicted
+
+        if cacheDict["geometryBytes"] <= cacheDict["geometryBudget"]:
+            break
+
+        if name in pinned or name == cacheDict["lastActive"]:
+            continue
+
+        record = lru[name]
+        dropGeometryFromLRU(name)
+        record._vertices = None
+        record._faces = None
+        record.evicted = True
+        cacheDict["stats"]["evictions"] += 1
+
+def pinGeometryOnCache(objName, withGeometry = False):
+    # Main thread, when an event is captured: its active object is pinned until the event is translated
+    # (releaseGeometryOnCache). withGeometry = the event diffs the geometry of the object, which is snapshotted again
+    # here if it had been evicted
+
+    with cacheLock:
+        cacheDict["pinnedGeometry"][objName] += 1
+        cacheDict["lastActive"] = objName
+        record = cacheDict["allObjects"].get(objName)
+
+        if withGeometry and record is not None and record.evicted:
+            touchGeometryOnCache(record)
+
+def releaseGeometryOnCache(objName):
+    # The event of the active object objName has been translated
+
+    with cacheLock:
+        pinned = cacheDict["pinnedGeometry"]
+
+        if pinned[objName] > 1:
+            pinned[objName] -= 1
+        else:
+            del pinned[objName]
+
+def dropGeometryFromLRU(name):
+    # Removes the geometry of a record from the LRU and from its byte total
+
+    record = cacheDict["geometryLRU"].pop(name, None)
+
+    if record is not None:
+        cacheDict["geometryBytes"] -= record.registeredBytes
+        record.registeredBytes = 0
+
+def touchGeometryOnCache(snapshot):
+    # Called every time the geometry of a record is accessed. If it had been evicted, it is snapshotted again
+    # (transparently) from the current state of the object in the scene. bpy can only be read on the main thread:
+    # the translation worker only reads geometry pinned by its events, which is never evicted
+
+    if not snapshot.evicted:
+        cacheDict["stats"]["hits"] += 1
+
+        if snapshot.name in cacheDict["geometryLRU"]:
+            cacheDict["geometryLRU"].move_to_end(snapshot.name)
+        return
+
+    if threading.current_thread() is not threading.main_thread():
+        raise RuntimeError("The evicted geometry of %s can only be snapshotted again on the main thread" %snapshot.name)
+
+    cacheDict["stats"]["misses"] += 1
+
+    coords, faceCenters = None, None
+    obj = bpy.data.objects.get(snapshot.name)
+
+    if obj and obj.type == "MESH":
+        coords, _, _, faceCenters = getMeshArraysOfObject(obj, withFaces=True)
+
+    # The smooth shading of a lazy record is read with its geometry
+    touchSmoothShadingOnCache(snapshot, obj)
+
+    # Only the missing buffers (a buffer set again since the eviction is newer than the scene)
+    if snapshot._vertices is None:
+        snapshot._vertices = MeshCoords(coords)
+
+    if snapshot._faces is None:
+        snapshot._faces = MeshCoords(faceCenters)
+
+    snapshot.evicted = False
+    snapshot.version += 1
+    registerGeometryOnCache(snapshot)
+
+def touchSmoothShadingOnCache(snapshot, obj = None):
+    # Reads the smooth shading of a lazy record (None until then) from the object in the scene, on the main thread.
+    # It is usually read with the geometry, this is for the records whose geometry has been set since
+
+    if snapshot.isSmooth is not None:
+        return
+
+    if threading.current_thread() is not threading.main_thread():
+        raise RuntimeError("The smooth shading of %s can only be read on the main thread" %snapshot.name)
+
+    if obj is None:
+        obj = bpy.data.objects.get(snapshot.name)
+
+    snapshot.isSmooth = obj is not None and getSmoothShadingOnCache(obj)
+
+def getSmoothShadingOnCache(obj):
+    # Returns True if any face of the object is smooth shaded. The flags of all the faces are read in bulk and the
+    # result is kept until a shading operation or a geometry update invalidates it. A different mesh datablock or
+    # number of faces under the same object name also counts as a miss
+
+    if obj.type != "MESH":
+        return False
+
+    mesh = obj.data
+    key = (mesh.as_pointer(), len(mesh.polygons))
+    cached = cacheDict["isSmooth"].get(obj.name)
+
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    smoothFlags = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", smoothFlags)
+    isSmooth = bool(smoothFlags.any())
+
+    cacheDict["isSmooth"][obj.name] = (key, isSmooth)
+    return isSmooth
+
+def invalidateSmoothShadingOnCache(objNames):
+    # Forgets the smooth shading state of the given objects so it is read again the next time
+
+    for name in objNames:
+        cacheDict["isSmooth"].pop(name, None)
+
+def setGeometryBudgetOnCache(budgetBytes):
+    # Sets the memory budget (in bytes) for the geometry held by the cache
+
+    cacheDict["geometryBudget"] = budgetBytes
+
+def getCacheStats():
+    # Returns the number of hits/misses/evictions of the geometry cache and the bytes it is currently holding.
+    # Read on every draw of the panel, so it does not take the lock: the counters and the running byte total are read
+    # as they are (the worker may be in the middle of an update, the next draw shows it)
+
+    stats = dict(cacheDict["stats"])
+    stats["bytes"] = cacheDict["geometryBytes"]
+    stats["objects"] = len(cacheDict["geometryLRU"])
+
+    return stats
+
 def saveObjectsOnCache(objsDict):
-    # Saves a list of all the objects names in the scene in the cache
+    # Saves all the objects of the scene in the cache. Accepts both ObjectSnapshot records and the old dictionary format
+
+    cacheDict["allObjects"] = {name: obj if type(obj) == ObjectSnapshot else ObjectSnapshot.fromDict(name, obj)
+                               for name, obj in objsDict.items()}
+
+    for name in list(cacheDict["geometryLRU"].keys()):
+        dropGeometryFromLRU(name)
 
-    cacheDict["allObjects"] = objsDict
+    for record in cacheDict["allObjects"].values():
+        registerGeometryOnCache(record)
 
-def saveModifiersOnCache(modifiersList):
-    # Saves a list of all the modifiers names of the selected object in the cache
+def saveModifiersOnCache(modifiersDict):
+    # Saves the modifiers index ({object name: [modifier name, ...]}) of all the objects in the cache
     
-    cacheDict["allModifiers"] = modifiersList
+    cacheDict["allModifiers"] = modifiersDict
+
+def updateObjectModifiersOnCache(obj):
+    # Updates only the entry of the given object in the modifiers index (after adding/removing/applying a modifier)
+
+    if obj is not None:
+        saveObjectModifiersOnCache(obj.name, [modifier.name for modifier in obj.modifiers])
+
+def saveObjectModifiersOnCache(objName, modifierNames):
+    cacheDict["allModifiers"][objName] = modifierNames
 
 def saveObjectTransformOnCache(objName, scale = None, location = None, rotation = None, objProps = None):
     # Saves transform properties of an object
 
     if objName not in cacheDict["allObjects"]:
-        cacheDict["allObjects"][objName] = objProps
+        cacheDict["allObjects"][objName] = objProps if type(objProps) == ObjectSnapshot else ObjectSnapshot.fromDict(objName, objProps)
+        registerGeometryOnCache(cacheDict["allObjects"][objName])
 
     else:   
-        cacheDict["allObjects"][objName]["scale"] = scale
-        cacheDict["allObjects"][objName]["location"] = location
-        cacheDict["allObjects"][objName]["rotation"] = rotation
+        cacheDict["allObjects"][objName].setTransform(scale, location, rotation)
+
+def saveObjectVerticesOnCache (vertDict, objName = None):
+    # Saves all the vertices (dictionary or (N, 3) array) of an object (the active one by default) in the cache
 
-def saveObjectVerticesOnCache (vertDict):
-    # Saves all the vertices of an object in the cache
+    if objName is not None:
+        cacheDict["allObjects"][objName].setVertices(vertDict)
 
-    if (bpy.context.active_object):
-        cacheDict["allObjects"][bpy.context.active_object.name]["vertices"] = vertDict
+    elif (bpy.context.active_object):
+        cacheDict["allObjects"][bpy.context.active_object.name].setVertices(vertDict)
 
     else:
-        print("No active object to save the vertices on the cache")
+        log.warning("No active object to save the vertices on the cache")
 
-def saveObjectFacesOnCache (facesDict):
-    # Saves all the faces of an object in the cache
+def saveObjectFacesOnCache (facesDict, objName = None):
+    # Saves all the faces (dictionary or (N, 3) array) of an object (the active one by default) in the cache
 
-    if (bpy.context.active_object):
-        cacheDict["allObjects"][bpy.context.active_object.name]["faces"] = facesDict
+    if objName is not None:
+        cacheDict["allObjects"][objName].setFaces(facesDict)
+
+    elif (bpy.context.active_object):
+        cacheDict["allObjects"][bpy.context.active_object.name].setFaces(facesDict)
 
     else:
-        print("No active object to save the faces on the cache")
+        log.warning("No active object to save the faces on the cache")
 
 def saveTempValueOnCache (tempValue):
     cacheDict["tempValue"] = tempValue
@@ -87,7 +658,123 @@ def getObjectsOnCache():
     return cacheDict["allObjects"]
 
 def getModifiersOnCache():
-    return cacheDict["allModifiers"]
+    # Returns a list of all the modifiers names in the scene
+
+    return [name for modifiers in cacheDict["allModifiers"].values() for name in modifiers]
+
+def getObjectModifiersOnCache(objName):
+    return cacheDict["allModifiers"].get(objName, [])
+
+def getObjectVersionOnCache(objName):
+    # Returns the version of the cached record of the object (-1 if not on the cache)
+
+    return cacheDict["allObjects"][objName].version if objName in cacheDict["allObjects"] else -1
+
+# Scene state read by resyncCacheAfterUndo: "transforms" = {name: (scale, location, rotation)} of all the objects of the
+# scene, "meshes" = {name: (coords, face centers)} read-only arrays of the meshes that have to be compared again,
+# "newObjects" = {name: ObjectSnapshot} of the objects not on the cache, "modifiers" = the modifiers index.
+# It goes through the same queue as the TranslationEvents, so operatorName/activeName are there for the stage timings and the pins
+ResyncEvent = namedtuple("ResyncEvent", ["operatorName", "activeName", "transforms", "meshes", "newObjects", "modifiers"])
+
+@persistent
+def resyncCacheAfterUndo(scene, *args):
+    # Handler of undo_post and redo_post. Blender does not report undo/redo as an operation (isSameOperation
+    # just ignores it), so the cache has to be resynchronized here, otherwise the next diffs would be computed
+    # against stale data. The scene is read here (captureResync) and the cache is updated by the translation worker
+    # (applyResync) after the events captured before the undo, so the undo does not wait for them
+
+    if not useLogger:
+        return
+
+    # The undo step can change the selection, so the next edit-mode capture reads the mesh in bulk
+    captureScopes.clear()
+
+    submitTranslation(captureResync(), None, None, False)
+
+def captureResync():
+    # Main thread part of the resync. Only what the undo step can have changed is read in bulk:
+    # - objects that have been removed / (re)created
+    # - the transforms of the objects
+    # - the mesh in edit mode (where the undo steps of edit mode act) and meshes whose number of vertices/faces changed.
+    #   The meshes of the queued events may still change before the resync is applied, so they are read too
+
+    cacheObjs = getObjectsOnCache()
+    sceneObjs = bpy.context.scene.objects
+    activeObj = bpy.context.view_layer.objects.active
+    transforms, meshes, newObjects = {}, {}, {}
+
+    with cacheLock:
+        pinned = set(cacheDict["pinnedGeometry"])
+
+    for obj in sceneObjs:
+        transforms[obj.name] = (tuple(obj.scale), tuple(obj.location), tuple(obj.rotation_euler))
+        record = cacheObjs.get(obj.name)
+
+        if record is None:
+            newObjects[obj.name] = snapshotObject(obj)
+            continue
+
+        # The worker may evict them meanwhile
+        vertices, faces = record._vertices, record._faces
+
+        if obj.type != "MESH" or vertices is None or faces is None:
+            # Geometry never read (lazy record) or evicted: it will be snapshotted when needed
+            continue
+
+        if (obj == activeObj and obj.mode == "EDIT") or obj.name in pinned or len(vertices) != len(obj.data.vertices) \
+           or len(faces) != len(obj.data.polygons):
+            coords, _, _, faceCenters = getMeshArraysOfObject(obj, withFaces=True)
+            coords.setflags(write=False)
+            faceCenters.setflags(write=False)
+            meshes[obj.name] = (coords, faceCenters)
+
+    # The active object is pinned as for any event, released once the resync is applied
+    activeName = None if activeObj is None else activeObj.name
+    pinGeometryOnCache(activeName)
+
+    return ResyncEvent("Undo/Redo", activeName, transforms, meshes, newObjects, getAllModifiers())
+
+def applyResync(event):
+    # Translation worker part of the resync: the records of the cache are updated to the scene read by captureResync.
+    # The arrays are compared outside of the lock, only the translation worker changes the records
+
+    with cacheLock:
+        cacheObjs = getObjectsOnCache()
+
+        for name in [name for name in cacheObjs.keys() if name not in event.transforms]:
+            del cacheObjs[name]
+            dropGeometryFromLRU(name)
+
+        for name, (scale, location, rotation) in event.transforms.items():
+            record = cacheObjs.get(name)
+
+            if record is None:
+                saveObjectTransformOnCache(name, objProps=event.newObjects[name])
+
+            elif tuple(record.scale) != scale or tuple(record.location) != location or tuple(record.rotation) != rotation:
+                record.setTransform(scale, location, rotation)
+
+        # Objects created by the events queued before the undo are compared with what the undo left
+        meshes = dict(event.meshes)
+        meshes.update((name, (snapshot._vertices.toArray(), snapshot._faces.toArray())) for name, snapshot in event.newObjects.items()
+                      if cacheObjs.get(name) is not snapshot)
+        records = {name: cacheObjs[name] for name in meshes if name in cacheObjs}
+
+    for name, record in records.items():
+        coords, faceCenters = meshes[name]
+        vertices, faces = record._vertices, record._faces
+        newVertices = vertices is None or not np.array_equal(coords, vertices.toArray())
+        newFaces = faces is None or not np.array_equal(faceCenters, faces.toArray())
+
+        with cacheLock:
+            if newVertices:
+                record.setVertices(coords)
+
+            if newFaces:
+                record.setFaces(faceCenters)
+
+    with cacheLock:
+        saveModifiersOnCache(event.modifiers)
 
 # ======================================================================================================================= #
 # ========================================= Operator Functions ========================================================== #
@@ -124,11 +811,15 @@ def renameOp(operator):
     return [operator.name, list(difference)]
 
 def addModifierOp(operator):
+
+    updateObjectModifiersOnCache(bpy.context.active_object)
    
     return [operator.name, operator.properties.type, bpy.context.active_object.name]
 
 def removeModifierOp(operator):
 
+    updateObjectModifiersOnCache(bpy.context.active_object)
+
     return [operator.name, operator.properties.modifier, bpy.context.active_object.name]
 
 def addConstraintOp(operator):
@@ -244,6 +935,8 @@ def deleteOp(operator):
     
 def shadeChangeOp(operator):
     activeObj = bpy.context.view_layer.objects.active
+
+    invalidateSmoothShadingOnCache([obj.name for obj in bpy.context.selected_objects])
     
     currObjects = getAllObjects()
     saveObjectsOnCache(currObjects)
@@ -373,7 +1066,7 @@ def extrudeOp(operator):
         for key in allVertices.keys():
             if (key not in oldVertices): difference.append(key)
 
-        extrudeValue = [float(value) for value in operations[-1].split('TRANSFORM_OT_translate={"value":')[1].split("),")[0][1:].split(",")]
+        extrudeValue = [float(value) for value in parseOperatorReport(operations[-1])[1]["TRANSFORM_OT_translate"]["value"]]
         saveObjectVerticesOnCache(allVertices)
 
         return [operator.name, {    "vertices": allVertices,
@@ -434,21 +1127,19 @@ def defaultCase(operator):
     else:
         global globalLastOp
 
-        print("Not recognized operation: ", operator.name)
-
-        # Regular expression pattern to match arguments and values
-        arguments_pattern = re.compile(r"(\w+)\s*=\s*([^,)]+)")
+        log.warning("Not recognized operation: %s", operator.name)
 
-        # Extract arguments and values
-        arguments_matches = arguments_pattern.findall(globalLastOp)
+        try:
+            # Extract arguments and values
+            log.debug("Trying to translate: %s %s", operator.name, parseOperatorReport(globalLastOp)[1])
 
-        # Create a list of alternating names and values
-        result_list = [item for sublist in arguments_matches for item in sublist]
-
-        print("Trying to translate: [%d, %d]" %(operator.name, result_list))
+        except ReportSyntaxError as error:
+            log.warning("Could not translate: %s", error)
 
         return ["Not recognized operation: {}".format(operator.name)]
 
+# Per operation handlers of the previous translation (formatOperation). The live path is captureOperation + translateEvent,
+# whose scene dependent part is dispatched by modeHandlers/operationHandlers (see Translation Dispatch)
 operatorsDict = {
     "Run Script": runScriptOp,
     "Toggle Edit Mode": editModeOp,
@@ -476,362 +1167,1530 @@ operatorsDict = {
     "Duplicate Objects": duplicateObjOp,
     "Mirror": mirrorOp,
 
-    # Normals and shading
-    "Shade Smooth": shadeChangeOp,
-    "Shade Flat": shadeChangeOp,
-    "Recalculate Normals": recalcNormalsOp,
+    # Normals and shading
+    "Shade Smooth": shadeChangeOp,
+    "Shade Flat": shadeChangeOp,
+    "Recalculate Normals": recalcNormalsOp,
+
+    "Clear Scale": clearOp,
+    "Clear Location": clearOp,
+    "Clear Rotation": clearOp,
+
+    "Snap Selection to Cursor" : snapOp,
+    "Snap Selection to Active" : snapOp,
+    "Snap Selection to Grid" : snapOp,
+    "Snap Cursor to Active" : snapOp,
+    "Snap Cursor to Selected" : snapOp,
+    "Snap Cursor to World Origin" : snapOp,
+    "Snap Cursor to Grid" : snapOp,
+
+    # For edit mode:
+    "Subdivide": subdivideOp,
+    "Extrude Region and Move": extrudeOp,
+    "Inset Faces": insetOp,
+    "Merge by Distance": mergeByDistanceOp,
+}
+
+def changeShading(description):
+    # Changing the shade mode of the 3D view
+
+    newMode = description.split("= '")[1].strip("'")
+    return ["Change shading mode", newMode, "Scene"]
+
+def notOperatorDefaultCase(description):
+    return ["Not recognized user action: {}".format(description)]
+
+notOperatorsDict = {
+    ("bpy", "context", "space_data", "shading"): changeShading,
+}
+
+# Operations that change the modifier stack of the active object (the modifiers index is updated after them)
+modifierOperations = ("Add Modifier", "Remove Modifier", "Apply Modifier")
+
+# Operations that change the smooth shading of the selected objects (their cached isSmooth state is invalidated)
+shadingOperations = ("Shade Smooth", "Shade Flat", "Shade Auto Smooth")
+
+# ======================================================================================================================= #
+# ========================================= Translation Dispatch ======================================================== #
+# ======================================================================================================================= #
+
+# The translation of an operation is split in two parts:
+# - captureOperation (main thread): the bpy reads declared by the handlers of the operation, copied into an immutable
+#   TranslationEvent. Each piece of scene data is fetched at most once per event (SceneData)
+# - translateEvent (translation worker): parsing of the report and the handlers, handler(event, result) adding the
+#   scene dependent part to "result". It does not touch bpy
+# Every invocation is timed per operation (handlerCosts)
+
+TranslationEvent = namedtuple("TranslationEvent", ["report", "operatorName", "activeName", "mode", "handlers", "data", "fetchTime"])
+
+class SceneData:
+    # Scene data of one event, fetched on the first request and then reused. The kinds of data are:
+    # "objects" -> names of the selected objects, "transforms" -> {name: {"scale", "location", "rotation"}} of the selected objects,
+    # "newObjects" -> {name: ObjectSnapshot} of the selected/active objects not on the cache yet,
+    # "activeMesh" -> MeshCapture of the active mesh,
+    # "modifiers" -> modifier names of the active object
+
+    __slots__ = ("operator", "activeObj", "data", "selectedObjs")
+
+    def __init__(self, operator = None):
+        self.operator = operator
+        self.activeObj = bpy.context.view_layer.objects.active
+        self.data = {}
+        self.selectedObjs = None
+
+    def get(self, need):
+        if need not in self.data:
+            self.data[need] = sceneDataFetchers[need](self)
+
+        return self.data[need]
+
+    def selected(self):
+        if self.selectedObjs is None:
+            self.selectedObjs = list(bpy.context.selected_objects)
+
+        return self.selectedObjs
+
+def fetchSelectedObjects(scene):
+    return tuple(obj.name for obj in scene.selected())
+
+def fetchTransforms(scene):
+    return {obj.name: {"scale" : list(obj.scale),
+                       "location" : list(obj.location),
+                       "rotation" : list(obj.rotation_euler)} for obj in scene.selected()}
+
+def fetchNewObjects(scene):
+    cacheObjs = getObjectsOnCache()
+    objs = scene.selected() + ([scene.activeObj] if scene.activeObj else [])
+
+    return {obj.name: snapshotObject(obj) for obj in objs if obj.name not in cacheObjs}
+
+def fetchActiveMesh(scene):
+    capture = captureScopedMesh(scene.activeObj, scene.operator)
+
+    if capture is None:
+        capture = captureFullMesh(scene.activeObj)
+
+    return capture
+
+def fetchModifiers(scene):
+    return None if scene.activeObj is None else [modifier.name for modifier in scene.activeObj.modifiers]
+
+sceneDataFetchers = {
+    "objects": fetchSelectedObjects,
+    "transforms": fetchTransforms,
+    "newObjects": fetchNewObjects,
+    "activeMesh": fetchActiveMesh,
+    "modifiers": fetchModifiers,
+}
+
+# Read-only arrays of the active mesh handed to the worker. A full capture has all the vertices (coords, selection, edges)
+# and face centers, with scope None. A scoped capture (captureScopedMesh) has only the coords of the vertices in scope
+# and the centers of the faceIndices faces, the rest of the mesh is the one on the cache
+MeshCapture = namedtuple("MeshCapture", ["vertCount", "faceCount", "coords", "selection", "edges", "faceCenters", "scope", "faceIndices"])
+
+# What the next capture of a mesh in edit mode can be scoped to, computed by its last full capture: {object name:
+# CaptureScope}. "selected" = indices of the selected vertices, "scope" = them and their one-ring, "faceIndices" = the
+# faces using any vertex of the scope. Only used on the main thread
+CaptureScope = namedtuple("CaptureScope", ["meshPointer", "vertCount", "edgeCount", "faceCount", "selected", "scope", "faceIndices"])
+captureScopes = {}
+
+# Operations that only move the selected vertices, so their capture can be scoped
+scopedOperations = ("Move", "Rotate", "Resize", "Shear", "To Sphere", "Shrink/Fatten", "Push/Pull", "Edge Slide", "Vertex Slide",
+                    "Smooth Vertices")
+
+# Largest scope (fraction of the vertices of the mesh) read through the bmesh. A vertex costs far more to read that way
+# than in bulk, so bigger scopes are read in bulk
+scopedCaptureRatio = 0.05
+
+def captureFullMesh(obj):
+    # Reads the whole mesh in bulk. In edit mode, the scope of the next captures is computed from it
+
+    coords, selection, edges, faceCenters = getMeshArraysOfObject(obj, withEdges=True, withFaces=True)
+
+    # The arrays are handed to the worker, so they are made read-only
+    for values in (coords, selection, edges, faceCenters):
+        values.setflags(write=False)
+
+    if obj.mode == "EDIT":
+        updateCaptureScope(obj, selection, edges)
+
+    else:
+        captureScopes.pop(obj.name, None)
+
+    return MeshCapture(len(coords), len(faceCenters), coords, selection, edges, faceCenters, None, None)
+
+def updateCaptureScope(obj, selection, edges):
+    # Scope of the next captures of the mesh: the selected vertices, their one-ring and the faces using them
+
+    scope = getOneRing(selection, edges)
+
+    if len(scope) > scopedCaptureRatio * len(selection):
+        captureScopes.pop(obj.name, None)
+        return
+
+    mesh = obj.data
+    loopTotals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loopTotals)
+    loopVertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loopVertices)
+
+    # The loops of the faces are stored one face after the other
+    inScope = np.zeros(len(selection), dtype=bool)
+    inScope[scope] = True
+    faceOfLoop = np.repeat(np.arange(len(loopTotals)), loopTotals)
+    faceIndices = np.unique(faceOfLoop[inScope[loopVertices]])
+
+    captureScopes[obj.name] = CaptureScope(mesh.as_pointer(), len(selection), len(edges), len(loopTotals), np.flatnonzero(selection),
+                                           scope, faceIndices)
+
+def captureScopedMesh(obj, operator):
+    # Reads only the vertices in the scope of the last full capture of the mesh, and the faces using them, through the
+    # edit bmesh (without flushing it to the mesh). Only for the operations that just move the selected vertices, when
+    # the topology and the selection are still the ones of that capture. Returns None if the mesh has to be read in bulk
+
+    scope = captureScopes.get(obj.name)
+    mesh = obj.data
+
+    if scope is None or operator is None or operator.name not in scopedOperations or captureMode != "SELECTION":
+        return None
+
+    # Proportional editing and mesh symmetry also move unselected vertices
+    if getattr(getattr(operator, "properties", None), "use_proportional_edit", False) or \
+       any(getattr(mesh, "use_mirror_" + axis, False) for axis in "xyz"):
+        return None
+
+    if scope.meshPointer != mesh.as_pointer() or mesh.total_vert_sel != len(scope.selected):
+        return None
+
+    bm = bmesh.from_edit_mesh(mesh)
+
+    if (len(bm.verts), len(bm.edges), len(bm.faces)) != (scope.vertCount, scope.edgeCount, scope.faceCount):
+        return None
+
+    bm.verts.ensure_lookup_table()
+    bm.faces.ensure_lookup_table()
+    verts, faces = bm.verts, bm.faces
+
+    # Same number of selected vertices, so the selection is the same if they are all still selected
+    if not all(verts[index].select for index in scope.selected.tolist()):
+        return None
+
+    coords = np.array([verts[index].co[:] for index in scope.scope.tolist()], dtype=np.float32).reshape(-1, 3)
+    faceCenters = np.array([faces[index].calc_center_median()[:] for index in scope.faceIndices.tolist()], dtype=np.float32).reshape(-1, 3)
+
+    for values in (coords, faceCenters):
+        values.setflags(write=False)
+
+    return MeshCapture(scope.vertCount, scope.faceCount, coords, None, None, faceCenters, scope.scope, scope.faceIndices)
+
+def snapshotObject(obj):
+    # Snapshot of an object that is not on the cache yet. Its mesh is read in bulk, without making it active and toggling edit mode
+
+    coords, faceCenters = None, None
+    if obj.type == "MESH":
+        coords, _, _, faceCenters = getMeshArraysOfObject(obj, withFaces=True)
+
+    return ObjectSnapshot(obj.name, obj.scale, obj.location, obj.rotation_euler, coords, faceCenters, getSmoothShadingOnCache(obj))
+
+def editMeshHandler(event, result):
+    # Which vertices/faces of the active mesh have been created, deleted or moved by the operation
+
+    runToEnd(editMeshHandlerChunks(event, result))
+
+def editMeshHandlerChunks(event, result):
+    # Resumable version of editMeshHandler, pausing between the diffing stages of big meshes. The steps get the mesh as
+    # MeshCoords: the cache records and the steps share the arrays, nothing is copied per vertex
+
+    capture = event.data["activeMesh"]
+
+    # Only the reads and the updates of the cache hold the lock, the records are immutable MeshCoords so the diffs are
+    # done without it (only this worker changes the records)
+    with cacheLock:
+        snapshot = getObjectsOnCache()[event.activeName]
+        oldVertices = snapshot.vertices
+        oldFaces = snapshot.faces
+
+    oldVertNumber = len(oldVertices)
+    oldFacesNumber = len(oldFaces)
+    newVertNumber = capture.vertCount
+    newFacesNumber = capture.faceCount
+
+    if capture.scope is not None:
+        # Scoped capture: only the vertices in the scope and the faces using them have been read, the rest of the mesh
+        # is the one on the cache
+
+        if ( oldVertNumber != newVertNumber or oldFacesNumber != newFacesNumber ):
+            log.warning("The cached mesh of %s does not match the scene, the operation is not diffed", event.activeName)
+            result["editMode"] = True
+            return
+
+        modified = np.any(capture.coords != oldVertices.take(capture.scope), axis=1)
+        modifiedFaces = np.any(capture.faceCenters != oldFaces.take(capture.faceIndices), axis=1)
+        yield
+
+        newVertices = oldVertices.withRows(capture.scope[modified], capture.coords[modified])
+        newFaces = oldFaces.withRows(capture.faceIndices[modifiedFaces], capture.faceCenters[modifiedFaces])
+        vertDiff = capture.scope[modified].tolist()
+
+        if (len(vertDiff) != 0):
+            with cacheLock:
+                saveObjectVerticesOnCache(newVertices, event.activeName)
+                saveObjectFacesOnCache(newFaces, event.activeName)
+
+            result["selectedVertices"] = vertDiff
+
+    elif ( oldVertNumber != newVertNumber or oldFacesNumber != newFacesNumber ):
+        # Means it is an operation that added/removed vertices/faces. In this case, save which vertices/faces have been created/deleted.
+        # Since the indices always go from 0 to N-1, the created/deleted ones are the ones after the smaller count
+
+        if (oldVertNumber < newVertNumber or oldFacesNumber < newFacesNumber):
+            # Means created more vertices/faces
+
+            result["newVertices"] = list(range(oldVertNumber, newVertNumber))
+            result["newFaces"] = list(range(oldFacesNumber, newFacesNumber))
+
+        else:
+            # Means deleted vertices
+
+            result["deletedVertices"] = list(range(newVertNumber, oldVertNumber))
+            result["deletedFaces"] = list(range(newFacesNumber, oldFacesNumber))
+
+        newVertices = MeshCoords(capture.coords)
+        newFaces = MeshCoords(capture.faceCenters)
+
+        with cacheLock:
+            saveObjectVerticesOnCache(newVertices, event.activeName)
+            saveObjectFacesOnCache(newFaces, event.activeName)
+
+    else:
+        # Means it is an operation that just modified vertices. Only the vertices in the capture scope
+        # (selected ones + one-ring, or all of them in full mode) can have been moved
+
+        scope = np.asarray(getCaptureScope(capture.selection, capture.edges, result), dtype=np.int64)
+        yield
+        modified = np.any(capture.coords[scope] != oldVertices.take(scope), axis=1)
+        vertDiff = scope[modified].tolist()
+        yield
+
+        newVertices = MeshCoords(capture.coords)
+        newFaces = MeshCoords(capture.faceCenters)
+
+        if (len(vertDiff) != 0):
+            # Means modification occurred
+
+            with cacheLock:
+                saveObjectVerticesOnCache(newVertices, event.activeName)
+                saveObjectFacesOnCache(newFaces, event.activeName)
+
+            result["selectedVertices"] = vertDiff
+
+    result["vertices"] = newVertices
+    result["faces"] = newFaces
+    result["editMode"] = True
+
+def objectTransformsHandler(event, result):
+    # Save new transform properties of objetcs if modified. It only compares a few transforms, so all of it holds the lock
+
+    with cacheLock:
+        cacheObjs = getObjectsOnCache()
+        newObjects = event.data["newObjects"]
+
+        if (event.activeName in cacheObjs):
+            # Means it is an update
+
+            selectedNames = event.data["objects"]
+            transforms = event.data["transforms"]
+
+            for name in selectedNames:
+                # There can be multiple objects being selected
+
+                if name in cacheObjs:
+                    # There are some operations that create new objects from edit mode (like separate)
+
+                    oldObj = cacheObjs[name]
+                    objProps = transforms[name]
+                
+                    if(name == event.activeName):
+                        # If active, include new properties in the translated operation
+
+                        for key in objProps.keys():
+                            if (oldObj[key] != objProps[key]):
+                                # Add into dictionary result the modified property
+                                result["new" + key] = objProps[key]
+                
+                    # Update cache with new values
+                    saveObjectTransformOnCache(name, objProps["scale"], objProps["location"], objProps["rotation"])
+            
+                elif name in newObjects:
+                    saveObjectTransformOnCache(name, objProps=newObjects[name])
+
+            if (len(selectedNames) > 1):
+                result["selectedObjs"] = list(selectedNames)
+
+        elif event.activeName in newObjects:
+            # Means it is adding a new one: only the new object is snapshotted, the other ones are already on the cache
+            saveObjectTransformOnCache(event.activeName, objProps=newObjects[event.activeName])
+    
+        result["editMode"] = False
+
+def modifierStackHandler(event, result):
+    # Only the modifier stack of the active object changed
+
+    if event.activeName is not None:
+        with cacheLock:
+            saveObjectModifiersOnCache(event.activeName, event.data["modifiers"])
+
+def shadingHandler(event, result):
+
+    with cacheLock:
+        invalidateSmoothShadingOnCache(event.data["objects"])
+
+# Handler of the mode of the active object and the scene data it needs
+modeHandlers = {
+    "EDIT": (editMeshHandler, ("activeMesh",)),
+    "OBJECT": (objectTransformsHandler, ("objects", "transforms", "newObjects")),
+}
+
+# Handlers that run after the mode handler for specific operations
+operationHandlers = dict([(name, (modifierStackHandler, ("modifiers",))) for name in modifierOperations] +
+                         [(name, (shadingHandler, ("objects",))) for name in shadingOperations])
+
+# Cost of the translations per operation: {operation name: {"calls", "parse", "fetch", "handlers", "max"}} (seconds)
+handlerCosts = {}
+
+def getOperationCost(name):
+
+    if name not in handlerCosts:
+        handlerCosts[name] = {"calls": 0, "parse": 0.0, "fetch": 0.0, "handlers": 0.0, "max": 0.0}
+
+    return handlerCosts[name]
+
+def getHandlerCosts():
+    # Translation cost per operation, the most expensive (total time) first
+
+    costs = []
+    for name, cost in list(handlerCosts.items()):
+        total = cost["parse"] + cost["fetch"] + cost["handlers"]
+        costs.append(dict(cost, name=name, total=total, mean=total / max(cost["calls"], 1)))
+
+    return sorted(costs, key=lambda cost: cost["total"], reverse=True)
+
+def captureOperation(operator, isSame):
+    # Main thread part of the translation: reads the scene data needed by the handlers of the operation and returns
+    # it with the report as a TranslationEvent. Nothing is parsed or diffed here. The active object stays pinned on
+    # the cache until the event is translated (translatePinnedEvent releases it)
+
+    start = time.perf_counter()
+    scene = SceneData(operator)
+    activeObj = scene.activeObj
+    mode = None if activeObj == None else activeObj.mode 
+    operatorName = None
+    handlers = []
+
+    if isSame[:7] == "bpy.ops":
+        # The structure of bpy.ops is different than the others -> means it is actually an operation
+
+        operatorName = operator.name
+
+        if (mode and mode == "EDIT" and activeObj.type == "MESH"):
+            handlers.append(modeHandlers["EDIT"])
+
+        elif (mode and mode == "OBJECT"):
+            handlers.append(modeHandlers["OBJECT"])
+
+        if operatorName in operationHandlers:
+            handlers.append(operationHandlers[operatorName])
+
+        for handler, needs in handlers:
+            for need in needs:
+                scene.get(need)
+
+    pinGeometryOnCache(None if activeObj == None else activeObj.name, "activeMesh" in scene.data)
+
+    return TranslationEvent(isSame, operatorName, None if activeObj == None else activeObj.name, mode, tuple(handlers),
+                            MappingProxyType(scene.data), time.perf_counter() - start)
+
+def translateEvent(event):
+    # Returns the event on the correct format to be used on the tutorial ([] if the report cannot be translated).
+    # It does not touch bpy, so it runs on the translation worker
+
+    return runToEnd(translateEventChunks(event))
+
+def translateEventChunks(event, chunked = False):
+    # Resumable version of translateEvent (see Frame Scheduler): pauses after the parsing and, if chunked, inside the
+    # handlers that have a resumable version. The time paused is not accounted in the costs
+
+    start = time.perf_counter()
+
+    if type(event) == ResyncEvent:
+        # Not an operation: the cache is resynchronized after an undo/redo (see resyncCacheAfterUndo)
+        applyResync(event)
+        return []
+
+    if event.operatorName is not None:
+
+        # Parsing all the properties of the operation ({} if it does not have properties). Repeated reports come from the
+        # translation cache, only the scene dependent part (geometry diffs, transforms, active object) is recomputed by the handlers
+        try:
+            result = translateReport(event.report, event.operatorName)[1]
+
+        except ReportSyntaxError as error:
+            log.warning("Could not translate: %s", error)
+            return []
+
+        cost = getOperationCost(event.operatorName)
+        cost["parse"] += time.perf_counter() - start
+
+        for handler, needs in event.handlers:
+            resumable = chunkedHandlers.get(getattr(handler, "__wrapped__", handler)) if chunked else None
+            pauseStart = time.perf_counter()
+            yield
+            start += time.perf_counter() - pauseStart
+            handlerStart = time.perf_counter()
+            paused = 0.0
+
+            if resumable is None:
+                handler(event, result)
+
+            else:
+                for chunk in resumable(event, result):
+                    pauseStart = time.perf_counter()
+                    yield
+                    paused += time.perf_counter() - pauseStart
+
+            cost["handlers"] += time.perf_counter() - handlerStart - paused
+            start += paused
+
+        if event.activeName == None:
+            # Means its probably a deletion, so have to include manually "editMode"
+            result["editMode"] = False
+
+        translated = [event.operatorName, result, event.activeName]
+
+    else:
+        # # In this case, it is considering everything else that is not an operation (bpy.ops) but still is an user action
+
+        # translated = [""]
+
+        # # Get the first (because it might have more equal signs on the other side) occurrence of " = " to divide the 2 parts
+        # processed = isSame.split(" = ", maxsplit=1)
+
+        # # Get the value of the property
+        # value = eval(processed[1])
+
+        # # List of names, groups etc and operation "address"
+        # groupsList = [["group", ""], ["subgroup", ""], ["propIndex", ""]]
+
+        # # Get all the operator "address"
+        # processed = processed[0].split(".")
+
+        # groupIndex = 0
+
+        # for i, addr in enumerate(processed[:-1]): # Ignore the last one since it is the property name changed
+        #     if "[" in addr:
+        #         # Get what is inside: ['groupname']
+        #         groupName = addr[addr.index("[")+1:addr.index("]")]
+        #         groupName = eval(groupName)
+                
+        #         if groupIndex <= 2:
+        #             groupsList[groupIndex][1] = groupName
+                
+        #         else:
+        #             groupsList.append(["other"+str(groupIndex-2), groupName])
+
+        #         groupIndex += 1
+
+        #         # Get the address without the group name (also getting everything after it because there might be some operations that contains it)
+        #         translated[0] = translated[0] + " " + addr[ 0 : addr.index("[") ] + addr[ addr.index("]")+1 : ]
+
+        #     else:
+        #         translated[0] = translated[0] + " " + addr
+
+        # groupsList.append([processed[-1], value])
+        # translated.append(dict(groupsList))
+
+        # Address, groups (group/subgroup/propIndex/other1...) and typed value of the property, parsed in a single pass
+        # (or taken from the translation cache when the same property is set again)
+        try:
+            address, props = translateReport(event.report)
+
+        except ReportSyntaxError as error:
+            log.warning("Could not translate: %s", error)
+            return []
+
+        # Property changes have no handlers, only the parsing is accounted
+        cost = getOperationCost(address)
+        cost["parse"] += time.perf_counter() - start
+
+        props["editMode"] = True if event.mode == 'EDIT' else False
+        translated = [address, props, event.activeName]
+
+    cost["fetch"] += event.fetchTime
+    cost["calls"] += 1
+    cost["max"] = max(cost["max"], time.perf_counter() - start + event.fetchTime)
+
+    return translated
+
+# ======================================================================================================================= #
+# ========================================= Translation Worker ========================================================== #
+# ======================================================================================================================= #
+
+# modal only captures the events (captureOperation) and queues them. The translation worker translates them in order
+# (it is the only one changing the records of the cache) and hands the translated steps to the validation worker, which
+# validates/records them and posts a result record that is reported on the main thread by a timer. So the viewport never
+# waits for the parsing, the diffs (NumPy releases the GIL) or the validation. An undo queues its resync after them
+
+translationQueue = queue.Queue()
+validationQueue = queue.Queue()
+resultsQueue = queue.Queue()
+translationWorker = None
+validationWorker = None
+
+# Held while reading or changing the structure of the cache (records, LRU, pins), so no thread sees it halfway through
+# an update. It is never held for a whole translation: the diffs run outside of it
+cacheLock = threading.RLock()
+
+def processTranslation(event, tut, user, tutorialMode):
+    # Translates the event and validates it against the tutorial (or records it). Returns the result record to be
+    # reported on the main thread, None if the event could not be translated
+
+    return processTranslated(translatePinnedEvent(event), event, tut, user, tutorialMode)
+
+def translatePinnedEvent(event):
+    # Translation worker part of processTranslation: translates the event against the cache and releases the active
+    # object pinned by captureOperation
+
+    try:
+        return translateEvent(event)
+
+    finally:
+        releaseGeometryOnCache(event.activeName)
+
+def processTranslated(translated, event, tut, user, tutorialMode):
+    # Validation worker part of processTranslation. The validation does not change the cache
+
+    if (len(translated) == 0): 
+        return None
+
+    if tutorialMode:
+        # The tutorial may still be loading (Tutorial.loadTutorialStepsInBackground)
+        tut.loaded.wait()
+
+        if tut.loadError is not None:
+            return {"error": "could not load the tutorial: " + tut.loadError}
+
+        return validateTranslation(translated, (event.activeName, event.mode), tut, user)
+
+    tut.addTutorialStep(translated)
+
+    return {"translated": translated, "verdict": "recorded"}
+
+def validateTranslation(translated, activeState, tut, user):
+    # Validates a translated operation against the tutorial and updates the user profile. Returns the result record.
+    # Also used by the headless replay (TutorialReplay.py), which feeds it the steps of a recorded log
+
+    return recordValidation(translated, tut.validateStep(translated, activeState), tut, user)
+
+def recordValidation(translated, result, tut, user):
+    # Result record of the validation (result of Tutorial.validateStep) of a translated operation. Updates the user profile
+
+    record = {"translated": translated, "verdict": result[0]}
+
+    if (result == ['ignored']):
+        # Selection that the tutorial does not ask for: neither right nor wrong
+        record["got"] = translated[0]
+
+    elif (result == ['correct']):
+        user.updateUserProfile(translated[0], True)
+        nextStep = tut.getNextStep()
+
+        # The meshes of the next step are not shown
+        stepDescription = list(nextStep)
+        stepDescription[1] = {key: value for key, value in nextStep[1].items() if key not in ("vertices", "faces")}
+        record["progress"] = tut.getProgress()
+        record["nextStep"] = stepDescription
+
+    elif(result == ['end']):
+        record["recommendations"] = user.makeRecommendation()
+
+    else:
+        user.updateUserProfile(translated[0], False)
+        record["expected"] = result[2][0]
+        record["got"] = result[1][0]
+
+    return record
+
+def reportTranslation(record):
+    # Main thread: shows the result of a processed event
+
+    if "error" in record:
+        log.error("Could not process the operation: %s", record["error"])
+
+    elif record["verdict"] == "correct":
+        log.info("============================ Correct operation!")
+        log.info("============================ Your progress: %.1f %%", record["progress"] * 100)
+        log.info("============================ NEXT STEP: Perform the following operation: %s", record["nextStep"])
+
+    elif record["verdict"] == "end":
+        log.info("============================ Tutorial Finished!")
+        log.info("RECOMMENDATIONS: %s", record["recommendations"])
+
+    elif record["verdict"] == "wrong":
+        log.info("============================ WRONG OPERATION!")
+        log.info("============================ Expected operation: %s", record["expected"])
+        log.info("============================ Got:                %s", record["got"])
+
+    elif record["verdict"] == "ignored":
+        log.debug("Selection ignored: %s", record["got"])
+
+def runTranslationWorker():
+
+    while True:
+        item = translationQueue.get()
+
+        try:
+            if item is None:
+                # Sent by stopTranslationWorker, passed on to the validation worker
+                validationQueue.put(None)
+                return
+
+            validationQueue.put((translatePinnedEvent(item[0]),) + item)
+
+        except Exception:
+            resultsQueue.put({"error": traceback.format_exc()})
+
+        finally:
+            translationQueue.task_done()
+
+def runValidationWorker():
+
+    while True:
+        item = validationQueue.get()
+
+        try:
+            if item is None:
+                return
+
+            record = processTranslated(*item)
+
+            if record is not None:
+                resultsQueue.put(record)
+
+        except Exception:
+            resultsQueue.put({"error": traceback.format_exc()})
+
+        finally:
+            validationQueue.task_done()
+
+def consumeTranslationResults():
+    # Timer (main thread) reporting the results posted by the worker and flushing the last journaled steps.
+    # Stops once the worker is stopped and drained
+
+    while True:
+        try:
+            record = resultsQueue.get_nowait()
+        except queue.Empty:
+            break
+
+        reportTranslation(record)
+
+    if sessionJournal is not None:
+        sessionJournal.flushIfDue()
+
+    if translationWorker is None:
+        return None
+
+    return 0.05
+
+def startTranslationWorker():
+    global translationWorker, validationWorker
+
+    if useTranslationWorker and translationWorker is None:
+        translationWorker = threading.Thread(target=runTranslationWorker, name="loggerTranslationWorker", daemon=True)
+        validationWorker = threading.Thread(target=runValidationWorker, name="loggerValidationWorker", daemon=True)
+        translationWorker.start()
+        validationWorker.start()
+
+        if not bpy.app.timers.is_registered(consumeTranslationResults):
+            bpy.app.timers.register(consumeTranslationResults, first_interval=0.05)
+
+def stopTranslationWorker():
+    # Lets the workers finish the queued events, then stops them and reports what is left
+
+    global translationWorker, validationWorker
+
+    if translationWorker is not None:
+        translationQueue.put(None)
+        translationWorker.join()
+        validationWorker.join()
+        translationWorker = None
+        validationWorker = None
+
+    consumeTranslationResults()
+
+def waitForTranslations():
+    # Blocks until all the queued events are processed (e.g. before the profile is written)
+
+    if translationWorker is not None:
+        translationQueue.join()
+        validationQueue.join()
+
+    drainScheduler()
+
+def submitTranslation(event, tut, user, tutorialMode):
+    # Queues the event for the worker or the frame scheduler, or processes it right away when both are disabled
+
+    if schedulerRunning:
+        putOffFullCollections()
+        schedulerTasks.append(translateEventTask(event, tut, user, tutorialMode))
+        schedulerStats["maxBacklog"] = max(schedulerStats["maxBacklog"], len(schedulerTasks) + len(validationTasks))
+        return
+
+    if translationWorker is not None:
+        translationQueue.put((event, tut, user, tutorialMode))
+        return
+
+    try:
+        record = processTranslation(event, tut, user, tutorialMode)
+    except Exception:
+        record = {"error": traceback.format_exc()}
+
+    if record is not None:
+        reportTranslation(record)
+
+# ======================================================================================================================= #
+# ============================================ Frame Scheduler ========================================================== #
+# ======================================================================================================================= #
+
+# Alternative to the translation worker (translationMode "FRAME_BUDGET"): the events are processed on the main thread
+# by a timer, as resumable tasks. A task is a generator pausing between chunks of its work: after the parsing, between
+# the handlers, every 20000 rows of the mesh dictionaries, every 256 comparisons of the mesh validation... Each tick
+# of the timer runs chunks of the oldest task until frameBudget is spent, so an operation with a huge diff
+# (Subdivide, Merge by Distance, booleans...) is spread over many ticks instead of freezing the viewport, and no worker
+# thread competes with Blender for the GIL. As with the workers, each event has a translation task and then a validation
+# task. The translation tasks are run first, one after the other in the order of the events, so the cache sees the
+# operations in order and an undo only waits for them. The validation tasks follow, also in order, so the tutorial
+# sees the operations in order too. Only the capture (captureOperation, in modal) is not split: the scene has to be
+# read when the event happens.
+# A full collection of the garbage collector walks every container object, and the mesh dictionaries are millions of
+# small lists: it takes hundreds of milliseconds, longer than any chunk. So, while tasks are queued, the threshold of
+# the oldest generation is raised and only the young generations are collected automatically (they only hold the
+# objects created since their last collection). The collector is shared by the whole interpreter, so nothing else is
+# changed: its thresholds are put back as soon as the queue is empty, and the next full collection happens as usual
+
+translationMode = "WORKER" # "WORKER" (translation worker thread) or "FRAME_BUDGET" (frame scheduler on the main thread)
+frameBudget = 0.005 # Seconds of scheduled work per tick
+schedulerTasks = deque() # Translation tasks of the events not translated yet, in order
+validationTasks = deque() # Validation tasks of the translated events, in order
+schedulerRunning = False
+schedulerStats = {"tasks": 0, "chunks": 0, "ticks": 0, "maxTick": 0.0, "overruns": 0, "maxBacklog": 0}
+schedulerGcThresholds = None # Thresholds of the garbage collector put aside by the scheduler while tasks are queued
+putOffThreshold = 2**31 - 1 # Threshold of the oldest generation while tasks are queued (the largest one accepted)
+schedulerWaiting = None # Event the oldest validation task waits for (it yields it, e.g. the tutorial loading), None if not blocked
+
+# Resumable versions of the handlers
+chunkedHandlers = {editMeshHandler: editMeshHandlerChunks}
+
+def runToEnd(chunks):
+    # Runs a resumable task (generator) without pausing and returns its result
+
+    try:
+        while True:
+            next(chunks)
+
+    except StopIteration as done:
+        return done.value
+
+def translateEventTask(event, tut, user, tutorialMode):
+    # Translation task of the event (resumable version of translatePinnedEvent). Queues its validation task
+
+    try:
+        translated = yield from translateEventChunks(event, chunked=True)
+
+    finally:
+        releaseGeometryOnCache(event.activeName)
+
+    validationTasks.append(processTranslatedChunks(translated, event, tut, user, tutorialMode))
+
+def processTranslatedChunks(translated, event, tut, user, tutorialMode):
+    # Resumable version of processTranslated
+
+    if (len(translated) == 0): 
+        return None
+
+    yield
+
+    if tutorialMode:
+        if not tut.loaded.is_set():
+            # Waits for the tutorial loaded in the background without blocking the tick (see runScheduledChunks)
+            yield tut.loaded
+
+        if tut.loadError is not None:
+            return {"error": "could not load the tutorial: " + tut.loadError}
+
+        result = yield from tut.validateStepChunks(translated, (event.activeName, event.mode))
+        return recordValidation(translated, result, tut, user)
+
+    tut.addTutorialStep(translated)
+
+    return {"translated": translated, "verdict": "recorded"}
+
+def runScheduledChunks(budget, wait = False):
+    # Runs chunks of the queued tasks, the translations first, in order, until budget (seconds) is spent or no task is
+    # left. A validation task yielding a threading.Event is not resumed until it is set: the run stops there, or waits
+    # for it if wait. Returns the number of chunks run
+
+    global schedulerWaiting
+
+    start = time.perf_counter()
+    chunks = 0
+
+    while time.perf_counter() - start < budget:
+        tasks = schedulerTasks if schedulerTasks else validationTasks
+
+        if not tasks:
+            break
+
+        if tasks is validationTasks and schedulerWaiting is not None:
+            if not schedulerWaiting.is_set():
+                if not wait:
+                    break
+
+                schedulerWaiting.wait()
+
+            schedulerWaiting = None
+
+        task = tasks[0]
+        chunks += 1
+
+        try:
+            pending = next(task)
+
+            if pending is not None:
+                # The oldest validation task is blocked on this event
+                schedulerWaiting = pending
+
+            continue
+
+        except StopIteration as done:
+            record = done.value
+
+        except Exception:
+            record = {"error": traceback.format_exc()}
+
+        tasks.popleft()
+
+        if tasks is validationTasks or record is not None:
+            # The event has been processed (or its translation failed)
+            schedulerStats["tasks"] += 1
+
+        if record is not None:
+            reportTranslation(record)
+
+    if not schedulerTasks and not validationTasks:
+        restoreFullCollections()
+
+    return chunks
+
+def putOffFullCollections():
+    # No automatic collection of the oldest generation while tasks are queued (see Frame Scheduler)
+
+    global schedulerGcThresholds
+
+    if schedulerGcThresholds is None:
+        schedulerGcThresholds = gc.get_threshold()
+        gc.set_threshold(schedulerGcThresholds[0], schedulerGcThresholds[1], putOffThreshold)
+
+def restoreFullCollections():
+    # Puts back the thresholds of the garbage collector, unless someone else changed them in the meantime
+
+    global schedulerGcThresholds
+
+    if schedulerGcThresholds is not None:
+        if gc.get_threshold()[2] == putOffThreshold:
+            gc.set_threshold(*schedulerGcThresholds)
+
+        schedulerGcThresholds = None
+
+def schedulerTick():
+    # Timer of the frame scheduler (main thread). Also flushes the last journaled steps
+
+    start = time.perf_counter()
+    chunks = runScheduledChunks(frameBudget)
+    elapsed = time.perf_counter() - start
+
+    if chunks:
+        schedulerStats["ticks"] += 1
+        schedulerStats["chunks"] += chunks
+        schedulerStats["maxTick"] = max(schedulerStats["maxTick"], elapsed)
+
+        if elapsed > 2 * frameBudget:
+            # A single chunk longer than the budget
+            schedulerStats["overruns"] += 1
+
+    if sessionJournal is not None:
+        sessionJournal.flushIfDue()
+
+    if not schedulerRunning:
+        return None
+
+    # Next tick right away while there is work left (that is not waiting)
+    return 0 if schedulerTasks or (validationTasks and (schedulerWaiting is None or schedulerWaiting.is_set())) else 0.05
+
+def startScheduler():
+    global schedulerRunning
+
+    if schedulerRunning:
+        return
+
+    schedulerRunning = True
+    schedulerStats.update({"tasks": 0, "chunks": 0, "ticks": 0, "maxTick": 0.0, "overruns": 0, "maxBacklog": 0})
+
+    if not bpy.app.timers.is_registered(schedulerTick):
+        bpy.app.timers.register(schedulerTick, first_interval=0.05)
+
+def drainScheduler():
+    # Runs the queued tasks to the end (e.g. before the profile is written)
+
+    while schedulerTasks or validationTasks:
+        runScheduledChunks(math.inf, wait=True)
+
+def stopScheduler():
+    # The tasks still queued are part of the session, so they are finished before stopping
+
+    global schedulerRunning
+
+    drainScheduler()
+    schedulerRunning = False
+
+def getSchedulerStats():
+    stats = dict(schedulerStats)
+    stats["backlog"] = len(schedulerTasks) + len(validationTasks)
+    stats["budget"] = frameBudget
+
+    return stats
+
+def updateFrameBudget(self, context):
+    global frameBudget
+    frameBudget = context.scene.frame_budget / 1000
+
+# ======================================================================================================================= #
+# ============================================== Stage Timings ========================================================== #
+# ======================================================================================================================= #
+
+# Opt-in latency of each stage between a click and its verdict, per operation:
+# - report: isSameOperation (getPerformedOperations copies the Info log through the clipboard), on every handled event
+# - sceneRead: captureOperation, the bpy reads of the event
+# - translation: translateEventChunks (includes diffing), diffing: the scene dependent handlers (geometry diffs, transforms...)
+# - validation: Tutorial.validateStepChunks (includes filter), filter: getFilteredOp
+# translateEvent and Tutorial.validateStep run their resumable versions, so the stages are measured the same way with the
+# workers and with the frame scheduler (where only the time spent in the chunks is counted, not the pauses between them)
+# - profile: userModel.updateUserProfile
+# Enabling it replaces these functions by timed wrappers and disabling it puts the originals back, so nothing is
+# measured (or paid) while it is off. The last stageSamples durations of each (operation, stage) are kept
+
+stageNames = ("report", "sceneRead", "translation", "diffing", "validation", "filter", "profile")
+stageSamples = 1000
+stageTimings = {} # {operation: {stage: deque of durations (seconds)}}
+stageTimingsEnabled = False
+stageOriginals = {} # {(owner, attribute): original function} while enabled
+
+# Key of the property changes (their address is only known once they are parsed) and of the events without new operation
+propertyStageKey = "Property change"
+idleStageKey = "(no operation)"
+
+def stageKey(name):
+
+    if name is None or name[:4] == " bpy":
+        return propertyStageKey
+
+    return name
+
+def reportStageKey(args, result):
+    # isSameOperation(formattedOldOp, newOp, ...) returns the report of the new action, or True if there is none
+
+    if type(result) == bool:
+        return idleStageKey
+
+    return stageKey(args[1].name if result[:7] == "bpy.ops" and args[1] is not None else None)
+
+# (owner class (None for the functions of the module), attribute, stage, key of the call: function(args, result),
+#  whether the function is resumable (a generator))
+timedStages = [
+    (None, "isSameOperation", "report", reportStageKey, False),
+    (None, "captureOperation", "sceneRead", lambda args, result: stageKey(result.operatorName), False),
+    (None, "translateEventChunks", "translation", lambda args, result: stageKey(args[0].operatorName), True),
+    ("Tutorial", "validateStepChunks", "validation", lambda args, result: stageKey(args[1][0]), True),
+    (None, "getFilteredOp", "filter", lambda args, result: stageKey(args[0][0]), False),
+    ("userModel", "updateUserProfile", "profile", lambda args, result: stageKey(args[1]), False),
+]
+
+def recordStage(key, stage, duration):
+    samples = stageTimings.get(key, {}).get(stage)
+
+    if samples is None:
+        samples = stageTimings.setdefault(key, {}).setdefault(stage, deque(maxlen=stageSamples))
+
+    samples.append(duration)
+
+def timeStage(function, stage, getKey):
+    # Wrapper of function recording its duration under the operation returned by getKey
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        recordStage(getKey(args, result), stage, time.perf_counter() - start)
+
+        return result
+
+    timed.__wrapped__ = function
+    return timed
+
+def timeStageChunks(function, stage, getKey):
+    # Wrapper of a resumable function recording the time spent in its chunks once it is finished (the chunks of other
+    # tasks may run in between)
+
+    def timed(*args, **kwargs):
+        chunks = function(*args, **kwargs)
+        duration = 0.0
+
+        while True:
+            start = time.perf_counter()
+
+            try:
+                pending = next(chunks)
+
+            except StopIteration as done:
+                duration += time.perf_counter() - start
+                recordStage(getKey(args, done.value), stage, duration)
+                return done.value
+
+            duration += time.perf_counter() - start
+            yield pending
+
+    timed.__wrapped__ = function
+    return timed
+
+def enableStageTimings(enabled = True):
+    global stageTimingsEnabled
+
+    if enabled == stageTimingsEnabled:
+        return
+
+    module = sys.modules[__name__]
+
+    if enabled:
+        for owner, attribute, stage, getKey, chunked in timedStages:
+            target = module if owner is None else getattr(module, owner)
+            function = getattr(target, attribute)
+            stageOriginals[(target, attribute)] = function
+            setattr(target, attribute, (timeStageChunks if chunked else timeStage)(function, stage, getKey))
+
+        # The handlers are taken from the dispatch tables by captureOperation, so they are wrapped there (and their
+        # resumable versions in chunkedHandlers, used by the frame scheduler)
+        for handlers in (modeHandlers, operationHandlers):
+            for name, (handler, needs) in list(handlers.items()):
+                handlers[name] = (timeStage(handler, "diffing", lambda args, result: stageKey(args[0].operatorName)), needs)
+
+        for handler, resumable in list(chunkedHandlers.items()):
+            chunkedHandlers[handler] = timeStageChunks(resumable, "diffing", lambda args, result: stageKey(args[0].operatorName))
+
+    else:
+        for (target, attribute), function in stageOriginals.items():
+            setattr(target, attribute, function)
+
+        stageOriginals.clear()
+
+        for handlers in (modeHandlers, operationHandlers):
+            for name, (handler, needs) in list(handlers.items()):
+                handlers[name] = (handler.__wrapped__, needs)
+
+        for handler, resumable in list(chunkedHandlers.items()):
+            chunkedHandlers[handler] = resumable.__wrapped__
+
+    stageTimingsEnabled = enabled
+
+def updateStageTimings(self, context):
+    enableStageTimings(context.scene.stage_timings)
+
+def clearStageTimings():
+    stageTimings.clear()
+
+def summarizeSamples(samples):
+    samples = np.array(samples)
+
+    return {"count": len(samples), "mean": float(samples.mean()), "p50": float(np.percentile(samples, 50)),
+            "p95": float(np.percentile(samples, 95)), "p99": float(np.percentile(samples, 99)), "max": float(samples.max())}
+
+def getStageSummary():
+    # {operation: {stage: {"count", "mean", "p50", "p95", "p99", "max"}}} (seconds). "(all)" merges the operations
+
+    summary = {}
+    allSamples = {}
+
+    for key, stages in list(stageTimings.items()):
+        summary[key] = {}
+
+        for stage, samples in list(stages.items()):
+            samples = list(samples)
+            summary[key][stage] = summarizeSamples(samples)
+            allSamples.setdefault(stage, []).extend(samples)
+
+    if allSamples:
+        summary["(all)"] = {stage: summarizeSamples(allSamples[stage]) for stage in stageNames if stage in allSamples}
+
+    return summary
+
+def exportStageTimings(path):
+    # Saves the summary and the kept durations as JSON
+
+    import json
+
+    data = {"summary": getStageSummary(),
+            "samples": {key: {stage: list(samples) for stage, samples in list(stages.items())} for key, stages in list(stageTimings.items())}}
+
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=1)
+
+def logStageSummary(count = 10):
+    # The stages of all the operations, then the slowest operations (p95 of their validation or translation)
+
+    summary = getStageSummary()
+
+    for stage, values in summary.get("(all)", {}).items():
+        log.info("%-12s %6i calls | p50 %8.2f ms | p95 %8.2f ms | p99 %8.2f ms | max %8.2f ms", stage, values["count"],
+                 values["p50"] * 1000, values["p95"] * 1000, values["p99"] * 1000, values["max"] * 1000)
+
+    def slowestStage(key):
+        return max(values["p95"] for values in summary[key].values())
+
+    for key in sorted([key for key in summary if key != "(all)"], key=slowestStage, reverse=True)[:count]:
+        log.info("%-40s %s", key.strip()[:40], " | ".join("%s p95 %.2f ms" %(stage, summary[key][stage]["p95"] * 1000)
+                                                         for stage in stageNames if stage in summary[key]))
+
+# ======================================================================================================================= #
+# ============================================ Memory Accounting ======================================================== #
+# ======================================================================================================================= #
+
+# Bytes held by the addon, per region: the cache (cacheDict), the recorded steps (logCache), each loaded tutorial
+# (Tutorial.tutorialSteps) and the highlight objects. Each region is split into the mesh payload ("vertices"/"faces"
+# of the steps, geometry arrays of the snapshots) and the rest ("headers": step names, properties, records...).
+# The Python sizes are measured by walking the objects (each object counted once per region). The highlights are
+# empties in Blender without mesh data, so only their number is reported.
+# On top of that, tracemalloc snapshots can be taken at any point of a session and compared, to find what grows.
+# Tracing is only started by the first snapshot (it slows down every allocation) and stopped with the logger
+
+loadedTutorials = weakref.WeakSet() # Tutorial instances alive (registered by Tutorial.__init__)
+meshPayloadKeys = ("vertices", "faces")
+
+memorySnapshots = OrderedDict() # {label: tracemalloc snapshot}
+memoryTraceFrames = 1
+lastMemoryReport = None # Shown in the panel
+
+def deepSizeOf(value, seen):
+    # Bytes of value and everything it holds, skipping the objects already in seen (ids)
+
+    if id(value) in seen:
+        return 0
+
+    seen.add(id(value))
+
+    if type(value) == np.ndarray:
+        return sys.getsizeof(value) + (0 if value.base is None else value.nbytes)
+
+    size = sys.getsizeof(value)
+
+    if type(value) == MeshCoords:
+        return size + sum(deepSizeOf(values, seen) for values in value.arrays())
+
+    if type(value) == dict:
+        for key, item in value.items():
+            size += deepSizeOf(key, seen) + deepSizeOf(item, seen)
+
+    elif type(value) in (list, tuple, set):
+        for item in value:
+            size += deepSizeOf(item, seen)
+
+    return size
+
+def measureSteps(steps, seen = None):
+    # {"steps", "payload", "headers"} bytes of a list of steps ([name, props, object name, additional info])
+
+    seen = set() if seen is None else seen
+    seen.add(id(steps))
+    payload = 0
+    headers = sys.getsizeof(steps)
+
+    for step in steps:
+        if len(step) > 1 and type(step[1]) == dict:
+            for key in meshPayloadKeys:
+                if key in step[1]:
+                    payload += deepSizeOf(step[1][key], seen)
+
+        headers += deepSizeOf(step, seen)
+
+    return {"steps": len(steps), "payload": payload, "headers": headers}
+
+def arrayHeaderBytes(values):
+    # sys.getsizeof of an array that owns its data includes the data
+
+    return sys.getsizeof(values) - (values.nbytes if values.base is None else 0)
+
+def measureCache():
+    # The geometry arrays of the snapshots are the payload, the records, transforms and indices are the headers
+
+    seen = set()
+    payload = 0
+    headers = 0
+
+    # Only the copies of the containers are taken under the lock, the records are measured without it (the MeshCoords
+    # are immutable, a record may just get new ones meanwhile)
+    with cacheLock:
+        snapshots = list(cacheDict["allObjects"].values())
+        others = [dict(cacheDict["allModifiers"]), cacheDict["tempValue"], dict(cacheDict["isSmooth"]), dict(cacheDict["stats"])]
+        headers += sys.getsizeof(cacheDict["allObjects"]) + sys.getsizeof(cacheDict["geometryLRU"])
+
+    for snapshot in snapshots:
+        for buffer in (snapshot._vertices, snapshot._faces):
+            if buffer is not None:
+                headers += sys.getsizeof(buffer)
+
+                for values in buffer.arrays():
+                    if id(values) not in seen:
+                        seen.add(id(values))
+                        payload += values.nbytes
+                        headers += arrayHeaderBytes(values)
+
+        headers += sys.getsizeof(snapshot) + sys.getsizeof(snapshot.scale) + sys.getsizeof(snapshot.location) + \
+                   sys.getsizeof(snapshot.rotation) + deepSizeOf(snapshot.name, seen)
 
-    "Clear Scale": clearOp,
-    "Clear Location": clearOp,
-    "Clear Rotation": clearOp,
+    for value in others:
+        headers += deepSizeOf(value, seen)
 
-    "Snap Selection to Cursor" : snapOp,
-    "Snap Selection to Active" : snapOp,
-    "Snap Selection to Grid" : snapOp,
-    "Snap Cursor to Active" : snapOp,
-    "Snap Cursor to Selected" : snapOp,
-    "Snap Cursor to World Origin" : snapOp,
-    "Snap Cursor to Grid" : snapOp,
+    return {"objects": len(snapshots), "payload": payload, "headers": headers}
 
-    # For edit mode:
-    "Subdivide": subdivideOp,
-    "Extrude Region and Move": extrudeOp,
-    "Inset Faces": insetOp,
-    "Merge by Distance": mergeByDistanceOp,
-}
+def measureHighlights():
+    # The highlights are empties (no mesh data), only their number is reported
+    measured = {"objects": 0, "payload": 0, "headers": 0}
 
-def changeShading(description):
-    # Changing the shade mode of the 3D view
+    for obj in bpy.data.objects:
+        if obj.name.endswith(highlightSuffixes):
+            measured["objects"] += 1
 
-    newMode = description.split("= '")[1].strip("'")
-    return ["Change shading mode", newMode, "Scene"]
+    return measured
 
-def notOperatorDefaultCase(description):
-    return ["Not recognized user action: {}".format(description)]
+def getMemoryReport():
+    # {region: {"payload", "headers", ...}} in bytes. The tutorials are listed under "tutorials" by name; the steps
+    # being recorded are the same list as logCache, so they are only counted there
 
-notOperatorsDict = {
-    ("bpy", "context", "space_data", "shading"): changeShading,
-}
+    report = {"cache": measureCache(), "logCache": measureSteps(logCache), "highlights": measureHighlights(), "tutorials": {}}
 
-# ======================================================================================================================= #
-# ============================================ Util Functions =========================================================== #
-# ======================================================================================================================= #
+    for i, tut in enumerate(list(loadedTutorials)):
+        if tut.tutorialSteps is logCache:
+            continue
 
-# def formatOperation(operator, isSame = False):
-#     # Receives an operator (= bpy.context.active_operator) and returns it on the correct format to be used on the tutorial. It can also receive a string in the "isSame" field, indicating it is not an operator
+        name = getattr(tut, "name", "") or "tutorial %i" %i
+        report["tutorials"][name] = measureSteps(tut.tutorialSteps)
 
-#     if (type(isSame) == bool):
-#         # Means it is an operator
-#         opName = operator.name
-#         result = operatorsDict.get(opName, defaultCase)(operator)
+    return report
 
-#     else:
-#         # Means it is not an operator
-#         formattedAction = tuple([part.split('["')[0].split(" =")[0] for part in isSame.split('.')][:-1])
-#         result = notOperatorsDict.get(formattedAction, notOperatorDefaultCase)(isSame)
+def getMemoryTotals(report):
+    # (payload, headers) of all the regions of a report
 
-#     return result
+    regions = [report["cache"], report["logCache"], report["highlights"]] + list(report["tutorials"].values())
+    return sum(region["payload"] for region in regions), sum(region["headers"] for region in regions)
 
-def formatOperation2(operator, isSame):
-    # Receives an operator (= bpy.context.active_operator) and returns it on the correct format to be used on the tutorial. It can also receive a string in the "isSame" field, indicating it is not an operator
+def logMemoryReport(report):
+    megabyte = 1024 * 1024
+    regions = [("cache", report["cache"]), ("logCache", report["logCache"]), ("highlights", report["highlights"])] + \
+              [("tutorial " + name, region) for name, region in report["tutorials"].items()]
 
-# =======================================================================================================
+    for name, region in regions:
+        log.info("%-32s payload %8.2f MB | headers %8.2f MB", name[:32], region["payload"] / megabyte, region["headers"] / megabyte)
 
-    activeObj = bpy.context.view_layer.objects.active             
-    mode = None if activeObj == None else activeObj.mode 
-    
-    if isSame[:7] == "bpy.ops":
-        # The structure of bpy.ops is different than the others -> means it is actually an operation
+def takeMemorySnapshot(label = None):
+    # Takes a tracemalloc snapshot of the Python allocations (starts tracing on the first call). Returns its label
 
-        result = ""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(memoryTraceFrames)
 
-        # Removing all the characters before the first parenthesis
-        processed = isSame[isSame.index("(") + 1:-1]
+    label = "snapshot %i" %(len(memorySnapshots) + 1) if label is None else label
+    snapshot = tracemalloc.take_snapshot()
+    memorySnapshots[label] = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
 
-        # Some operations do not have properties
-        if len(processed) == 0:
-            result = {}
+    return label
 
-        else:
-            # Picking all the parts divided by commas
-            parts = processed.split(",")
+def compareMemorySnapshots(first, second, count = 10):
+    # Allocation sites that grew (or shrunk) the most between two snapshots:
+    # [{"location", "sizeDiff", "countDiff", "size"}] (bytes), the largest differences first
 
-            for part in parts:
-                # Must replace all "=" to ":" and also include quotes so it is in the format of dictionary
-                splitted = part.split("=")
+    stats = memorySnapshots[second].compare_to(memorySnapshots[first], "lineno")
 
-                if (len(splitted) > 1):
-                    splitted[0] = '"' + splitted[0].strip(" ") + '"'
-                    splitted = splitted[0] + ":" + splitted[1] + ","
-                else:
-                    splitted = splitted[0]  + ","
+    return [{"location": str(stat.traceback), "sizeDiff": stat.size_diff, "countDiff": stat.count_diff, "size": stat.size}
+            for stat in stats[:count]]
 
-                result = result + splitted
+def stopMemoryTracing():
+    memorySnapshots.clear()
 
-            # Transforming into a dictionary
-            result = eval("{" + result + "}")
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
 
-        if (mode and mode == "EDIT" and activeObj.type == "MESH"):
+# ======================================================================================================================= #
+# =============================================== Profiling ============================================================= #
+# ======================================================================================================================= #
 
-            allVertices = getAllVerticesOfObject()
-            allFaces = getAllFacesOfObject()
-            objsDict = getObjectsOnCache()
-            oldVertices = objsDict[activeObj.name]["vertices"]
-            oldFaces = objsDict[activeObj.name]["faces"]
-            vertDiff = []
-            facesDiff = []
-
-            oldVertNumber = len(oldVertices.keys())
-            oldFacesNumber = len(oldFaces.keys())
-            newVertNumber = len(allVertices.keys())
-            newFacesNumber = len(allFaces.keys())
-
-            if ( oldVertNumber != newVertNumber or oldFacesNumber != newFacesNumber ):
-                # Means it is an operation that added/removed vertices/faces. In this case, save which vertices/faces have been created/deleted
-
-                if (oldVertNumber < newVertNumber or oldFacesNumber < newFacesNumber):
-                    # Means created more vertices/faces
-
-                    for key in allVertices.keys():
-                        if (key not in oldVertices): vertDiff.append(key)
-                    
-                    result["newVertices"] = vertDiff
+# On demand cProfile capture of the work done for the events, to get a profile of the exact session of a user:
+# only ModalOperator.modal, translatePinnedEvent/processTranslated (workers) and runScheduledChunks (frame scheduler) are profiled, so the time
+# Blender spends between the events is not part of it. Like the stage timings, starting the capture replaces them by
+# profiled wrappers and stopping it puts the originals back: there is no profiling code on the path while it is off.
+# Each thread has its own profiler; they are merged when the capture is stopped and saved next to the .blend file as
+# a .prof (pstats, snakeviz...) and as collapsed stacks (flame graphs, see ProfileStacks.py).
+# Since Python 3.12 only one profiler can be enabled at a time, so the calls made while the other thread is being
+# profiled are skipped (and counted)
 
-                    for key in allFaces.keys():
-                        if (key not in oldFaces): facesDiff.append(key)
-                    
-                    result["newFaces"] = facesDiff
+profiledFunctions = [("ModalOperator", "modal"), (None, "translatePinnedEvent"), (None, "processTranslated"), (None, "runScheduledChunks")]
+profileOriginals = {} # {(owner, attribute): original function} while capturing
+sessionProfilers = {} # {thread id: cProfile.Profile}
+profileState = threading.local() # Depth of the profiled calls on each thread (the nested ones use the outer profiler)
+profileSkipped = 0
 
-                else:
-                    # Means deleted vertices
+def profileCall(function):
 
-                    for key in oldVertices.keys():
-                        if (key not in allVertices): vertDiff.append(key)
-                    
-                    result["deletedVertices"] = vertDiff
+    def profiled(*args, **kwargs):
+        global profileSkipped
 
-                    for key in oldFaces.keys():
-                        if (key not in allFaces): facesDiff.append(key)
-                    
-                    result["deletedFaces"] = facesDiff
-                
-                saveObjectVerticesOnCache(allVertices)
-                saveObjectFacesOnCache(allFaces)
+        depth = getattr(profileState, "depth", 0)
 
-            else:
-                # Means it is an operation that just modified vertices
+        if depth > 0:
+            return function(*args, **kwargs)
 
-                for key in allVertices.keys():
-                    if (allVertices[key] != oldVertices[key]): vertDiff.append(key)
+        profiler = sessionProfilers.get(threading.get_ident())
 
-                if (len(vertDiff) != 0):
-                    # Means modification occurred
+        if profiler is None:
+            profiler = sessionProfilers.setdefault(threading.get_ident(), cProfile.Profile())
 
-                    saveObjectVerticesOnCache(allVertices)
-                    saveObjectFacesOnCache(allFaces)
-                    result["selectedVertices"] = vertDiff
+        try:
+            profiler.enable()
 
-            # Saving all vertices in the result
-            result["vertices"] = allVertices
-            result["faces"] = allFaces
-            result["editMode"] = True
+        except ValueError:
+            profileSkipped += 1
+            return function(*args, **kwargs)
 
+        profileState.depth = 1
 
-        elif (mode and mode == "OBJECT"):
-            # Save new transform properties of objetcs if modified
-            cacheObjs = getObjectsOnCache()
-
-            if (activeObj.name in cacheObjs):
-                # Means it is an update
-
-                selectedObjs = bpy.context.selected_objects
-
-                for i, obj in enumerate(selectedObjs):
-                    # There can be multiple objects being selected
-
-                    if obj.name in cacheObjs:
-                        # There are some operations that create new objects from edit mode (like separate)
-
-                        oldObj = cacheObjs[obj.name]
-                        objProps = {"scale" : list(obj.scale),
-                                    "location" : list(obj.location),
-                                    "rotation" : list(obj.rotation_euler)}
-                        
-                        if(obj.name == activeObj.name):
-                            # If active, include new properties in the translated operation
-
-                            for key in objProps.keys():
-                                if (oldObj[key] != objProps[key]):
-                                    # Add into dictionary result the modified property
-                                    result["new" + key] = objProps[key]
-                        
-                        # Update cache with new values
-                        saveObjectTransformOnCache(obj.name, objProps["scale"], objProps["location"], objProps["rotation"])
-                    
-                    else:
-                        bpy.context.view_layer.objects.active = obj
-                        # bpy.ops.object.select_all(action='DESELECT')
-                        bpy.ops.object.editmode_toggle()
+        try:
+            return function(*args, **kwargs)
 
-                        objProps = {"scale" : list(obj.scale),
-                                    "location" : list(obj.location),
-                                    "rotation" : list(obj.rotation_euler),
-                                    "vertices": getAllVerticesOfObject(),
-                                    "faces": getAllFacesOfObject(),
-                                    "isSmooth": True if (obj.type == "MESH" and any(face.use_smooth for face in obj.data.polygons)) else False}
-                        
-                        bpy.ops.object.editmode_toggle()
+        finally:
+            profiler.disable()
+            profileState.depth = 0
 
-                        saveObjectTransformOnCache(obj.name, objProps=objProps)
+    profiled.__wrapped__ = function
+    return profiled
 
-                if (len(selectedObjs) > 1):
-                    result["selectedObjs"] = [obj.name for obj in selectedObjs]
+def isProfiling():
+    return len(profileOriginals) != 0
 
+def startProfiling():
+    global profileSkipped
 
-            else:
-                # Means it is adding a new one
-                cacheObjs[activeObj.name] = getAllObjects(firstCall=True)[activeObj.name]
-                saveObjectsOnCache(cacheObjs)
-            
-            result["editMode"] = False
+    if isProfiling():
+        return
 
-        if activeObj == None:
-            # Means its probably a deletion, so have to include manually "editMode"
-            result["editMode"] = False
+    module = sys.modules[__name__]
+    sessionProfilers.clear()
+    profileSkipped = 0
 
-        translated = [operator.name, result, None if activeObj == None else activeObj.name]
+    for owner, attribute in profiledFunctions:
+        target = module if owner is None else getattr(module, owner)
+        function = getattr(target, attribute)
+        profileOriginals[(target, attribute)] = function
+        setattr(target, attribute, profileCall(function))
 
-    else:
-        # # In this case, it is considering everything else that is not an operation (bpy.ops) but still is an user action
+def stopProfiling(basePath = None):
+    # Puts the original functions back and saves the merged profile on basePath.prof and basePath.collapsed.txt
+    # (logger_profile_<date>-<time> next to the .blend file by default). Returns the paths saved (None if nothing was profiled)
 
-        # translated = [""]
+    if not isProfiling():
+        return None
 
-        # # Get the first (because it might have more equal signs on the other side) occurrence of " = " to divide the 2 parts
-        # processed = isSame.split(" = ", maxsplit=1)
+    for (target, attribute), function in profileOriginals.items():
+        setattr(target, attribute, function)
 
-        # # Get the value of the property
-        # value = eval(processed[1])
+    profileOriginals.clear()
 
-        # # List of names, groups etc and operation "address"
-        # groupsList = [["group", ""], ["subgroup", ""], ["propIndex", ""]]
+    # The worker may be in the middle of a profiled call
+    waitForTranslations()
 
-        # # Get all the operator "address"
-        # processed = processed[0].split(".")
+    profilers = list(sessionProfilers.values())
+    sessionProfilers.clear()
+    stats = None
 
-        # groupIndex = 0
+    for profiler in profilers:
+        try:
+            stats = pstats.Stats(profiler) if stats is None else stats.add(profiler)
 
-        # for i, addr in enumerate(processed[:-1]): # Ignore the last one since it is the property name changed
-        #     if "[" in addr:
-        #         # Get what is inside: ['groupname']
-        #         groupName = addr[addr.index("[")+1:addr.index("]")]
-        #         groupName = eval(groupName)
-                
-        #         if groupIndex <= 2:
-        #             groupsList[groupIndex][1] = groupName
-                
-        #         else:
-        #             groupsList.append(["other"+str(groupIndex-2), groupName])
+        except TypeError:
+            # Profiler enabled but without any call recorded
+            continue
 
-        #         groupIndex += 1
+    if stats is None:
+        log.info("Nothing was profiled")
+        return None
 
-        #         # Get the address without the group name (also getting everything after it because there might be some operations that contains it)
-        #         translated[0] = translated[0] + " " + addr[ 0 : addr.index("[") ] + addr[ addr.index("]")+1 : ]
+    if basePath is None:
+        basePath = bpy.path.abspath('//logger_profile_' + time.strftime("%Y%m%d-%H%M%S"))
 
-        #     else:
-        #         translated[0] = translated[0] + " " + addr
+    from ProfileStacks import writeCollapsedStacks
 
-        # groupsList.append([processed[-1], value])
-        # translated.append(dict(groupsList))
+    stats.dump_stats(basePath + ".prof")
+    stacks, coverage = writeCollapsedStacks(stats, basePath + ".collapsed.txt")
 
-        activeObj = bpy.context.view_layer.objects.active
+    log.info("Profile saved on %s.prof (%i collapsed stacks on %s.collapsed.txt, %.1f %% of the profiled time)", basePath, stacks, basePath,
+             coverage * 100)
+    if profileSkipped:
+        log.info("%i calls were not profiled (the other thread was being profiled)", profileSkipped)
 
-        possindices = [index for index, char in enumerate(isSame) if char == '"']
-        endIndices = []
-        processed = isSame
-        groupIndex = 0
-        baseIndex = 0
-        translated = [""]
-        
-        # List of names, groups etc and operation "address"
-        groupsList = [["group", ""], ["subgroup", ""], ["propIndex", ""]]
-
-        for index in possindices:
-            #if isSame[index-1] != "[" or ord(isSame[index-1]) != 92:
-            if ord(isSame[index-1]) == 92:
-                foundAnother = False
-                count = 0
-                i = 1
-                
-                while not foundAnother:
-                    if (ord(isSame[index-i]) == 92):
-                        count+=1
-                        i+=1
-                        
-                    else:
-                        foundAnother = True
-                        
-                if (count%2 == 0):
-                    # If even, it is the end of string
+    return basePath + ".prof", basePath + ".collapsed.txt"
 
-                    endIndices.append(index)
-            
-            elif index != ( len(isSame)-1 ) and isSame[index+1] == "]":
-                endIndices.append(index)
-
-        if len(endIndices) != 0:
-            # Means that it requires special treatment for the "["something"]"
-            for i, char in enumerate(isSame):
-                if (char == "[" and i > baseIndex):
-                    # At every first occurrence of [, means the start of a string
-
-                    # The first occ. of "[" may be related to a number, which means that the endIndices won't be considering:
-                    if (isSame[i + 1] != '"'):
-                        # Means it is a number
-                        
-                        closeIndex = isSame[i+1:].index("]")
-                        groupName = isSame[i+1:][:closeIndex]
-                        evalGroupName = eval(groupName)
+def updateProfiling(self, context):
 
-                    else:
-                        # Means it is a String
+    if context.scene.profile_handlers:
+        startProfiling()
 
-                        closeIndex = endIndices[0]+1
-                        groupName = isSame[i+1 : closeIndex]
-                        evalGroupName = eval(groupName)
-                        baseIndex = closeIndex
-                        del endIndices[0]
+    else:
+        stopProfiling()
 
-                    if groupIndex <= 2:
-                            groupsList[groupIndex][1] = evalGroupName
+# ======================================================================================================================= #
+# ============================================ Util Functions =========================================================== #
+# ======================================================================================================================= #
 
-                    else:
-                        groupsList.append(["other"+str(groupIndex-2), evalGroupName])
+# def formatOperation(operator, isSame = False):
+#     # Receives an operator (= bpy.context.active_operator) and returns it on the correct format to be used on the tutorial. It can also receive a string in the "isSame" field, indicating it is not an operator
 
-                    processed = processed.replace("[" + groupName + "]", "")
+#     if (type(isSame) == bool):
+#         # Means it is an operator
+#         opName = operator.name
+#         result = operatorsDict.get(opName, defaultCase)(operator)
 
-                    groupIndex += 1
-        
-        processed = processed.split(" = ")
+#     else:
+#         # Means it is not an operator
+#         formattedAction = tuple([part.split('["')[0].split(" =")[0] for part in isSame.split('.')][:-1])
+#         result = notOperatorsDict.get(formattedAction, notOperatorDefaultCase)(isSame)
 
-        # Get the value of the property
-        if type(eval(processed[1]) not in [int, float, str]):
-            value = str(processed[1])
-        else:
-            value = eval(processed[1])
-        
-        # Get the address of the operation
-        processed = processed[0].split(".")
+#     return result
 
-        for addr in processed[:-1]:
-            translated[0] += " " + addr
+def formatOperation2(operator, isSame):
+    # Receives an operator (= bpy.context.active_operator) and returns it on the correct format to be used on the tutorial. It can also receive a string in the "isSame" field, indicating it is not an operator
+    # Synchronous version of captureOperation + translateEvent (see Translation Dispatch)
 
-        groupsList = groupsList[0:groupIndex]
-        groupsList.append([processed[-1], value])
-        translated.append(dict(groupsList))
-        translated.append(None if not activeObj else activeObj.name)
-        translated[1]["editMode"] = True if mode == 'EDIT' else False
+    event = captureOperation(operator, isSame)
 
-    return translated
+    try:
+        return translateEvent(event)
+
+    finally:
+        releaseGeometryOnCache(event.activeName)
 
 def isSameOperation(formattedOldOp, newOp, mouse_x, mouse_y, tut = None):
     # Receives 2 operations - old (formatted = [operator name, properties]) and new (= bpy.context.active_operator) - and compare them to return if they are the same operation (true or false)
@@ -840,7 +2699,8 @@ def isSameOperation(formattedOldOp, newOp, mouse_x, mouse_y, tut = None):
     global ignoreLastOp
     global numberOfOp
 
-    if ignoreLastOp:
+    if ignoreLastOp or numberOfOp is None:
+        # numberOfOp is None if this event came before the timer reading the baseline (readOperationsBaseline)
         numberOfOp = len(operations)
         ignoreLastOp = False
         return True
@@ -882,102 +2742,120 @@ def getAllObjects(firstCall = False):
     # If it is a new object, firstcall == True and thus all its vertices must be considered
 
     objsDict = {}
-    changedMode = False
+    coords, faceCenters = None, None
 
     if firstCall:
         activeObj = bpy.context.view_layer.objects.active
 
-        if activeObj and activeObj.mode == "OBJECT" and activeObj.type == 'MESH':
-            bpy.ops.object.editmode_toggle()
-            changedMode = True
+        # The mesh is read in bulk, so there is no need to toggle edit mode to get its vertices
+        if activeObj and activeObj.type == 'MESH':
+            coords, _, _, faceCenters = getMeshArraysOfObject(activeObj, withFaces=True)
 
     objs = bpy.context.scene.objects
     for obj in objs:
-        objsDict[obj.name] = {  "scale": list(obj.scale),
-                                "location": list(obj.location),
-                                "rotation": list(obj.rotation_euler),
-                                "vertices": {} if not firstCall or not activeObj else getAllVerticesOfObject(),
-                                "faces": {} if not firstCall or not activeObj else getAllFacesOfObject(),
-                                "isSmooth": True if (obj.type == "MESH" and any(face.use_smooth for face in obj.data.polygons)) else False}
+        # Only the active object gets its geometry, the other ones are snapshotted when needed (lazy records). Same for
+        # the smooth shading (the flags of all the faces are read): None until the next snapshot of the objects
+        if firstCall and obj == activeObj:
+            objsDict[obj.name] = ObjectSnapshot(obj.name, obj.scale, obj.location, obj.rotation_euler, coords, faceCenters,
+                                                getSmoothShadingOnCache(obj))
 
-    if changedMode:
-        bpy.ops.object.editmode_toggle()
+        else:
+            objsDict[obj.name] = ObjectSnapshot.lazy(obj.name, obj.scale, obj.location, obj.rotation_euler,
+                                                     None if firstCall else getSmoothShadingOnCache(obj))
 
     return objsDict
 
 def getAllModifiers():
-    # Gets all the modifiers of all the objects in the scene. Uses the getAllObjects() function
+    # Gets all the modifiers of all the objects in the scene. Returns dictionary in the format:
+    # {object name: [modifier name, ...], .....}
+    # The modifier stacks are read directly from the objects, so there is no need to select them or change mode
+
+    return {obj.name: [modifier.name for modifier in obj.modifiers] for obj in bpy.context.scene.objects}
+
+def getAllVerticesOfObject():
+    # Gets all Vertices of the active object. Returns dictionary in the format:
+    # {vertex index: xyz coordinates, .....}
 
-    objsList = list(getAllObjects().keys())
-    modifiersList = []
-    editMode = False
+    activeObj = bpy.context.active_object
 
-    if bpy.context.object != None:
-        prevSelectedObj = bpy.context.object.name 
+    if activeObj.type == 'MESH':
+        
+        coords = getMeshArraysOfObject()[0]
+        return dict(enumerate(coords.tolist()))
 
-        if(bpy.context.object.mode == 'EDIT'):
-            editMode = True
-            bpy.ops.object.mode_set(mode = "OBJECT")
-    
     else:
-        prevSelectedObj = None
+        log.warning("Object is not a mesh.")
+        return None
 
-    for objectName in objsList:
+def getMeshArraysOfObject(obj = None, withEdges = False, withFaces = False):
+    # Reads in bulk the vertices coordinates and selection flags of a mesh object (the active one by default).
+    # Returns (coordinates as (N, 3) array, selection as (N,) bool array, edges as (E, 2) array or None if not withEdges,
+    # faces centers as (F, 3) array or None if not withFaces)
 
-        if objectName in bpy.data.objects:
-            # Deselect all currently selected objects
-            bpy.ops.object.select_all(action='DESELECT')
+    if obj is None:
+        obj = bpy.context.active_object
+    mesh = obj.data
 
-            # Select the object
-            bpy.data.objects[objectName].select_set(True)
+    # The edit-mode changes live in the bmesh, so they have to be flushed to the mesh before reading it in bulk
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
 
-            bpy.context.view_layer.objects.active = bpy.context.selected_objects[0]
+    vertNumber = len(mesh.vertices)
 
-        else:
-            print(f"Object '{objectName}' not found")
+    coords = np.empty(vertNumber * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
 
-        selected_object = bpy.context.view_layer.objects.active
+    selection = np.empty(vertNumber, dtype=bool)
+    mesh.vertices.foreach_get("select", selection)
 
-        if selected_object is not None:
-            # Get all modifiers of the selected object
-            objModifiers = [modifier.name for modifier in selected_object.modifiers]
-            
-            modifiersList += objModifiers
-    
-    if prevSelectedObj is not None:
+    edges = None
+    if withEdges:
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edges)
+        edges = edges.reshape(-1, 2)
 
-        # Deselect all currently selected objects
-        bpy.ops.object.select_all(action='DESELECT')
+    faceCenters = None
+    if withFaces:
+        # The polygon center is the median of its vertices, the same as BMFace.calc_center_median()
+        faceCenters = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+        mesh.polygons.foreach_get("center", faceCenters)
+        faceCenters = faceCenters.reshape(-1, 3)
 
-        # Select the object and sets it to be the active one
-        bpy.data.objects[prevSelectedObj].select_set(True)
-        bpy.context.view_layer.objects.active = bpy.context.selected_objects[0]
+    return coords.reshape(-1, 3), selection, edges, faceCenters
 
-        # If it was in edit mode before, set again it
-        if(editMode):
-            bpy.ops.object.mode_set(mode = "EDIT")
+def usesProportionalEditing(props):
+    # Checks if the operation properties (or the properties of one of its sub operations, like in extrude + move)
+    # have proportional editing enabled, which means that also unselected vertices may have been moved
 
-    return modifiersList
+    for key, value in props.items():
+        if key == "use_proportional_edit" and value:
+            return True
 
-def getAllVerticesOfObject():
-    # Gets all Vertices of the active object. Returns dictionary in the format:
-    # {vertex index: xyz coordinates, .....}
+        if type(value) == dict and usesProportionalEditing(value):
+            return True
 
-    activeObj = bpy.context.active_object
+    return False
 
-    if activeObj.type == 'MESH':
-        
-        vertices_dict = {}
+def getCaptureScope(selection, edges, props):
+    # Returns the indices of the vertices that have to be compared to find which ones have been modified.
+    # In "SELECTION" capture mode, only the selected vertices and their one-ring (vertices sharing an edge with them)
+    # are considered. Otherwise (or if proportional editing was used) all the vertices are considered
 
-        bm = bmesh.from_edit_mesh(activeObj.data)
+    if captureMode != "SELECTION" or usesProportionalEditing(props):
+        return range(len(selection))
 
-        for vert in bm.verts:
-            vertices_dict[vert.index] = list(vert.co)
-        return vertices_dict
+    return getOneRing(selection, edges)
 
-    else:
-        print("Object is not a mesh.")
-        return None
+def getOneRing(selection, edges):
+    # Sorted indices of the selected vertices and of the vertices sharing an edge with them
+
+    scope = selection.copy()
+
+    if edges is not None and len(edges) != 0:
+        touchedEdges = selection[edges[:, 0]] | selection[edges[:, 1]]
+        scope[edges[touchedEdges].ravel()] = True
+
+    return np.flatnonzero(scope)
     
 def getAllFacesOfObject():
     # Gets all faces of the active object. Returns dictionary in the format:
@@ -987,18 +2865,24 @@ def getAllFacesOfObject():
 
     if activeObj.type == 'MESH':
         
-        faces_dict = {}
-
-        bm = bmesh.from_edit_mesh(activeObj.data)
-
-        for face in bm.faces:
-            faces_dict[face.index] = list(face.calc_center_median())
-        return faces_dict
+        faceCenters = getMeshArraysOfObject(withFaces=True)[3]
+        return dict(enumerate(faceCenters.tolist()))
 
     else:
-        print("Object is not a mesh.")
+        log.warning("Object is not a mesh.")
         return None
     
+def readOperationsBaseline():
+    # Timer registered by ModalOperator.invoke: number of operations already on the Info log when the logger starts.
+    # Read on the first tick instead of inside invoke, as the whole log is copied
+
+    global numberOfOp
+
+    if useLogger and numberOfOp is None:
+        numberOfOp = len(getPerformedOperations())
+
+    return None
+
 def getPerformedOperations(mouse_x = 0, mouse_y = 0):
     # Gets the list of performed operations
 
@@ -1091,6 +2975,9 @@ def getFilteredOp (translatedOp, additionalInfo = {"tolerance": 10}):
 
     return [translatedOp[0], filtered, translatedOp[2], additionalInfo]
 
+# Suffixes of the names of the highlight empties
+highlightSuffixes = ("Initial Pos", "Final Pos", "Add new vert", "Remove this vert")
+
 # def highlightVertices(object_name, vertex_indices, highlight_color):
 def highlightVertices(objectName, firstPos, secondPos, tolerance = 0.1):
     # objectName = Name of the target object
@@ -1124,7 +3011,7 @@ def highlightVertices(objectName, firstPos, secondPos, tolerance = 0.1):
     if mode == "EDIT":
         bpy.ops.object.mode_set(mode='OBJECT')
 
-    print("$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$ HIGHLIGHT = ", highlightType)
+    log.debug("Highlight: %s", highlightType)
 
     if highlightType == "normal":
         for i, key in enumerate(keys):
@@ -1175,11 +3062,9 @@ def highlightVertices(objectName, firstPos, secondPos, tolerance = 0.1):
 
 def clearHighlights():
 
-    suffix = ["Initial Pos", "Final Pos", "Add new vert", "Remove this vert"]
-
     for obj in bpy.data.objects:
     # Check if the object's name ends with the specified suffix
-        if obj.name.endswith(suffix[0]) or obj.name.endswith(suffix[1]) or obj.name.endswith(suffix[2]) or obj.name.endswith(suffix[3]):
+        if obj.name.endswith(highlightSuffixes):
             # Delete the object
             bpy.data.objects.remove(obj, do_unlink=True)
 
@@ -1206,7 +3091,7 @@ def findVertsDiff(beforeList, afterList, margin):
         compareFrom = afterList
         compareTo = beforeList
 
-    print("$$$$$$$$$$$$$$$$$$$$$$$$  From To: ", compareFrom, compareTo)
+    log.debug("Vertices diff from %s to %s", compareFrom, compareTo)
 
     for elem1 in compareFrom:
         found = False
@@ -1217,7 +3102,7 @@ def findVertsDiff(beforeList, afterList, margin):
         if not found:
             differences.append(elem1)
 
-    print("$$$$$$$$$$$$$$$$$$$$$$$$  DIFERENCAS: ", differences)
+    log.debug("Vertices differences: %s", differences)
     return differences
 
 def checkMeshSimilarity (meshDict1, meshDict2, margin):
@@ -1225,6 +3110,11 @@ def checkMeshSimilarity (meshDict1, meshDict2, margin):
     # (and considering that the number of vertices and faces are already equal for both),
     # compare their location considering the given margin.
 
+    return runToEnd(checkMeshSimilarityChunks(meshDict1, meshDict2, margin))
+
+def checkMeshSimilarityChunks (meshDict1, meshDict2, margin, chunkSize = 256):
+    # Resumable version of checkMeshSimilarity, pausing every chunkSize comparisons
+
     vert1 = np.array( list(meshDict1["vertices"].values()) )
     vert2 = list(meshDict2["vertices"].values())
     faces1 = np.array( list(meshDict1["faces"].values()) )
@@ -1244,6 +3134,9 @@ def checkMeshSimilarity (meshDict1, meshDict2, margin):
         possibleValues = []
 
         for j in range (len(dict2)):
+            if j % chunkSize == 0:
+                yield
+
             if all(np.abs(dict1[i][k] - dict2[j][k]) <= margin * abs(dict1[i][k]) for k in range(3)):
                     # foundI = j
                     # break  # Stop searching for this vertex in dict2 once a match is found
@@ -1264,7 +3157,7 @@ def checkMeshSimilarity (meshDict1, meshDict2, margin):
 
     # First test vertices correspondence:
     for i in range (len(vert1)):
-        checked = checkCorrespondence(vert1, vert2, i)
+        checked = yield from checkCorrespondence(vert1, vert2, i)
         
         if checked == -1:
             found = False
@@ -1276,7 +3169,7 @@ def checkMeshSimilarity (meshDict1, meshDict2, margin):
     # If fully correspondent, check faces
     if found:
         for i in range (len(faces1)):
-            checked = checkCorrespondence(faces1, faces2, i)
+            checked = yield from checkCorrespondence(faces1, faces2, i)
             if checked == -1:
                 found = False
                 break
@@ -1285,9 +3178,7 @@ def checkMeshSimilarity (meshDict1, meshDict2, margin):
                 faces2 = checked
 
         
-    print("***************************************")
-    print("Meshes are EQUAL" if found else "Meshes are DIFFERENT")
-    print("***************************************")
+    log.debug("Meshes are %s", "EQUAL" if found else "DIFFERENT")
 
     return found
 
@@ -1297,43 +3188,84 @@ def checkMeshSimilarity (meshDict1, meshDict2, margin):
 
 
 
+# Additional info of the steps that have none
+defaultStepInfo = MappingProxyType({"tolerance": 10})
+
 class Tutorial:
 
     count = 0
 
     def __init__(self, tutorialName = None):
+        self.name = tutorialName
+        self.loaded = threading.Event() # Cleared while the steps are read in the background (loadTutorialStepsInBackground)
+        self.loaded.set()
+        self.loadError = None
+
         if tutorialName is not None:
             self.loadTutorialSteps(tutorialName)
 
         else:
             self.tutorialSteps = []
         
+        loadedTutorials.add(self) # For the memory accounting
         self.state = 0 # Var to track the state on the tutorial. 0 - N where N is the total number of steps -1. If state == N, tutorial ended.
+        # Last performed step and props of the last performed step with the mesh of each object, as a compaction of
+        # the performed steps would keep them (see validateStep)
+        self.lastPerformed = None
+        self.performedMeshes = {}
 
     def addTutorialStep(self, step):
         # Receives a list containing [operator.name, properties]
 
         filteredOp = getFilteredOp(step)
         self.tutorialSteps.append(filteredOp)
-        self.count = 0
-        print("\n============================= LIST OF OPS")
-        for op in self.tutorialSteps:
-            print("")
-            print(self.count, " - ", op)
-            self.count += 1
+
+        # Only the new step is logged (the whole list used to be printed after every step)
+        log.debug("Recorded step %i: %s", len(self.tutorialSteps) - 1, filteredOp)
 
         global logCache
         logCache = self.tutorialSteps
 
+        if sessionJournal is not None:
+            sessionJournal.append(filteredOp)
+
     def loadTutorialSteps(self, tutorialName):
         # Receives a list with all the tutorial steps: [[operator.name 1, properties 1], [operator.name 2, properties 2] ...]
         file_path = bpy.path.abspath('//'+tutorialName)
+        self.name = tutorialName
 
-        # Open the file in read mode
-        with open(file_path, 'r') as file:
-            # Read each line using a loop
-            for line in file:
-                self.tutorialSteps.append( eval(line.strip()) )
+        # One step per line, read by the report parser (no eval)
+        self.tutorialSteps = readTutorial(file_path)
+
+    def loadTutorialStepsInBackground(self, tutorialName, user = None):
+        # Same as loadTutorialSteps, but on a thread so that loading a big tutorial does not freeze Blender. The term
+        # weights of user are read on the same thread. self.loaded is set once done (the validation waits for it)
+
+        file_path = bpy.path.abspath('//'+tutorialName)
+        weightsPath = bpy.path.abspath('//termWeights.txt')
+        self.name = tutorialName
+        self.tutorialSteps = []
+        self.loadError = None
+        self.loaded.clear()
+
+        def load():
+            start = time.perf_counter()
+
+            try:
+                self.tutorialSteps = readTutorial(file_path)
+
+                if user is not None:
+                    user.loadTermWeights(weightsPath)
+
+                log.info("Tutorial %s loaded: %i steps in %.2f s", tutorialName, len(self.tutorialSteps), time.perf_counter() - start)
+
+            except Exception:
+                self.loadError = traceback.format_exc()
+
+            finally:
+                self.loaded.set()
+
+        threading.Thread(target=load, name="loggerTutorialLoader", daemon=True).start()
 
     def getNextStep(self):
         nextStep = self.tutorialSteps[self.state]
@@ -1384,6 +3316,10 @@ class Tutorial:
         return True
     
     def validateFinalValues(self, tolerance, expectedMeshes, actualMesh, lastStep, objName):
+        return runToEnd(self.validateFinalValuesChunks(tolerance, expectedMeshes, actualMesh, lastStep, objName))
+
+    def validateFinalValuesChunks(self, tolerance, expectedMeshes, actualMesh, lastStep, objName):
+        # Resumable version of validateFinalValues (the comparison of the meshes pauses, see checkMeshSimilarityChunks)
         # tolerance: Percentage/100 of tolerance for vertices location 
         # expectedMeshes: list of dictionaries of all the vertices and their expected locations of the next 3 operations
         # Returns a list of incorrect indices and [] if all correct
@@ -1419,9 +3355,9 @@ class Tutorial:
                     missing = lastVertsLen-actVertsLen
 
                     if (missing == 1):
-                        print("ERROR FOUND! There is 1 vertex missing in this object. Be sure to add it at the correct location so the tutorial can continue!")
+                        log.warning("ERROR FOUND! There is 1 vertex missing in this object. Be sure to add it at the correct location so the tutorial can continue!")
                     else:
-                        print("ERROR FOUND! There are %i vertices missing in this object. Be sure to add them at the correct location so the tutorial can continue!" %(missing))
+                        log.warning("ERROR FOUND! There are %i vertices missing in this object. Be sure to add them at the correct location so the tutorial can continue!", missing)
                     
                 else:
                     # Means that there are additional vertices
@@ -1429,9 +3365,9 @@ class Tutorial:
                     additional = actVertsLen - lastVertsLen
 
                     if (additional == 1):
-                        print("ERROR FOUND! There is 1 additional vertex in this object. Be sure to delete the correct one so the tutorial can continue!")
+                        log.warning("ERROR FOUND! There is 1 additional vertex in this object. Be sure to delete the correct one so the tutorial can continue!")
                     else:
-                        print("ERROR FOUND! There are %i additional vertices in this object. Be sure to delete the corect ones so the tutorial can continue!" %(additional))
+                        log.warning("ERROR FOUND! There are %i additional vertices in this object. Be sure to delete the corect ones so the tutorial can continue!", additional)
 
             elif lastFacesLen != actFacesLen and lastFacesLen != 0:
                 # Means the mesh is not in the correct configuration to follow to next step
@@ -1442,9 +3378,9 @@ class Tutorial:
                     missing = lastFacesLen-actFacesLen
 
                     if (missing == 1):
-                        print("ERROR FOUND! There is 1 face missing in this object. Be sure to add it at the correct location so the tutorial can continue!")
+                        log.warning("ERROR FOUND! There is 1 face missing in this object. Be sure to add it at the correct location so the tutorial can continue!")
                     else:
-                        print("ERROR FOUND! There are %i faces missing in this object. Be sure to add them at the correct location so the tutorial can continue!" %(missing))
+                        log.warning("ERROR FOUND! There are %i faces missing in this object. Be sure to add them at the correct location so the tutorial can continue!", missing)
                     
                 else:
                     # Means that there are additional faces
@@ -1452,9 +3388,9 @@ class Tutorial:
                     additional = actFacesLen - lastFacesLen
 
                     if (additional == 1):
-                        print("ERROR FOUND! There is 1 additional face in this object. Be sure to delete the correct one so the tutorial can continue!")
+                        log.warning("ERROR FOUND! There is 1 additional face in this object. Be sure to delete the correct one so the tutorial can continue!")
                     else:
-                        print("ERROR FOUND! There are %i additional faces in this object. Be sure to delete the corect ones so the tutorial can continue!" %(additional))
+                        log.warning("ERROR FOUND! There are %i additional faces in this object. Be sure to delete the corect ones so the tutorial can continue!", additional)
 
             else:
                 # Means the mesh is ready fot the next step, so now compare the actual vertices to the expected for the next op
@@ -1466,9 +3402,9 @@ class Tutorial:
                     missing = expVertsLen-actVertsLen
 
                     if (missing == 1):
-                        print("There is still 1 vertex missing in this object in order to conclude this step! Follow the tutorial to add it at the correct location!")
+                        log.info("There is still 1 vertex missing in this object in order to conclude this step! Follow the tutorial to add it at the correct location!")
                     else:
-                        print("There are %i vertices missing in this object in order to conclude this step! Follow the tutorial to add them at the correct location!" %(missing))
+                        log.info("There are %i vertices missing in this object in order to conclude this step! Follow the tutorial to add them at the correct location!", missing)
                     
                 elif (expVertsLen < actVertsLen):
                     # Means that there are additional vertices
@@ -1476,9 +3412,9 @@ class Tutorial:
                     additional = actVertsLen - expVertsLen
 
                     if (additional == 1):
-                        print("There is still 1 additional vertex in this object in order to conclude this step! Follow the tutorial to delete it at the correct location!")
+                        log.info("There is still 1 additional vertex in this object in order to conclude this step! Follow the tutorial to delete it at the correct location!")
                     else:
-                        print("There are %i additional vertices in this object in order to conclude this step!. Follow the tutorial to delete them at the correct location!" %(additional))
+                        log.info("There are %i additional vertices in this object in order to conclude this step!. Follow the tutorial to delete them at the correct location!", additional)
 
                 if (expFacesLen > actFacesLen):
                     # Means that some faces are missing
@@ -1486,9 +3422,9 @@ class Tutorial:
                     missing = expFacesLen-actFacesLen
 
                     if (missing == 1):
-                        print("There is still 1 face missing in this object in order to conclude this step! Follow the tutorial to add it at the correct location!")
+                        log.info("There is still 1 face missing in this object in order to conclude this step! Follow the tutorial to add it at the correct location!")
                     else:
-                        print("There are %i faces missing in this object in order to conclude this step! Follow the tutorial to add them at the correct location!" %(missing))
+                        log.info("There are %i faces missing in this object in order to conclude this step! Follow the tutorial to add them at the correct location!", missing)
                     
                 elif (expFacesLen < actFacesLen):
                     # Means that there are additional faces
@@ -1496,9 +3432,9 @@ class Tutorial:
                     additional = actFacesLen - expFacesLen
 
                     if (additional == 1):
-                        print("There is still 1 additional face in this object in order to conclude this step! Follow the tutorial to delete it at the correct location!")
+                        log.info("There is still 1 additional face in this object in order to conclude this step! Follow the tutorial to delete it at the correct location!")
                     else:
-                        print("There are %i additional faces in this object in order to conclude this step!. Follow the tutorial to delete them at the correct location!" %(additional))
+                        log.info("There are %i additional faces in this object in order to conclude this step!. Follow the tutorial to delete them at the correct location!", additional)
 
             # if expectedLen > actualLen:
             #     # Means new vertices
@@ -1512,20 +3448,20 @@ class Tutorial:
             #     #     if (key not in expectedVerts): difference.append(key)
             #     highlightVertices(objName, actualVerts, expectedVerts, tolerance)
 
-            return False
+            return False, -1
 
         # Indicates if the mesh is equal to any of the next 3 operations
         same = False
         # Indicates which mesh is the equivalent (-1 if none)
         meshIndex = -1
         for i, mesh in enumerate(expectedMeshes):
-            if(checkMeshSimilarity(mesh, actualMesh, 0.2)):
+            if(yield from checkMeshSimilarityChunks(mesh, actualMesh, 0.2)):
                 same = True
                 meshIndex = i
                 break
 
         if not same:
-            print("There are some vertices/faces wrong located in this object in order to conclude this step! Follow the tutorial to move them to the correct location!")
+            log.info("There are some vertices/faces wrong located in this object in order to conclude this step! Follow the tutorial to move them to the correct location!")
 
         # # Convert the dictionary values to a NumPy array
         # values_array = np.abs(np.array(list(expectedVerts.values())))
@@ -1569,36 +3505,70 @@ class Tutorial:
         return same, meshIndex
 
 
-    def validateStep(self, step):
-        # Validates the step passed [operator.name, properties] with the current state of the tutorial
+    def validateStep(self, step, activeState = None):
+        # Validates the step passed [operator.name, properties] with the current state of the tutorial.
+        # activeState = (name, mode) of the active object when the step was captured (read from the scene if not given)
 
-        activeObj = bpy.context.view_layer.objects.active
+        return runToEnd(self.validateStepChunks(step, activeState))
+
+    def validateStepChunks(self, step, activeState = None):
+        # Resumable version of validateStep (the comparison of the meshes pauses, see checkMeshSimilarityChunks)
+
+        if activeState is None:
+            activeObj = bpy.context.view_layer.objects.active
+            activeState = (None, None) if activeObj == None else (activeObj.name, activeObj.mode)
+
+        activeName, activeMode = activeState
         editMode = False
 
-        if (activeObj and activeObj.mode == "EDIT"):
+        if (activeMode == "EDIT"):
             editMode = True
 
         # Get the current step
         currentStep = self.tutorialSteps[self.state]
 
         # Get the filtered operation considering the additional props tracked (last element of saved step)
-        filteredOp = getFilteredOp(step, currentStep[-1])
+        stepInfo = self.getStepInfo(currentStep)
+        filteredOp = getFilteredOp(step, stepInfo)
+
+        log.debug("Performed vs expected: %s / %s", filteredOp[0], self.tutorialSteps[self.state][0])
+
+        # Compacted tutorials have no selection steps that left everything as it was (see TutorialCompaction.py), so
+        # such a selection is not counted as a wrong operation. It is compared with the previous performed steps, as
+        # the compaction of this session would
+        isNoOp = isNoOpStep(filteredOp, self.performedMeshes.get(filteredOp[2]), self.lastPerformed)
+
+        if not isNoOp:
+            self.lastPerformed = filteredOp
 
-        print("=========== PERFORMED VS EXPECTED = ", filteredOp[0], self.tutorialSteps[self.state][0])
+            if type(filteredOp[1]) == dict and "vertices" in filteredOp[1]:
+                self.performedMeshes[filteredOp[2]] = filteredOp[1]
+
+        if isNoOp and filteredOp[0] != currentStep[0]:
+            return ['ignored']
 
         # Checking first if the mode is the same:
         if ("editMode" not in currentStep[1] and editMode == "OBJECT") or ("editMode" in currentStep[1] and currentStep[1]["editMode"] == editMode):
 
             correct = False
-            tolerance = self.tutorialSteps[self.state][-1]["tolerance"]/100
+            tolerance = stepInfo.get("tolerance", defaultStepInfo["tolerance"])/100
             meshIndex = -1
 
-            if (editMode and activeObj and activeObj.name == currentStep[-2]):
+            if (editMode and activeName and activeName == currentStep[-2]):
                 # Checking if user is in edit mode and the name of the object selected is the same as the target operation
 
                 objName = currentStep[-2]
                 # actualVerts = getObjectsOnCache()[objName]["vertices"]
-                actualMesh = getObjectsOnCache()[objName]
+
+                if type(step[1]) == dict and type(step[1].get("vertices")) in (dict, MeshCoords) and type(step[1].get("faces")) in (dict, MeshCoords):
+                    # The translated step carries the mesh after the operation (read-only MeshCoords shared with the cache), so the
+                    # validation does not read the cache while the next events are changing it
+                    actualMesh = step[1]
+
+                else:
+                    with cacheLock:
+                        record = getObjectsOnCache()[objName]
+                        actualMesh = {"vertices": record["vertices"], "faces": record["faces"]}
 
                 # incorrectList = self.validateFinalValues(tolerance, currentStep[1]["vertices"], actualVerts, objName)
 
@@ -1641,13 +3611,13 @@ class Tutorial:
                             # If there is a description of the mesh, it is possible to check its similarity
                             meshes.append(step)
 
-                    correct, meshIndex = self.validateFinalValues(tolerance, meshes, actualMesh, self.tutorialSteps[self.state-1][1], objName)
+                    correct, meshIndex = yield from self.validateFinalValuesChunks(tolerance, meshes, actualMesh, self.tutorialSteps[self.state-1][1], objName)
 
             # Checking if the name of the operation is the same
             elif filteredOp[0] == self.tutorialSteps[self.state][0]:
                 correct = self.recursiveValidate(self.tutorialSteps[self.state], filteredOp, list, tolerance)
 
-            print("=========== OPERATION CORRECT? ", correct)
+            log.debug("Operation correct? %s", correct)
 
             if correct:
                 if(self.state == len(self.tutorialSteps) - 1):
@@ -1660,6 +3630,12 @@ class Tutorial:
 
         return ['wrong', filteredOp, self.tutorialSteps[self.state]] # List with wrong and correct operation
         
+    def getStepInfo(self, step):
+        # Additional info of a step (last element: tolerance, additional/ignored props). Older tutorials (e.g.
+        # TUTDonutOLD.txt) saved an empty list there, the default info is used for them
+
+        return step[-1] if type(step[-1]) == dict else defaultStepInfo
+
     def getProgress(self):
         # Returns the percentage of completeness of the tutorial
         if (self.state == len(self.tutorialSteps) - 1 ):
@@ -1669,6 +3645,7 @@ class Tutorial:
             return self.state/( len(self.tutorialSteps) )
     
     def loadCubePyramidTutorial(self):
+        import mathutils
 
         self.tutorialSteps = [['Add', 'Cube'], ['Move', mathutils.Vector((5.0, 0.0, 0.0))], ['Resize', mathutils.Vector((2.0, 2.0, 2.0))], ['Add', 'Cube'], ['Move', mathutils.Vector((0.0, 0.0, 3.0))], ['Move', mathutils.Vector((5.0, 0.0, 0.0))], ['Add', 'Cube'], ['Resize', mathutils.Vector((0.5, 0.5, 0.5))], ['Move', mathutils.Vector((0.0, 0.0, 4.5))], ['Move', mathutils.Vector((5.0, 0.0, 0.0))]]    
 
@@ -1686,7 +3663,7 @@ class ModalOperator(bpy.types.Operator):
 
     def modal(self, context, event):
 
-        if ((bpy.context.active_object == None and len(getAllObjects().keys()) == 0) or not useLogger):
+        if ((bpy.context.active_object == None and len(bpy.context.scene.objects) == 0) or not useLogger):
             # Means that initialized the addon with no object in the scene or logger not started
             if (not useLogger):
                 return {'CANCELLED'}
@@ -1699,39 +3676,10 @@ class ModalOperator(bpy.types.Operator):
 
             if (type(isSame) != bool):
 
-                # Has to save in the formatted form because otherwise it will save the struct in the memory
-                # print("####################### active_operator = ", context.active_operator)
-                self.currOperation = formatOperation2(context.active_operator, isSame)
-                
-                if (len(self.currOperation) == 0): 
-                    return {'PASS_THROUGH'}
-
-                if self.tutorialMode:
-                    result = self.tut.validateStep(self.currOperation)
-                    if (result == ['correct']):
-                        self.user.updateUserProfile(self.currOperation[0], True)
-                        print("============================ Correct operation!")
-                        print("============================ Your progress: ", self.tut.getProgress() * 100, " %")
-                        stepDescription = copy.deepcopy(self.tut.getNextStep())
-                        if "vertices" in stepDescription[1]:
-                            del stepDescription[1]["vertices"]
-                        if "faces" in stepDescription[1]:
-                            del stepDescription[1]["faces"]
-                            
-                        print("\n============================ NEXT STEP: Perform the following operation: ", stepDescription)
-
-                    elif(result == ['end']):
-                        print("============================ Tutorial Finished!")
-                        print("\n RECOMMENDATIONS: ", self.user.makeRecommendation())
-                    else:
-                        self.user.updateUserProfile(self.currOperation[0], False)
-                        print("============================ WRONG OPERATION!")
-                        print("============================ Expected operation: ", result[2][0])
-                        print("============================ Got:                ", result[1][0])
-                
-                else:
-                    self.tut.addTutorialStep(self.currOperation)
-
+                # Only the bpy reads are done here (the event holds copies, not the structs in the memory). The translation
+                # and the validation/recording are done by the translation worker
+                self.currOperation = captureOperation(context.active_operator, isSame)
+                submitTranslation(self.currOperation, self.tut, self.user, self.tutorialMode)
 
                 self.prevOperation = self.currOperation
 
@@ -1743,7 +3691,9 @@ class ModalOperator(bpy.types.Operator):
 
         elif event.type == 'NUMPAD_ASTERIX':
 
-            print("=============== CANCELLING LOGGER MODAL ===============")
+            log.info("=============== CANCELLING LOGGER MODAL ===============")
+            stopTranslationWorker()
+            stopScheduler()
             return {'CANCELLED'}
 
         # else: 
@@ -1764,37 +3714,45 @@ class ModalOperator(bpy.types.Operator):
             # self.tut.loadCubePyramidTutorial()
 
             if tutorialMode:
-                # If in tutorial mode, has to load the tutorial specified by name
-                self.tut.loadTutorialSteps(tutFileName)
+                # If in tutorial mode, has to load the tutorial specified by name. It is read in the background with the
+                # term weights: the first operations wait for it on the worker (or the frame scheduler), not here
                 self.tutorialMode = True
-
-                self.user = userModel()
+                self.user = userModel(loadWeights=False)
+                self.tut.loadTutorialStepsInBackground(tutFileName, self.user)
 
             context.window_manager.modal_handler_add(self)
 
             # if context.object == None:
             #     return {'RUNNING_MODAL'}
 
-            # Fill the cache with the current objects and modifiers on the scene
+            # Fill the cache with the current objects and modifiers on the scene (the next edit-mode capture reads the mesh in bulk)
+            captureScopes.clear()
             objsDict = getAllObjects(firstCall=True)
-            modifiersList = getAllModifiers()
+            modifiersDict = getAllModifiers()
 
-            saveModifiersOnCache(modifiersList)
+            saveModifiersOnCache(modifiersDict)
             saveObjectsOnCache(objsDict)
 
             # If on edit mode, save all its vertices already in the cache
             if(bpy.context.active_object and bpy.context.active_object.mode == 'EDIT'):
-                print("SAVING ON CACHE")
-                saveObjectVerticesOnCache(getAllVerticesOfObject())
-                saveObjectFacesOnCache(getAllFacesOfObject())
+                log.debug("Saving the mesh in edit mode on the cache")
+                coords, _, _, faceCenters = getMeshArraysOfObject(withFaces=True)
+                saveObjectVerticesOnCache(coords)
+                saveObjectFacesOnCache(faceCenters)
 
-            # Update the number of operations performed so far
+            # Update the number of operations performed so far (on the next tick, see readOperationsBaseline)
             global numberOfOp
-            operations = getPerformedOperations()
-            numberOfOp = len(operations)
+            numberOfOp = None
+            bpy.app.timers.register(readOperationsBaseline, first_interval=0)
+
+            if translationMode == "FRAME_BUDGET":
+                startScheduler()
+
+            else:
+                startTranslationWorker()
 
             # print("\n============================ NEXT STEP: Perform the following operation: ", self.tut.getNextStep())
-            print("================================= Initializing in the CREATE TUTORIAL MODE")
+            log.info("================================= Initializing in the CREATE TUTORIAL MODE")
 
             return {'RUNNING_MODAL'}
 
@@ -1819,14 +3777,19 @@ class userModel:
     # Dictionary containing all tutorials and all terms
     termsDict = {}
 
-    def __init__(self):
+    def __init__(self, loadWeights = True):
 
         # Get the path to the folder containing all the tf-idf calculated
         # file_name = 'termWeights.txt'
         # tutorials_path = os.path.join(os.path.dirname(__file__), 'blenderProject') 
         # file_path = os.path.join(tutorials_path, file_name)
 
-        file_path = bpy.path.abspath('//termWeights.txt')
+        # loadWeights = False: read later by loadTermWeights (Tutorial.loadTutorialStepsInBackground)
+        if loadWeights:
+            self.loadTermWeights(bpy.path.abspath('//termWeights.txt'))
+
+    def loadTermWeights(self, file_path):
+        import json
 
         # Read the dictionary containing all the calculated weights
         with open(file_path, 'r') as file:
@@ -1837,7 +3800,7 @@ class userModel:
 
         self.allTerms = self.termsDict["allTerms"]
 
-        print("############ DEBUG: All terms: ", self.allTerms)
+        log.debug("All terms: %s", self.allTerms)
 
     def getAllTerms(self):
         # Returns a list containing all the names of operations in orderfor the Rocchio's algorithm
@@ -1849,7 +3812,7 @@ class userModel:
         # to alpha, beta and gamma.
         # NOTE: The operation names are actually the terms used to calculate relevance of tutorials
 
-        print("############ DEBUG: old profile: ", self.userProfile)
+        log.debug("Old profile: %s", self.userProfile)
 
         if operationName in self.allTerms:
             # List where it is equal to 1 only for the operation name
@@ -1863,9 +3826,9 @@ class userModel:
                 # Means beta should be used
                 self.userProfile = np.add(np.multiply(self.userProfile, self.alpha), np.multiply(update, self.beta))
         else:
-            print("ERROR! operation name not found as a pre-calculated term!!")
+            log.error("Operation name not found as a pre-calculated term: %s", operationName)
 
-        print("############ DEBUG: new profile: ", self.userProfile)
+        log.debug("New profile: %s", self.userProfile)
         
     def makeRecommendation(self):
         # Returns a list of the top 2 recommendations (excluding the current one)
@@ -1888,11 +3851,11 @@ class userModel:
             if tutName != tutFileName:
                 weights = self.termsDict['allTutorials'][tutName]
 
-                print("############ DEBUG: tutName and weight: ", tutName, "\n", weights)
+                log.debug("Tutorial name and weights: %s %s", tutName, weights)
 
                 # Sice both weights and normalizedProfile are already normalized, cosine similarity is just the dot product
                 cosineSimilarity = np.dot(np.array(normalizedProfile), np.array(weights))
-                print("############ DEBUG: CosineSimilarity: ", cosineSimilarity)
+                log.debug("Cosine similarity: %s", cosineSimilarity)
 
                 if cosineSimilarity > bestSimilarities[0]:
                     
@@ -1969,6 +3932,51 @@ class StartTutorial(bpy.types.Operator):
         startLogger(context, tutMode=True, fileName = fileName)
         return {'FINISHED'}
     
+class ExportStageTimings(bpy.types.Operator):
+    """Save the stage timings next to the .blend file"""
+    bl_idname = "object.export_stage_timings"
+    bl_label = "Export stage timings"
+
+    @classmethod
+    def poll(cls, context):
+        return len(stageTimings) != 0
+
+    def execute(self, context):
+        path = bpy.path.abspath('//stage_timings.json')
+        exportStageTimings(path)
+        self.report({'INFO'}, "Stage timings saved on %s" %path)
+        return {'FINISHED'}
+
+class MemoryReport(bpy.types.Operator):
+    """Log the memory held by the cache, the recorded steps, the tutorials and the highlights"""
+    bl_idname = "object.memory_report"
+    bl_label = "Memory report"
+
+    def execute(self, context):
+        global lastMemoryReport
+        lastMemoryReport = getMemoryReport()
+        logMemoryReport(lastMemoryReport)
+        return {'FINISHED'}
+
+class MemorySnapshot(bpy.types.Operator):
+    """Take a snapshot of the Python allocations and log what grew since the previous one"""
+    bl_idname = "object.memory_snapshot"
+    bl_label = "Memory snapshot"
+
+    def execute(self, context):
+        previous = next(reversed(memorySnapshots), None)
+        label = takeMemorySnapshot()
+
+        if previous is None:
+            self.report({'INFO'}, "First snapshot taken (allocations are traced from now on)")
+
+        else:
+            log.info("Allocations from %s to %s:", previous, label)
+            for stat in compareMemorySnapshots(previous, label):
+                log.info("%+10.1f KB %+8i blocks  %s", stat["sizeDiff"] / 1024, stat["countDiff"], stat["location"])
+
+        return {'FINISHED'}
+
 class LayoutDemoPanel(bpy.types.Panel):
     """Creates a Panel in the scene context of the properties editor"""
     # bl_label = "Layout Demo"
@@ -2022,6 +4030,13 @@ class LayoutDemoPanel(bpy.types.Panel):
         row = layout.row()
         row.scale_y = 3.0
         row.operator("object.log_actions")
+        row = layout.row()
+        row.prop(context.scene, "geometry_cache_budget")
+        row = layout.row()
+        row.prop(context.scene, "compact_recording")
+        row = layout.row()
+        row.prop(context.scene, "translation_mode", text="")
+        row.prop(context.scene, "frame_budget")
 
         # Stop Logger
         layout.label(text="Stop the logger:")
@@ -2029,6 +4044,46 @@ class LayoutDemoPanel(bpy.types.Panel):
         row.scale_y = 3.0
         row.operator("object.stop_logger")
 
+        if useLogger:
+            stats = getCacheStats()
+            layout.label(text="Cache: %i hits / %i misses / %.1f MB" %(stats["hits"], stats["misses"], stats["bytes"] / (1024 * 1024)))
+            stats = getTranslationCacheStats()
+            layout.label(text="Translations: %i hits / %i misses" %(stats["hits"], stats["misses"]))
+            costs = getHandlerCosts()
+            if costs:
+                layout.label(text="Slowest: %s (%.2f ms avg)" %(costs[0]["name"].strip(), costs[0]["mean"] * 1000))
+            if schedulerRunning:
+                stats = getSchedulerStats()
+                layout.label(text="Scheduler: %i queued (max %i) / %.1f ms budget / %.1f ms longest tick" %(stats["backlog"], stats["maxBacklog"],
+                             stats["budget"] * 1000, stats["maxTick"] * 1000))
+
+        # Latency of each stage (p50 / p95 / p99 of all the operations)
+        row = layout.row()
+        row.prop(context.scene, "stage_timings")
+        if stageTimingsEnabled:
+            box = layout.box()
+            for stage, values in getStageSummary().get("(all)", {}).items():
+                box.label(text="%s: %.1f / %.1f / %.1f ms" %(stage, values["p50"] * 1000, values["p95"] * 1000, values["p99"] * 1000))
+            row = layout.row()
+            row.operator("object.export_stage_timings")
+
+        # Memory held by the addon (measured by the report operator, not on every redraw)
+        row = layout.row(align=True)
+        row.operator("object.memory_report")
+        row.operator("object.memory_snapshot")
+        if lastMemoryReport is not None:
+            box = layout.box()
+            payload, headers = getMemoryTotals(lastMemoryReport)
+            box.label(text="Total: %.1f MB meshes / %.1f MB other" %(payload / (1024 * 1024), headers / (1024 * 1024)))
+            for name in ("cache", "logCache", "highlights"):
+                box.label(text="%s: %.1f MB / %.1f MB" %(name, lastMemoryReport[name]["payload"] / (1024 * 1024), lastMemoryReport[name]["headers"] / (1024 * 1024)))
+            for name, region in lastMemoryReport["tutorials"].items():
+                box.label(text="%s: %.1f MB / %.1f MB" %(name, region["payload"] / (1024 * 1024), region["headers"] / (1024 * 1024)))
+
+        # cProfile capture of the work done for the events
+        row = layout.row()
+        row.prop(context.scene, "profile_handlers")
+
         # Load Tutorial
         layout.label(text="Load a tutorial:")
         row = layout.row()
@@ -2039,6 +4094,13 @@ class LayoutDemoPanel(bpy.types.Panel):
         row.scale_y = 3.0
         row.operator("object.start_tutorial")
 
+        # Last messages of the log
+        layout.label(text="Log:")
+        layout.prop(context.scene, "log_level", text="Level")
+        box = layout.box()
+        for message in getRecentLogMessages():
+            box.label(text=message[:120])
+
         # Different sizes in a row
 #        layout.label(text="Different button sizes:")
 #        row = layout.row(align=True)
@@ -2054,49 +4116,79 @@ class LayoutDemoPanel(bpy.types.Panel):
 # ======================================================================================================================= #
 # ======================================================================================================================= #
 
-def format_list_as_string(my_list):
-    result = "["
-
-    for item in my_list:
-        if isinstance(item, list):
-            result += format_list_as_string(item)
-        else:
-            result += repr(item)
-
-        if item != my_list[-1]:
-            result += ", "
-
-    result += "]"
-    return result
-
 def startLogger(context, tutMode = False, fileName = ""):
     global useLogger
     global tutorialMode
     global tutFileName
+    global logCache
+
+    # The steps of the previous session are not part of this one (stopLogger compacts and saves logCache, and the
+    # first step recorded only points it to the steps of the new session)
+    logCache = []
 
     if (tutMode):
         tutFileName = fileName
         tutorialMode = True
     
+    if not tutMode:
+        # Each recorded step is appended to the journal as soon as it is produced, so nothing is lost if Blender crashes.
+        # It becomes logger_log.txt when the logger is stopped (TutorialIO.py can recover it otherwise)
+        global sessionJournal
+        sessionJournal = SessionJournal(bpy.path.abspath('//logger_log.journal'))
+
+    global translationMode
+    global frameBudget
+    translationMode = context.scene.translation_mode
+    frameBudget = context.scene.frame_budget / 1000
+
     useLogger = True
+    setGeometryBudgetOnCache(context.scene.geometry_cache_budget * 1024 * 1024)
     bpy.ops.object.modal_operator('INVOKE_DEFAULT')
-    print("============================================== LOGGER STARTED ==============================================")
+    log.info("============================================== LOGGER STARTED ==============================================")
 
 def stopLogger(context):
 
-    global logCache
-    file_path = bpy.path.abspath('//logger_log.txt')
+    # The steps still queued are part of the session
+    stopTranslationWorker()
+    stopScheduler()
+
+    # The steps are already on the journal, so it only has to be closed and renamed
+    global sessionJournal
+
+    if sessionJournal is not None:
+        steps = sessionJournal.close()
+        logPath = bpy.path.abspath('//logger_log.txt')
+
+        if context.scene.compact_recording:
+            # Drops the selection steps that did not change anything and merges the repeated transforms
+            compacted, stats = compactSteps(logCache)
+            writeTutorial(logPath, [formatStep(step) for step in compacted])
+            os.remove(sessionJournal.path)
+            log.info("Saved %i steps on logger_log.txt (%i recorded, %i no-op steps dropped, %i transforms merged)", len(compacted),
+                     steps, stats["dropped"], stats["merged"])
 
-    with open(file_path, 'w') as file:
-        # Convert the list to a string
+        else:
+            os.replace(sessionJournal.path, logPath)
+            log.info("Saved %i steps on logger_log.txt", steps)
 
-        for action in logCache:
-            # Write the string to the file
-            file.write(format_list_as_string(action) + '\n')
+        sessionJournal = None
 
     global useLogger
     useLogger = False
-    print("============================================== LOGGER STOPPED ==============================================")
+
+    stats = getCacheStats()
+    log.info("Geometry cache: %i hits, %i misses, %i evictions, %.2f MB held", stats["hits"], stats["misses"], stats["evictions"], stats["bytes"] / (1024 * 1024))
+    stats = getTranslationCacheStats()
+    log.info("Translation cache: %i hits, %i misses, %i entries", stats["hits"], stats["misses"], stats["entries"])
+
+    for cost in getHandlerCosts()[:10]:
+        log.info("%-40s %5i calls | parse %8.2f ms | fetch %8.2f ms | handlers %8.2f ms | max %8.2f ms", cost["name"].strip()[:40],
+                 cost["calls"], cost["parse"] * 1000, cost["fetch"] * 1000, cost["handlers"] * 1000, cost["max"] * 1000)
+
+    if stageTimingsEnabled:
+        logStageSummary()
+    stopMemoryTracing()
+    log.info("============================================== LOGGER STOPPED ==============================================")
 
 def menu_func(self, context):
     self.layout.operator(ModalOperator.bl_idname, text=ModalOperator.bl_label)
@@ -2107,20 +4199,52 @@ def register():
     bpy.utils.register_class(StartLogger)
     bpy.utils.register_class(StopLogger)
     bpy.utils.register_class(StartTutorial)
+    bpy.utils.register_class(ExportStageTimings)
+    bpy.utils.register_class(MemoryReport)
+    bpy.utils.register_class(MemorySnapshot)
     bpy.utils.register_class(LayoutDemoPanel)
     bpy.utils.register_class(ModalOperator)
     bpy.types.VIEW3D_MT_object.append(menu_func)
     bpy.types.Scene.tutorial_filename = bpy.props.StringProperty(name="Tutorial Filename", default="")
+    bpy.types.Scene.geometry_cache_budget = IntProperty(name="Cache budget (MB)", description="Memory budget for the meshes kept in the cache", default=256, min=1)
+    bpy.types.Scene.log_level = EnumProperty(name="Log level", description="Messages of the logger shown in the console and in the panel",
+                                             items=[(level, level.capitalize(), "") for level in logLevels], default="INFO", update=updateLogLevel)
+    bpy.types.Scene.compact_recording = BoolProperty(name="Compact recording", description="Drop no-op selection steps and merge repeated transforms when the logger is stopped", default=True)
+    bpy.types.Scene.translation_mode = EnumProperty(name="Translation", description="Where the operations are translated and validated",
+                                                    items=[("WORKER", "Worker thread", "On a background thread"),
+                                                           ("FRAME_BUDGET", "Frame budget", "On the main thread, in chunks limited by the frame budget")], default="WORKER")
+    bpy.types.Scene.frame_budget = FloatProperty(name="Budget (ms)", description="Time per tick given to the translation/validation in the frame budget mode",
+                                                 default=5.0, min=0.5, max=100.0, update=updateFrameBudget)
+    bpy.types.Scene.profile_handlers = BoolProperty(name="Profile", description="Profile the work done for the events (saved next to the .blend file when unchecked)",
+                                                    default=False, update=updateProfiling)
+    bpy.types.Scene.stage_timings = BoolProperty(name="Stage timings", description="Measure the latency of each stage of the operations (capture, translation, diffing, validation...)",
+                                                 default=False, update=updateStageTimings)
+    bpy.app.handlers.undo_post.append(resyncCacheAfterUndo)
+    bpy.app.handlers.redo_post.append(resyncCacheAfterUndo)
 
 
 def unregister():
     bpy.utils.unregister_class(StartLogger)
     bpy.utils.unregister_class(StopLogger)
     bpy.utils.unregister_class(StartTutorial)
+    bpy.utils.unregister_class(ExportStageTimings)
+    bpy.utils.unregister_class(MemoryReport)
+    bpy.utils.unregister_class(MemorySnapshot)
     bpy.utils.unregister_class(LayoutDemoPanel)
     bpy.utils.unregister_class(ModalOperator)
     bpy.types.VIEW3D_MT_object.remove(menu_func)
     del bpy.types.Scene.tutorial_filename
+    del bpy.types.Scene.geometry_cache_budget
+    del bpy.types.Scene.log_level
+    del bpy.types.Scene.compact_recording
+    del bpy.types.Scene.stage_timings
+    del bpy.types.Scene.profile_handlers
+    del bpy.types.Scene.translation_mode
+    del bpy.types.Scene.frame_budget
+    enableStageTimings(False)
+    stopProfiling()
+    bpy.app.handlers.undo_post.remove(resyncCacheAfterUndo)
+    bpy.app.handlers.redo_post.remove(resyncCacheAfterUndo)
 
 
 if __name__ == "__main__":
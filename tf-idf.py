@@ -3,96 +3,114 @@ import os
 import numpy as np
 import json
 
-# Tutorials list
-tutorials = []
+from TutorialIO import readTutorial
 
-# Global list containing all the operations in the tutorials
-globalOps = []
+# The computation is split in functions so it can also be timed by Benchmark.py (the file is only written when this
+# script is run)
 
-# Get the path to the folder containing the tutorials
-tutorials_path = os.path.join(os.path.dirname(__file__), 'blenderProject') 
+def countOperations(tutorials_path, file_names = None):
+    # Reads the tutorials ("TUT" files of the folder) and returns (tutorials, globalOps):
+    # tutorials = list of {"name", "operations": {operation name: number of steps}, "weights": []}
+    # globalOps = list containing all the operations in the tutorials
 
-# List all files in the folder
-file_names = os.listdir(tutorials_path)
+    # Tutorials list
+    tutorials = []
 
-# Filtering tutorials by initial letters: "TUT"
-tut_files = [file_name for file_name in file_names if file_name.startswith("TUT")]
+    # Global list containing all the operations in the tutorials
+    globalOps = []
 
-# Read content line by line for each file
-for i, file_name in enumerate(tut_files):
-    file_path = os.path.join(tutorials_path, file_name)
-    
+    # List all files in the folder
+    if file_names is None:
+        file_names = os.listdir(tutorials_path)
+
+    # Filtering tutorials by initial letters: "TUT"
+    tut_files = [file_name for file_name in file_names if file_name.startswith("TUT")]
+
+    # Read content line by line for each file
+    for i, file_name in enumerate(tut_files):
+        file_path = os.path.join(tutorials_path, file_name)
+
+        tutorials.append(countStepOperations(file_name, readTutorial(file_path), globalOps))
+
+    return tutorials, globalOps
+
+def countStepOperations(name, steps, globalOps):
     # Dictionary containing all the information of current tutorial
-    tutDict = {"name" : file_name,
+    tutDict = {"name" : name,
                "operations": {},
                "weights": []}
 
-    with open(file_path, 'r') as file:
-        for line in file:
-            operationName = eval(line.strip())[0]
+    for step in steps:
+        operationName = step[0]
+
+        if operationName not in tutDict["operations"]:
+            tutDict["operations"][operationName] = 1
+        else:
+            tutDict["operations"][operationName] += 1
+
+        if operationName not in globalOps:
+            globalOps.append(operationName)
+
+    return tutDict
+
+def computeTermWeights(tutorials, globalOps, verbose = True):
+    # Fills the normalized tf-idf weights of each tutorial (one per term of globalOps)
+
+    show = print if verbose else lambda *args: None
+
+    # Number of tutorials considered
+    N = len(tutorials)
+
+    for tutorial in tutorials:
+        show("TUTORIAL = ", tutorial)
+        for term in globalOps:
+            show("TERM = ", term)
+            show("OPERATIONS IN THIS TUTORIAL: ", list(tutorial["operations"].keys()))
+
+            if term in list(tutorial["operations"].keys()):
+
+                 # Frequency of term in the current document
+                f = tutorial["operations"][term]
+                show("     TERM FREQUENCY ", f)
+
+                # Max frequency among all terms in the document
+                maxf = np.max(list(tutorial["operations"].values()))
+                show("     MAX FREQUENCY ", maxf)
+
+                # Number of tutorials where term occurs at least once
+                nk = 0
+                for tut in tutorials:
+                    if term in list(tut["operations"].keys()):
+                        nk += 1
+                show("     TUTORIALS WITH TERM ", nk)
+                show("     N ", N)
+
+                # Calculating TF:
+                tf = f/maxf
+                show("     TF ", tf)
+
+                # Calculating IDF (I add 1 to N because since the dataset is small and also
+                # it is expected that all tutorials have some terms in common, it wont
+                # result in 0, resulting in over penalization):
+                idf = np.log10(( (N+1 if N == nk else N)/nk ))
+                show("     IDF ", idf)
+
+                # Calculating TF-IDF:
+                tf_idf = tf*idf
+                show("     TF-IDF ", tf_idf)
 
-            if operationName not in tutDict["operations"]:
-                tutDict["operations"][operationName] = 1
             else:
-                tutDict["operations"][operationName] += 1
-
-            if operationName not in globalOps:
-                globalOps.append(operationName)
-    
-    tutorials.append(tutDict)
-
-
-# Number of tutorials considered
-N = len(tutorials)
-
-for tutorial in tutorials:
-    print("TUTORIAL = ", tutorial)
-    for term in globalOps:
-        print("TERM = ", term)
-        print("OPERATIONS IN THIS TUTORIAL: ", list(tutorial["operations"].keys()))
-
-        if term in list(tutorial["operations"].keys()):
-
-             # Frequency of term in the current document
-            f = tutorial["operations"][term]
-            print("     TERM FREQUENCY ", f)
-
-            # Max frequency among all terms in the document
-            maxf = np.max(list(tutorial["operations"].values()))
-            print("     MAX FREQUENCY ", maxf)
-
-            # Number of tutorials where term occurs at least once
-            nk = 0
-            for tut in tutorials:
-                if term in list(tut["operations"].keys()):
-                    nk += 1
-            print("     TUTORIALS WITH TERM ", nk)
-            print("     N ", N)
-            
-            # Calculating TF:
-            tf = f/maxf
-            print("     TF ", tf)
-
-            # Calculating IDF (I add 1 to N because since the dataset is small and also
-            # it is expected that all tutorials have some terms in common, it wont
-            # result in 0, resulting in over penalization):
-            idf = np.log10(( (N+1 if N == nk else N)/nk ))
-            print("     IDF ", idf)
-
-            # Calculating TF-IDF:
-            tf_idf = tf*idf
-            print("     TF-IDF ", tf_idf)
+                tf_idf = 0
 
-        else:
-            tf_idf = 0
+            tutorial["weights"].append(tf_idf)
+
+            show("CALCULATED WEIGHT: ", tf_idf)
+            # print("FINAL WEIGHTS = ", tutorial["weights"])
 
-        tutorial["weights"].append(tf_idf)
-        
-        print("CALCULATED WEIGHT: ", tf_idf)
-        # print("FINAL WEIGHTS = ", tutorial["weights"])
+        # Normalizing the weights - LNCS 4321:
+        tutorial["weights"] = np.divide(tutorial["weights"], np.sqrt(np.sum(np.square(tutorial["weights"]))))
 
-    # Normalizing the weights - LNCS 4321:
-    tutorial["weights"] = np.divide(tutorial["weights"], np.sqrt(np.sum(np.square(tutorial["weights"]))))
+    return tutorials
 
 
 # Helper function to format the final result dict
@@ -111,16 +129,23 @@ def formatFinalDict(tutList, allTerms):
 
     return finalDict
 
-completeDict = formatFinalDict(tutorials, globalOps)
+if __name__ == "__main__":
 
-# Creating the file with all the tf-idf calculated
-file_name = 'termWeights.txt'
-file_path = os.path.join(tutorials_path, file_name)
+    # Get the path to the folder containing the tutorials
+    tutorials_path = os.path.join(os.path.dirname(__file__), 'blenderProject')
 
-# Write the dictionary to the text file
-with open(file_path, 'w') as file:
-    json.dump(completeDict, file)
+    tutorials, globalOps = countOperations(tutorials_path)
+    computeTermWeights(tutorials, globalOps)
+
+    completeDict = formatFinalDict(tutorials, globalOps)
+
+    # Creating the file with all the tf-idf calculated
+    file_name = 'termWeights.txt'
+    file_path = os.path.join(tutorials_path, file_name)
 
+    # Write the dictionary to the text file
+    with open(file_path, 'w') as file:
+        json.dump(completeDict, file)
 
 
 